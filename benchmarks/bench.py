@@ -0,0 +1,250 @@
+"""
+Benchmarks of the simulation loop, workbook generation and sweeps, run with
+`uv run python -m benchmarks.bench`.
+
+The fixtures are the seven scenarios of `vce_two_trains_alight_and_board.py`,
+and every benchmark but the batch and sweep ones runs all seven in turn.
+Each benchmark is timed `--repeat` times and its fastest run kept, along with
+the spread of the runs as a measure of the timing noise. The results
+are written as JSON, and `--compare` checks them against a stored baseline,
+exiting with status 1 if any benchmark got slower than `--threshold` allows.
+"""
+
+import argparse
+import dataclasses
+import gc
+import io
+import json
+import platform
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from platform_crowd_model.batch import simulate_batch
+from platform_crowd_model.kpi import run_kpi_sweep
+from platform_crowd_model.model import Params, simulate
+from platform_crowd_model.scenarios import penn_scenarios
+from platform_crowd_model.sweep import expand_grid, run_sweep
+from platform_crowd_model.workbook import calc_workbook
+
+BASELINE = Path(__file__).with_name("baseline.json")
+"""The stored baseline results."""
+
+HORIZONS = (600, 86_400)
+"""Simulation times (s) of the scalar loop benchmarks."""
+
+DEFAULT_THRESHOLD = 0.25
+"""Slowdown, as a share of the baseline time, flagged as a regression by default."""
+
+MIN_SLOWDOWN = 0.005
+"""Slowdowns (s) too small to tell from timing noise, never flagged."""
+
+
+def fixtures() -> dict[str, Params]:
+    """The seven scenarios of `main()`."""
+    return penn_scenarios()
+
+
+def timing(fn: Callable[[], object], repeat: int) -> dict[str, float]:
+    """
+    Time `repeat` runs of `fn` with, like `timeit`, garbage collection off.
+
+    :return: the fastest run's `seconds`, and the `spread` between the fastest
+    and slowest runs, a measure of the timing noise
+    """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return {"seconds": min(times), "spread": max(times) - min(times)}
+
+
+def throughput(fn: Callable[[], object], repeat: int, n: int) -> dict[str, float]:
+    """`timing` of `fn`, which simulates `n` scenarios, and its scenarios per second."""
+    result = timing(fn, repeat)
+    return result | {"scenarios_per_second": n / result["seconds"]}
+
+
+def run_benchmarks(
+    repeat: int, batch_size: int, sweep_size: int, workers: int
+) -> dict[str, dict[str, float]]:
+    """
+    Run every benchmark.
+
+    :param repeat: number of runs of each benchmark to take the fastest of
+    :param batch_size: number of scenarios of the batch benchmark
+    :param sweep_size: number of scenarios of the sweep benchmarks
+    :param workers: number of worker processes of the sweep benchmarks
+    :return: the `timing` of each benchmark, and the `scenarios_per_second`
+    of the throughput benchmarks
+    """
+    results: dict[str, dict[str, float]] = {}
+    fixture_list = list(fixtures().values())
+
+    for horizon in HORIZONS:
+        horizon_params = [
+            dataclasses.replace(p, simulation_time=horizon) for p in fixture_list
+        ]
+        results[f"scalar_{horizon}s"] = timing(
+            lambda: [simulate(p) for p in horizon_params], repeat
+        )
+
+    # calc_workbook simulates unless given the results, so reuse them
+    # to time only building the workbook, with and without its charts.
+    simulated = list(zip(fixture_list, [simulate(p) for p in fixture_list]))
+    plain = timing(
+        lambda: [calc_workbook(p, result=r, charts=False) for p, r in simulated],
+        repeat,
+    )
+    with_charts = timing(
+        lambda: [calc_workbook(p, result=r) for p, r in simulated], repeat
+    )
+    results["workbook"] = plain
+    results["charts"] = {
+        "seconds": max(with_charts["seconds"] - plain["seconds"], 0),
+        "spread": with_charts["spread"] + plain["spread"],
+    }
+
+    workbooks = [calc_workbook(p, result=r) for p, r in simulated]
+
+    def save() -> None:
+        for workbook in workbooks:
+            workbook.save(io.BytesIO())
+
+    results["save"] = timing(save, repeat)
+
+    batch = [fixture_list[i % len(fixture_list)] for i in range(batch_size)]
+    results["batch"] = throughput(lambda: simulate_batch(batch), repeat, batch_size)
+
+    grid = expand_grid(
+        fixtures()["p3120"],
+        {
+            "train1_arriving_pax": np.linspace(400, 2400, sweep_size)
+            .round()
+            .astype(int)
+            .tolist()
+        },
+    )
+    results["sweep"] = throughput(
+        lambda: run_sweep(grid, workers=workers), repeat, sweep_size
+    )
+    results["sweep_summary"] = throughput(
+        lambda: run_kpi_sweep(grid, workers=workers), repeat, sweep_size
+    )
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[str]:
+    """
+    Print how each benchmark compares with the baseline.
+
+    :param results: the current results
+    :param baseline: the baseline results
+    :param threshold: slowdown, as a share of the baseline time, that is a regression
+    if it is also more than the timing noise of both runs
+    :return: the benchmarks that regressed
+    """
+    regressions = []
+    print(f"{'benchmark':<32} {'baseline':>10} {'current':>10} {'speedup':>8}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<32} {'-':>10} {result['seconds']:>10.4f}")
+            continue
+        before, after = baseline[name]["seconds"], result["seconds"]
+        speedup = before / after if after else float("inf")
+        noise = baseline[name].get("spread", 0) + result.get("spread", 0)
+        regressed = after - before > max(before * threshold, noise, MIN_SLOWDOWN)
+        if regressed:
+            regressions.append(name)
+        print(
+            f"{name:<32} {before:>10.4f} {after:>10.4f} {speedup:>7.2f}x"
+            + ("  REGRESSION" if regressed else "")
+        )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="number of runs of each benchmark to take the fastest of "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1024,
+        help="number of scenarios of the batch benchmark (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--sweep-size",
+        type=int,
+        default=2048,
+        help="number of scenarios of the sweep benchmarks (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of worker processes of the sweep benchmarks "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--output", help="JSON file to write (default: standard output)"
+    )
+    parser.add_argument(
+        "--compare",
+        nargs="?",
+        const=str(BASELINE),
+        help=f"baseline JSON file to compare with (default: {BASELINE})",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="slowdown, as a share of the baseline time, flagged as a regression "
+        "(default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    results = run_benchmarks(
+        args.repeat, args.batch_size, args.sweep_size, args.workers
+    )
+    report: dict[str, Any] = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    elif not args.compare:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regressions: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark the flow curves of `platform_crowd_model.flowcurve` on a large
+summary-only sweep, run with `uv run python -m benchmarks.flow_curves`.
+"""
+
+import argparse
+import time
+
+from platform_crowd_model.flowcurve import FLOW_CURVES, flow_curve
+from platform_crowd_model.kpi import simulate_batch_kpis
+from platform_crowd_model.scenarios import penn_scenarios
+from platform_crowd_model.sweep import expand_grid
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--scenarios",
+        type=int,
+        default=10_000,
+        help="number of scenarios in the sweep (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="number of runs to take the fastest of (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    base = penn_scenarios()["p3120"]
+    n = args.scenarios
+    params = expand_grid(
+        base,
+        {"train1_arriving_pax": [round(400 + 2000 * i / n) for i in range(n)]},
+    )
+
+    exact = None
+    print("flow_curve,seconds,speedup,max_peak_error,max_min_space_error")
+    for name in FLOW_CURVES:
+        curve = flow_curve(name)
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            kpis = simulate_batch_kpis(params, curve)
+            best = min(best, time.perf_counter() - start)
+        if exact is None:
+            exact = (best, kpis)
+        peak_error = max(
+            abs(k.peak_total_pax_on_platform - e.peak_total_pax_on_platform)
+            for k, e in zip(kpis, exact[1])
+        )
+        space_error = max(
+            abs(k.min_inst_crowding - e.min_inst_crowding)
+            for k, e in zip(kpis, exact[1])
+        )
+        print(f"{name},{best:.3f},{exact[0] / best:.2f},{peak_error:g},{space_error:g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Model platform crowding and alighting and boarding at NY Penn Station.
+"""
@@ -0,0 +1,574 @@
+"""
+A vectorized version of the time-step loop in `model.simulate` that advances
+many scenarios at once.
+
+Each scenario is one entry along the first axis of every array, so the
+per-second Python overhead is paid once per batch instead of once per scenario.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from .los import (
+    GradeCodes,
+    egress_codes,
+    grade_letters,
+    plat_crowd_codes,
+    time_in_grade,
+)
+from .model import Params, SimulationResult
+
+if TYPE_CHECKING:
+    from .flowcurve import FlowCurve
+
+FloatArray = NDArray[np.floating]
+
+
+def alight_rate_arr(
+    k: FloatArray, t: float, t0: FloatArray, u: FloatArray
+) -> FloatArray:
+    """
+    Array version of `model.alight_rate_fn`.
+
+    :param k: number of people waiting to get off each train
+    :param t: time pass counter (s)
+    :param t0: train arrival times
+    :param u: train(x)doors*rate (1 pax/door/s)
+    :return: egress rates from train to platform across all doors (pax/s)
+    """
+    return np.where(t > t0, np.minimum(k, u), 0.0)
+
+
+def plat_clearance_arr(
+    karr: FloatArray,
+    a: FloatArray,
+    w: FloatArray,
+    qmax: FloatArray,
+    flow_curve: "FlowCurve | None" = None,
+) -> FloatArray:
+    """
+    Array version of `model.plat_clearance_fn`.
+
+    :param karr: number of people waiting to get onto a stairwell
+    :param a: usable platform area
+    :param w: total width of vertical circulation elements
+    :param qmax: number of people that can fit around stair thresholds
+    :param flow_curve: the stair flow curve to use instead of the model's formula,
+    see `flowcurve`
+    :return: platform egress rates on stairs
+    """
+    k = np.maximum(1, karr)
+    curve = (
+        (111 * a / k - 162) / (a / k) ** 2 if flow_curve is None else flow_curve(k / a)
+    )
+    flow = np.minimum(17 * w / 60, curve)
+    return np.where(karr <= qmax, np.minimum(karr, flow), np.maximum(10 * w / 60, flow))
+
+
+def plat_ingress_arr(
+    kdep: FloatArray, a: ArrayLike, w: FloatArray, r_up: FloatArray
+) -> FloatArray:
+    """
+    Array version of `model.plat_ingress_fn`.
+
+    :param kdep: number of people waiting to get onto a stairwell
+    :param a: usable concourse area
+    :param w: total width of vertical circulation elements
+    :param r_up: upstairs flow, passed from plat_clearance_arr
+    :return: platform ingress rates on stairs
+    """
+    return ingress_at_space_arr(kdep, np.divide(a, np.maximum(1, kdep)), w, r_up)
+
+
+def ingress_at_space_arr(
+    kdep: FloatArray,
+    m: FloatArray,
+    w: FloatArray,
+    r_up: FloatArray,
+    flow_curve: "FlowCurve | None" = None,
+) -> FloatArray:
+    """
+    `plat_ingress_arr` given the space per passenger upstairs
+    instead of the concourse area.
+
+    :param kdep: number of people waiting to get onto a stairwell
+    :param m: concourse space per passenger (sqft/pax)
+    :param w: total width of vertical circulation elements
+    :param r_up: upstairs flow, passed from plat_clearance_arr
+    :param flow_curve: the stair flow curve to use instead of the model's formula,
+    see `flowcurve`
+    :return: platform ingress rates on stairs
+    """
+    curve = (111 * m - 162) / (m**2) if flow_curve is None else flow_curve(1 / m)
+    rate = np.minimum(
+        kdep,
+        np.minimum(
+            np.maximum(0, 12 * w / 60 - r_up),
+            np.maximum(0, curve - r_up),
+        ),
+    )
+    return np.where(kdep > 0, rate, 0.0)
+
+
+def boarder_frac_arr(
+    trainA_boarders: FloatArray, trainB_boarders: FloatArray
+) -> FloatArray:
+    """Array version of `model.boarder_frac_fn`."""
+    total = trainB_boarders + trainA_boarders
+    return np.divide(
+        trainA_boarders,
+        total,
+        out=np.ones_like(total),
+        where=trainA_boarders + trainB_boarders > 0,
+    )
+
+
+def board_rate_arr(
+    r_max: FloatArray,
+    r_off: FloatArray,
+    sim_t: float,
+    arr_t: FloatArray,
+    dep_t: FloatArray,
+    boarders: FloatArray,
+) -> FloatArray:
+    """
+    Array version of `model.board_rate_fn`.
+
+    :param r_max: maximum train board rates (1 pax/door/s)
+    :param r_off: train alight rates, pass alight_rate_arr
+    :param sim_t: time in seconds, pass counter
+    :param arr_t: train arrival times
+    :param dep_t: train departure times
+    :param boarders: number of passengers waiting on platform to board
+    :return: train ingress rates across all doors (pax/s)
+    """
+    return np.where(
+        (arr_t < sim_t) & (sim_t < dep_t), np.minimum(r_max - r_off, boarders), 0.0
+    )
+
+
+def space_per_pax_arr(k: FloatArray, a: FloatArray) -> FloatArray:
+    """Array version of `model.space_per_pax_fn`."""
+    return np.divide(a, k, out=np.array(a, dtype=np.float64), where=k > 0)
+
+
+def batchable(params: Params) -> bool:
+    """Whether `params` can be simulated by `simulate_batch`."""
+    return params.dt == 1
+
+
+@dataclass
+class BatchParams:
+    """
+    The numeric fields of many `Params` as structure-of-arrays,
+    with one entry per scenario.
+    """
+
+    simulation_time: NDArray[np.int64]
+    eff_area: FloatArray
+    train1_arriving_pax: FloatArray
+    train2_arriving_pax: FloatArray
+    train1_departing_pax: FloatArray
+    train2_departing_pax: FloatArray
+    train1_doors: FloatArray
+    train2_doors: FloatArray
+    train1_arrival_time: FloatArray
+    train2_arrival_time: FloatArray
+    queue_length: FloatArray
+    total_vce_width: FloatArray
+    train1_boarding_pax: FloatArray
+    train2_boarding_pax: FloatArray
+
+    @classmethod
+    def from_params(cls, params: Sequence[Params]) -> "BatchParams":
+        """
+        Gather the fields of `params`, which must all use 1 s time steps
+        (see `batchable`).
+        """
+        for p in params:
+            if not batchable(p):
+                raise ValueError(
+                    f"{p.filename_prefix}: batches only support 1 s time steps, "
+                    f"got dt={p.dt}"
+                )
+
+        def column(name: str) -> FloatArray:
+            return np.array([getattr(p, name) for p in params], dtype=np.float64)
+
+        return cls(
+            simulation_time=np.array(
+                [p.simulation_time for p in params], dtype=np.int64
+            ),
+            eff_area=np.array([p.eff_area for p in params], dtype=np.float64),
+            train1_arriving_pax=column("train1_arriving_pax"),
+            train2_arriving_pax=column("train2_arriving_pax"),
+            train1_departing_pax=column("train1_departing_pax"),
+            train2_departing_pax=column("train2_departing_pax"),
+            train1_doors=column("train1_doors"),
+            train2_doors=column("train2_doors"),
+            train1_arrival_time=column("train1_arrival_time"),
+            train2_arrival_time=column("train2_arrival_time"),
+            queue_length=column("queue_length"),
+            total_vce_width=column("total_vce_width"),
+            train1_boarding_pax=column("train1_boarding_pax"),
+            train2_boarding_pax=column("train2_boarding_pax"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.simulation_time)
+
+    def take(
+        self, index: slice | NDArray[np.bool_] | NDArray[np.intp]
+    ) -> "BatchParams":
+        """The scenarios selected by `index`, as a new batch."""
+        return BatchParams(
+            **{field.name: getattr(self, field.name)[index] for field in fields(self)}
+        )
+
+
+@dataclass
+class BatchState:
+    """The counters of the time-step loop, one entry per scenario."""
+
+    train1_remaining_arrivals: FloatArray
+    train2_remaining_arrivals: FloatArray
+    train1_new_pax: FloatArray
+    train2_new_pax: FloatArray
+    train1_boarders_upstairs: FloatArray
+    train2_boarders_upstairs: FloatArray
+    train1_boarders_on_plat: FloatArray
+    train2_boarders_on_plat: FloatArray
+    arrived_pax_waiting_on_plat: FloatArray
+    total_pax_on_platform: FloatArray
+
+    @classmethod
+    def initial(cls, bp: BatchParams) -> "BatchState":
+        train1_boarders_on_plat = bp.train1_boarding_pax.copy()
+        train2_boarders_on_plat = bp.train2_boarding_pax.copy()
+        return cls(
+            train1_remaining_arrivals=bp.train1_arriving_pax.copy(),
+            train2_remaining_arrivals=bp.train2_arriving_pax.copy(),
+            train1_new_pax=np.zeros(len(bp)),
+            train2_new_pax=np.zeros(len(bp)),
+            train1_boarders_upstairs=bp.train1_departing_pax - bp.train1_boarding_pax,
+            train2_boarders_upstairs=bp.train2_departing_pax - bp.train2_boarding_pax,
+            train1_boarders_on_plat=train1_boarders_on_plat,
+            train2_boarders_on_plat=train2_boarders_on_plat,
+            arrived_pax_waiting_on_plat=np.zeros(len(bp)),
+            total_pax_on_platform=train1_boarders_on_plat + train2_boarders_on_plat,
+        )
+
+    def take(self, index: slice | NDArray[np.bool_] | NDArray[np.intp]) -> "BatchState":
+        """The counters of the scenarios selected by `index`."""
+        return BatchState(
+            **{field.name: getattr(self, field.name)[index] for field in fields(self)}
+        )
+
+
+@dataclass
+class BatchStep:
+    """
+    The flow rates (pax/s) and crowding computed during one time step,
+    one entry per scenario.
+    """
+
+    train1_off_rate: FloatArray
+    train2_off_rate: FloatArray
+    train1_on_rate: FloatArray
+    train2_on_rate: FloatArray
+    plat_ingress_rate_1: FloatArray
+    plat_ingress_rate_2: FloatArray
+    plat_egress_rate: FloatArray
+    inst_crowding: FloatArray
+
+
+def advance_batch(
+    bp: BatchParams,
+    state: BatchState,
+    time_after: int,
+    concourse_space: FloatArray | None = None,
+    flow_curve: "FlowCurve | None" = None,
+) -> BatchStep:
+    """
+    Advance every scenario in `state` by one second, in place.
+
+    This does the same arithmetic in the same order as the loop in
+    `model.simulate`, so the results match it up to floating-point rounding.
+
+    :param bp: the scenarios being simulated
+    :param state: the counters at `time_after`, updated in place
+    :param time_after: the current time (s)
+    :param concourse_space: the space per passenger (sqft) upstairs
+    that limits the downstairs flow of each scenario; by default each
+    train's boarders have a 5000 sqft concourse to themselves
+    :param flow_curve: the stair flow curve to use instead of the model's formula,
+    see `flowcurve`
+    :return: the flow rates and crowding during this time step
+    """
+    s = state
+    train1_off_rate = alight_rate_arr(
+        s.train1_remaining_arrivals,
+        time_after,
+        bp.train1_arrival_time,
+        bp.train1_doors,
+    )
+    s.train1_remaining_arrivals = np.maximum(
+        s.train1_remaining_arrivals - train1_off_rate, 0
+    )
+    train2_off_rate = alight_rate_arr(
+        s.train2_remaining_arrivals,
+        time_after,
+        bp.train2_arrival_time,
+        bp.train2_doors,
+    )
+    s.train2_remaining_arrivals = np.maximum(
+        s.train2_remaining_arrivals - train2_off_rate, 0
+    )
+    s.total_pax_on_platform = s.total_pax_on_platform + (
+        train1_off_rate + train2_off_rate
+    )
+    s.arrived_pax_waiting_on_plat = s.arrived_pax_waiting_on_plat + (
+        train1_off_rate + train2_off_rate
+    )
+    plat_egress_rate = np.minimum(
+        plat_clearance_arr(
+            s.arrived_pax_waiting_on_plat,
+            bp.eff_area,
+            bp.total_vce_width,
+            bp.total_vce_width * bp.queue_length / 5,
+            flow_curve,
+        ),
+        s.arrived_pax_waiting_on_plat,
+    )
+    s.arrived_pax_waiting_on_plat = np.maximum(
+        s.arrived_pax_waiting_on_plat - plat_egress_rate, 0
+    )
+    s.total_pax_on_platform = s.total_pax_on_platform - plat_egress_rate
+    if concourse_space is None:
+        space_1 = np.divide(5000, np.maximum(1, s.train1_boarders_upstairs))
+        space_2 = np.divide(5000, np.maximum(1, s.train2_boarders_upstairs))
+    else:
+        space_1 = space_2 = concourse_space
+    plat_ingress_rate_1 = ingress_at_space_arr(
+        s.train1_boarders_upstairs,
+        space_1,
+        bp.total_vce_width
+        * boarder_frac_arr(s.train1_boarders_upstairs, s.train2_boarders_upstairs),
+        plat_egress_rate,
+        flow_curve,
+    )
+    plat_ingress_rate_2 = ingress_at_space_arr(
+        s.train2_boarders_upstairs,
+        space_2,
+        bp.total_vce_width
+        * boarder_frac_arr(s.train2_boarders_upstairs, s.train1_boarders_upstairs),
+        plat_egress_rate,
+        flow_curve,
+    )
+    s.train1_boarders_on_plat = s.train1_boarders_on_plat + plat_ingress_rate_1
+    s.train2_boarders_on_plat = s.train2_boarders_on_plat + plat_ingress_rate_2
+    s.total_pax_on_platform = s.total_pax_on_platform + plat_ingress_rate_1
+    s.total_pax_on_platform = s.total_pax_on_platform + plat_ingress_rate_2
+    simulation_time = bp.simulation_time.astype(np.float64)
+    train1_on_rate = board_rate_arr(
+        bp.train1_doors,
+        train1_off_rate,
+        time_after,
+        bp.train1_arrival_time,
+        simulation_time,
+        s.train1_boarders_on_plat,
+    )
+    train2_on_rate = board_rate_arr(
+        bp.train2_doors,
+        train2_off_rate,
+        time_after,
+        bp.train2_arrival_time,
+        simulation_time,
+        s.train2_boarders_on_plat,
+    )
+    s.train1_boarders_on_plat = s.train1_boarders_on_plat - train1_on_rate
+    s.train2_boarders_on_plat = s.train2_boarders_on_plat - train2_on_rate
+    s.total_pax_on_platform = s.total_pax_on_platform - train1_on_rate
+    s.total_pax_on_platform = s.total_pax_on_platform - train2_on_rate
+    s.train1_boarders_upstairs = s.train1_boarders_upstairs - plat_ingress_rate_1
+    s.train2_boarders_upstairs = s.train2_boarders_upstairs - plat_ingress_rate_2
+    s.train1_new_pax = s.train1_new_pax + train1_on_rate
+    s.train2_new_pax = s.train2_new_pax + train2_on_rate
+
+    inst_crowding = space_per_pax_arr(s.total_pax_on_platform, bp.eff_area)
+    s.total_pax_on_platform = np.maximum(s.total_pax_on_platform, 0)
+    s.train1_boarders_on_plat = np.maximum(s.train1_boarders_on_plat, 0)
+    s.train2_boarders_on_plat = np.maximum(s.train2_boarders_on_plat, 0)
+    s.arrived_pax_waiting_on_plat = np.maximum(s.arrived_pax_waiting_on_plat, 0)
+
+    return BatchStep(
+        train1_off_rate=train1_off_rate,
+        train2_off_rate=train2_off_rate,
+        train1_on_rate=train1_on_rate,
+        train2_on_rate=train2_on_rate,
+        plat_ingress_rate_1=plat_ingress_rate_1,
+        plat_ingress_rate_2=plat_ingress_rate_2,
+        plat_egress_rate=plat_egress_rate,
+        inst_crowding=inst_crowding,
+    )
+
+
+@dataclass
+class BatchResult:
+    """
+    The per-second output of `simulate_batch`.
+
+    Every array has shape (scenarios, seconds), where the number of seconds is
+    the longest `simulation_time` in the batch. Entries past a scenario's own
+    `simulation_time` are not meaningful; use `scenario` to get one scenario's
+    results trimmed to its own length.
+    """
+
+    simulation_time: NDArray[np.int64]
+    eff_area: FloatArray
+    total_vce_width: FloatArray
+    train1_pax: FloatArray
+    train2_pax: FloatArray
+    train1_off_rate: FloatArray
+    train2_off_rate: FloatArray
+    train1_on_rate: FloatArray
+    train2_on_rate: FloatArray
+    down_rate: FloatArray
+    up_rate: FloatArray
+    departing_pax_on_plat_1: FloatArray
+    departing_pax_on_plat_2: FloatArray
+    arrived_pax_waiting_on_plat: FloatArray
+    total_pax_on_platform: FloatArray
+    inst_crowding: FloatArray
+    net_pax_flow_rate: FloatArray
+
+    @classmethod
+    def empty(cls, bp: BatchParams) -> "BatchResult":
+        """Allocate the results of simulating `bp`, to be filled in by `record`."""
+        shape = (len(bp), int(bp.simulation_time.max(initial=0)))
+
+        def empty() -> FloatArray:
+            return np.empty(shape)
+
+        return cls(
+            simulation_time=bp.simulation_time.copy(),
+            eff_area=bp.eff_area.copy(),
+            total_vce_width=bp.total_vce_width.copy(),
+            train1_pax=empty(),
+            train2_pax=empty(),
+            train1_off_rate=empty(),
+            train2_off_rate=empty(),
+            train1_on_rate=empty(),
+            train2_on_rate=empty(),
+            down_rate=empty(),
+            up_rate=empty(),
+            departing_pax_on_plat_1=empty(),
+            departing_pax_on_plat_2=empty(),
+            arrived_pax_waiting_on_plat=empty(),
+            total_pax_on_platform=empty(),
+            inst_crowding=empty(),
+            net_pax_flow_rate=empty(),
+        )
+
+    @property
+    def seconds(self) -> int:
+        """The number of seconds simulated, the longest `simulation_time`."""
+        return self.train1_pax.shape[1]
+
+    def record(self, time_after: int, s: BatchState, step: BatchStep) -> None:
+        """Store the counters and rates of every scenario after `time_after`."""
+        self.train1_pax[:, time_after] = s.train1_remaining_arrivals + s.train1_new_pax
+        self.train2_pax[:, time_after] = s.train2_remaining_arrivals + s.train2_new_pax
+        self.arrived_pax_waiting_on_plat[:, time_after] = s.arrived_pax_waiting_on_plat
+        self.train1_off_rate[:, time_after] = step.train1_off_rate
+        self.train2_off_rate[:, time_after] = step.train2_off_rate
+        self.train1_on_rate[:, time_after] = step.train1_on_rate
+        self.train2_on_rate[:, time_after] = step.train2_on_rate
+        self.down_rate[:, time_after] = (
+            step.plat_ingress_rate_1 + step.plat_ingress_rate_2
+        )
+        self.departing_pax_on_plat_1[:, time_after] = s.train1_boarders_on_plat
+        self.departing_pax_on_plat_2[:, time_after] = s.train2_boarders_on_plat
+        self.total_pax_on_platform[:, time_after] = s.total_pax_on_platform
+        self.inst_crowding[:, time_after] = step.inst_crowding
+        self.up_rate[:, time_after] = step.plat_egress_rate
+        self.net_pax_flow_rate[:, time_after] = (
+            step.plat_ingress_rate_1
+            + step.plat_ingress_rate_2
+            + step.train1_off_rate
+            + step.train2_off_rate
+            - step.plat_egress_rate
+            - step.train1_on_rate
+            - step.train2_on_rate
+        )
+
+    def __len__(self) -> int:
+        return len(self.simulation_time)
+
+    def los_codes(self) -> tuple[GradeCodes, GradeCodes]:
+        """The platform crowding and egress grade codes of every scenario and second."""
+        return (
+            plat_crowd_codes(self.inst_crowding),
+            egress_codes(self.total_vce_width[:, np.newaxis], self.up_rate),
+        )
+
+    def time_in_grade(self) -> tuple[NDArray[np.int64], NDArray[np.int64]]:
+        """
+        The seconds each scenario spends in each platform crowding
+        and egress grade, each of shape (scenarios, len(los.GRADES)).
+        """
+        plat_crowd, egress = self.los_codes()
+        return (
+            time_in_grade(plat_crowd, self.simulation_time),
+            time_in_grade(egress, self.simulation_time),
+        )
+
+    def scenario(self, i: int) -> SimulationResult:
+        """The results of scenario `i` in the same form as `model.simulate`."""
+        n = int(self.simulation_time[i])
+        inst_crowding = self.inst_crowding[i, :n].copy()
+        up_rate = self.up_rate[i, :n].copy()
+        w = float(self.total_vce_width[i])
+        return SimulationResult(
+            time_after=np.arange(n, dtype=np.int64),
+            train1_pax=self.train1_pax[i, :n].copy(),
+            train2_pax=self.train2_pax[i, :n].copy(),
+            train1_off_rate=self.train1_off_rate[i, :n].copy(),
+            train2_off_rate=self.train2_off_rate[i, :n].copy(),
+            train1_on_rate=self.train1_on_rate[i, :n].copy(),
+            train2_on_rate=self.train2_on_rate[i, :n].copy(),
+            down_rate=self.down_rate[i, :n].copy(),
+            up_rate=up_rate,
+            departing_pax_on_plat_1=self.departing_pax_on_plat_1[i, :n].copy(),
+            departing_pax_on_plat_2=self.departing_pax_on_plat_2[i, :n].copy(),
+            arrived_pax_waiting_on_plat=self.arrived_pax_waiting_on_plat[i, :n].copy(),
+            total_pax_on_platform=self.total_pax_on_platform[i, :n].copy(),
+            inst_crowding=inst_crowding,
+            net_pax_flow_rate=self.net_pax_flow_rate[i, :n].copy(),
+            plat_crowd_los=grade_letters(plat_crowd_codes(inst_crowding)),
+            egress_los=grade_letters(egress_codes(w, up_rate)),
+        )
+
+
+def simulate_batch(
+    params: Sequence[Params] | BatchParams, flow_curve: "FlowCurve | None" = None
+) -> BatchResult:
+    """
+    Run the time-step loop for many scenarios at once.
+
+    :param params: the scenarios to simulate
+    :param flow_curve: the stair flow curve to use instead of the model's formula,
+    see `flowcurve`
+    :return: the per-second results of every scenario
+    """
+    bp = params if isinstance(params, BatchParams) else BatchParams.from_params(params)
+    result = BatchResult.empty(bp)
+    state = BatchState.initial(bp)
+    for time_after in range(result.seconds):
+        step = advance_batch(bp, state, time_after, flow_curve=flow_curve)
+        result.record(time_after, state, step)
+    return result
@@ -0,0 +1,169 @@
+"""
+An on-disk cache of simulation results, keyed by the scenario parameters.
+
+Each result is stored as an `.npz` file named after a hash of every field of
+`Params` that affects the simulation, plus `model.MODEL_VERSION`. The cache
+is bounded in size, evicting the least recently used results first.
+"""
+
+import dataclasses
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from .export import load_npz, save_npz
+from .model import MODEL_VERSION, Params, SimulationResult
+
+DEFAULT_MAX_BYTES = 1 << 30
+"""Default cache size limit (1 GiB)."""
+
+_IGNORED_FIELDS = {"filename_prefix"}
+"""`Params` fields that only affect where output is saved, not the results."""
+
+
+def default_cache_dir() -> Path:
+    """
+    The cache directory used by default,
+    `$PLATFORM_CROWD_MODEL_CACHE_DIR` or else `$XDG_CACHE_HOME/platform_crowd_model`.
+    """
+    if directory := os.environ.get("PLATFORM_CROWD_MODEL_CACHE_DIR"):
+        return Path(directory)
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "platform_crowd_model"
+
+
+def params_key(params: Params, version: str = MODEL_VERSION) -> str:
+    """
+    A stable hash of `params` and the model version.
+
+    Numbers are hashed by value, so `42` and `42.0` give the same key,
+    and `vce_widths` is hashed by its shape and contents.
+    `filename_prefix` is ignored since it doesn't change the results.
+    """
+    h = hashlib.sha256()
+    h.update(f"version={version}\n".encode())
+    for field in sorted(dataclasses.fields(params), key=lambda f: f.name):
+        if field.name in _IGNORED_FIELDS:
+            continue
+        value = getattr(params, field.name)
+        h.update(f"{field.name}=".encode())
+        if isinstance(value, np.ndarray):
+            array = np.ascontiguousarray(value, dtype=np.float64)
+            h.update(f"array{array.shape}:".encode())
+            h.update(array.tobytes())
+        elif isinstance(value, (int, float)):
+            h.update(float(value).hex().encode())
+        else:
+            h.update(repr(value).encode())
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    A size-bounded, least-recently-used cache of `SimulationResult`s on disk.
+
+    It is safe to share one cache directory between processes:
+    entries are written atomically, and a missing entry is just a miss.
+    """
+
+    def __init__(
+        self, directory: str | Path | None = None, max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        """
+        :param directory: where to store results, defaults to `default_cache_dir()`
+        :param max_bytes: evict results once the cache grows beyond this size
+        """
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.max_bytes = max_bytes
+
+    def path(self, params: Params) -> Path:
+        """The file the result of `params` is stored in."""
+        return self.directory / f"{params_key(params)}.npz"
+
+    def get(self, params: Params) -> SimulationResult | None:
+        """The stored result of `params`, or `None` if it isn't cached."""
+        path = self.path(params)
+        try:
+            result = load_npz(path)
+            # The modification time records when the entry was last used.
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return result
+
+    def put(self, params: Params, result: SimulationResult, evict: bool = True) -> None:
+        """
+        Store the result of `params`.
+
+        :param params: the scenario that was simulated
+        :param result: its result
+        :param evict: evict old results if the cache is now too big;
+        when storing many results, pass `False` and call `evict` once at the end
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                save_npz(result, f)
+            os.replace(tmp, self.path(params))
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        if evict:
+            self.evict()
+
+    def entries(self) -> list[Path]:
+        """The stored results, least recently used first."""
+        entries: list[tuple[float, Path]] = []
+        for path in self.directory.glob("*.npz"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                pass
+        return [path for _, path in sorted(entries)]
+
+    def size_bytes(self) -> int:
+        """The total size of the stored results."""
+        return sum(_size(path) for path in self.entries())
+
+    def evict(self, max_bytes: int | None = None) -> int:
+        """
+        Remove the least recently used results until the cache fits in `max_bytes`.
+
+        :param max_bytes: the size to shrink to, defaults to `self.max_bytes`
+        :return: the number of results removed
+        """
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        entries = self.entries()
+        total = sum(_size(path) for path in entries)
+        removed = 0
+        for path in entries:
+            if total <= max_bytes:
+                break
+            total -= _size(path)
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def invalidate(self, params: Params) -> bool:
+        """Remove the result of `params`, returning whether it was cached."""
+        path = self.path(params)
+        existed = path.exists()
+        path.unlink(missing_ok=True)
+        return existed
+
+    def clear(self) -> int:
+        """Remove every stored result, returning how many were removed."""
+        return self.evict(max_bytes=0)
+
+
+def _size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
@@ -0,0 +1,351 @@
+"""
+Calibration of uncertain model constants against observed time series,
+such as platform or stair counts from sensors.
+
+Candidate parameter sets are simulated together through the batch engine,
+keeping only the observed columns at the observed times. The search is a
+compass (pattern) search in the unit cube of the parameter bounds, started
+from many random points at once: every iteration probes each coordinate
+direction of every start in one batch, and the starts can be split across
+worker processes.
+"""
+
+import csv
+import dataclasses
+import functools
+import math
+import os
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .batch import BatchParams, BatchState, FloatArray, advance_batch
+from .model import Params
+from .sweep import map_scenarios
+
+DEFAULT_BOUNDS: dict[str, tuple[float, float]] = {
+    "queue_length": (5, 40),
+    "usable_platform_area_multiplier": (0.4, 1),
+    "door_rate": (0.5, 1.5),
+}
+"""
+The parameters that can be calibrated and their default bounds. `door_rate`
+is the alight and board rate (pax/door/s) that `model.alight_rate_fn` takes as 1.
+"""
+
+OBSERVABLE_COLUMNS = (
+    "total_pax_on_platform",
+    "arrived_pax_waiting_on_plat",
+    "inst_crowding",
+    "up_rate",
+    "down_rate",
+)
+"""The `SimulationResult` columns that can be observed."""
+
+DEFAULT_STARTS = 16
+"""Number of starting points of the search by default."""
+
+DEFAULT_TOLERANCE = 1e-3
+"""Step size, as a share of each parameter's range, at which a search stops."""
+
+MAX_ITERATIONS = 200
+"""Most iterations of each search."""
+
+
+@dataclass
+class Observations:
+    """Observed time series of one scenario."""
+
+    time_after: NDArray[np.int64]
+    """The seconds observed."""
+
+    columns: dict[str, FloatArray]
+    """The observed values of each column at those seconds, NaN where missing."""
+
+
+def read_observations(path: str | Path) -> Observations:
+    """
+    Read observations from a CSV file with a `time_after` column (s) and
+    any of the `OBSERVABLE_COLUMNS`; empty cells are missing values.
+    """
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        names = [name for name in reader.fieldnames or () if name != "time_after"]
+        if "time_after" not in (reader.fieldnames or ()):
+            raise ValueError(f"{path}: missing column time_after")
+        unknown = set(names) - set(OBSERVABLE_COLUMNS)
+        if unknown:
+            raise ValueError(
+                f"{path}: cannot observe {', '.join(sorted(unknown))}, "
+                f"expected any of {', '.join(OBSERVABLE_COLUMNS)}"
+            )
+        rows = list(reader)
+    return Observations(
+        time_after=np.array([int(row["time_after"]) for row in rows], dtype=np.int64),
+        columns={
+            name: np.array(
+                [float(row[name]) if row[name] else math.nan for row in rows],
+                dtype=np.float64,
+            )
+            for name in names
+        },
+    )
+
+
+def apply_parameters(
+    bp: BatchParams, base: Params, names: Sequence[str], values: FloatArray
+) -> None:
+    """
+    Set the calibrated parameters of every scenario of `bp`, in place.
+
+    :param bp: a batch of copies of `base`
+    :param base: the scenario being calibrated
+    :param names: the parameters, see `DEFAULT_BOUNDS`
+    :param values: their values, of shape (scenarios, parameters)
+    """
+    for i, name in enumerate(names):
+        column: FloatArray = values[:, i]
+        match name:
+            case "queue_length":
+                bp.queue_length = column.copy()
+            case "usable_platform_area_multiplier":
+                bp.eff_area = base.platform_width * base.platform_length * column
+            case "door_rate":
+                bp.train1_doors = column * base.train1_doors
+                bp.train2_doors = column * base.train2_doors
+            case _:
+                raise ValueError(
+                    f"cannot calibrate {name!r}, "
+                    f"expected one of {', '.join(DEFAULT_BOUNDS)}"
+                )
+
+
+def calibrated_params(base: Params, values: Mapping[str, float]) -> Params:
+    """`base` with calibrated parameter values."""
+    changes: dict[str, Any] = {}
+    for name, value in values.items():
+        if name == "door_rate":
+            changes["train1_doors"] = base.train1_doors * value
+            changes["train2_doors"] = base.train2_doors * value
+        else:
+            changes[name] = value
+    return dataclasses.replace(base, **changes)
+
+
+def squared_errors(
+    base: Params,
+    observations: Observations,
+    names: Sequence[str],
+    values: FloatArray,
+) -> FloatArray:
+    """
+    Simulate candidate parameter sets as one batch and compare them with
+    the observations.
+
+    :param base: the scenario being calibrated
+    :param observations: the observed time series
+    :param names: the parameters being calibrated
+    :param values: the candidate values, of shape (candidates, parameters)
+    :return: the mean squared error of each observed column,
+    of shape (candidates, columns)
+    """
+    k = len(values)
+    seconds = int(observations.time_after.max(initial=-1)) + 1
+    single = BatchParams.from_params(
+        [dataclasses.replace(base, simulation_time=seconds)]
+    )
+    bp = single.take(np.zeros(k, dtype=np.intp))
+    apply_parameters(bp, base, names, values)
+
+    observed_at: dict[int, list[int]] = {}
+    for j, t in enumerate(observations.time_after):
+        observed_at.setdefault(int(t), []).append(j)
+    columns = list(observations.columns)
+    simulated = np.empty((k, len(columns), len(observations.time_after)))
+
+    state = BatchState.initial(bp)
+    for time_after in range(seconds):
+        step = advance_batch(bp, state, time_after)
+        if time_after not in observed_at:
+            continue
+        current = {
+            "total_pax_on_platform": state.total_pax_on_platform,
+            "arrived_pax_waiting_on_plat": state.arrived_pax_waiting_on_plat,
+            "inst_crowding": step.inst_crowding,
+            "up_rate": step.plat_egress_rate,
+            "down_rate": step.plat_ingress_rate_1 + step.plat_ingress_rate_2,
+        }
+        for c, name in enumerate(columns):
+            simulated[:, c, observed_at[time_after]] = current[name][:, np.newaxis]
+
+    observed = np.stack([observations.columns[name] for name in columns])
+    errors = np.where(np.isnan(observed), 0.0, (simulated - observed) ** 2)
+    counts = np.maximum(np.count_nonzero(~np.isnan(observed), axis=-1), 1)
+    mse: FloatArray = errors.sum(axis=-1) / counts
+    return mse
+
+
+@dataclass
+class SearchResult:
+    """The result of one start of the search."""
+
+    start: dict[str, float]
+    """The starting parameter values."""
+
+    values: dict[str, float]
+    """The best parameter values found."""
+
+    loss: float
+    """The sum over the observed columns of their mean squared errors."""
+
+    evaluations: int
+    """Number of simulations this start took."""
+
+
+@dataclass
+class CalibrationResult:
+    """The output of `calibrate`."""
+
+    values: dict[str, float]
+    """The best parameter values found."""
+
+    loss: float
+    """The sum over the observed columns of their mean squared errors."""
+
+    rmse: dict[str, float]
+    """The root mean squared error of each observed column."""
+
+    searches: list[SearchResult]
+    """The result of every start, best first."""
+
+    @property
+    def evaluations(self) -> int:
+        """Number of simulations the calibration took."""
+        return sum(s.evaluations for s in self.searches)
+
+
+def _search(
+    starts: Sequence[tuple[float, ...]],
+    base: Params,
+    observations: Observations,
+    bounds: Mapping[str, tuple[float, float]],
+    tolerance: float,
+) -> list[SearchResult]:
+    """Compass search from each of `starts` (in the unit cube), all in one batch."""
+    names = list(bounds)
+    low = np.array([bounds[name][0] for name in names], dtype=np.float64)
+    span = np.array([bounds[name][1] for name in names], dtype=np.float64) - low
+    d = len(names)
+
+    def losses(unit: FloatArray) -> FloatArray:
+        total: FloatArray = squared_errors(
+            base, observations, names, low + unit * span
+        ).sum(axis=-1)
+        return total
+
+    x = np.array(starts, dtype=np.float64).reshape(len(starts), d)
+    x0 = x.copy()
+    loss = losses(x)
+    step = np.full(len(x), 0.25)
+    evaluations = np.ones(len(x), dtype=np.int64)
+    directions = np.concatenate([np.eye(d), -np.eye(d)])
+
+    for _ in range(MAX_ITERATIONS):
+        active = np.flatnonzero(step >= tolerance)
+        if not len(active):
+            break
+        # Every coordinate direction of every active start, in one batch.
+        probes = np.clip(
+            x[active, np.newaxis] + step[active, np.newaxis, np.newaxis] * directions,
+            0,
+            1,
+        )
+        probe_loss = losses(probes.reshape(-1, d)).reshape(len(active), len(directions))
+        evaluations[active] += len(directions)
+        best = probe_loss.argmin(axis=1)
+        best_loss = probe_loss[np.arange(len(active)), best]
+        improved = best_loss < loss[active]
+        moved = active[improved]
+        x[moved] = probes[improved, best[improved]]
+        loss[moved] = best_loss[improved]
+        step[active[~improved]] /= 2
+
+    def point(unit: FloatArray) -> dict[str, float]:
+        return {name: float(v) for name, v in zip(names, low + unit * span)}
+
+    return [
+        SearchResult(
+            start=point(x0[i]),
+            values=point(x[i]),
+            loss=float(loss[i]),
+            evaluations=int(evaluations[i]),
+        )
+        for i in range(len(x))
+    ]
+
+
+def calibrate(
+    base: Params,
+    observations: Observations,
+    bounds: Mapping[str, tuple[float, float]] = DEFAULT_BOUNDS,
+    *,
+    starts: int = DEFAULT_STARTS,
+    seed: int | None = None,
+    tolerance: float = DEFAULT_TOLERANCE,
+    workers: int | None = 1,
+) -> CalibrationResult:
+    """
+    Fit parameters of a scenario to observations by minimizing the sum over
+    the observed columns of their mean squared errors.
+
+    :param base: the scenario to calibrate, which must use 1 s time steps
+    :param observations: the observed time series
+    :param bounds: the parameters to fit and their bounds, see `DEFAULT_BOUNDS`
+    :param starts: number of random starting points of the search
+    :param seed: seed of the random starting points
+    :param tolerance: step size, as a share of each parameter's range,
+    at which a search stops
+    :param workers: number of worker processes to split the starts across,
+    `None` for the number of CPUs
+    :return: the best parameters found and the result of every start
+    """
+    for name in bounds:
+        if name not in DEFAULT_BOUNDS:
+            raise ValueError(
+                f"cannot calibrate {name!r}, expected one of {', '.join(DEFAULT_BOUNDS)}"
+            )
+    if starts < 1:
+        raise ValueError(f"starts must be positive, got {starts}")
+    rng = np.random.default_rng(seed)
+    points = [tuple(float(v) for v in p) for p in rng.random((starts, len(bounds)))]
+    searches = map_scenarios(
+        functools.partial(
+            _search,
+            base=base,
+            observations=observations,
+            bounds=dict(bounds),
+            tolerance=tolerance,
+        ),
+        points,
+        workers=workers,
+        chunk_size=math.ceil(starts / (workers or os.cpu_count() or 1)),
+    )
+    searches.sort(key=lambda s: s.loss)
+    best = searches[0]
+    names = list(bounds)
+    mse = squared_errors(
+        base,
+        observations,
+        names,
+        np.array([[best.values[name] for name in names]], dtype=np.float64),
+    )[0]
+    return CalibrationResult(
+        values=best.values,
+        loss=best.loss,
+        rmse={name: float(np.sqrt(e)) for name, e in zip(observations.columns, mse)},
+        searches=searches,
+    )
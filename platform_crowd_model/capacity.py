@@ -0,0 +1,190 @@
+"""
+Capacity envelopes: for each train load, the shortest headway at which a
+platform keeps up with trains arriving one after another.
+
+A headway is sustainable if everyone off a train has left the platform before
+the next train arrives, without the space per passenger dropping below a
+threshold on the way. The platform isn't back where it started once it is
+clear, since the first train's boarders may still be coming down the stairs,
+so each headway is tested with a second train arriving at it: it is
+sustainable if that train's passengers clear within the same headway.
+
+The first candidate headway is the time the first train's passengers take to
+clear. When the second train's take longer, that time is the next candidate,
+and so on until a candidate is sustainable or longer than `max_headway`.
+Every platform and load still to settle runs together as one batch per round,
+and each scenario drops out of it as soon as the second train's passengers
+clear, the platform gets too crowded or the headway passes `max_headway`.
+"""
+
+import dataclasses
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .batch import BatchParams, BatchState, FloatArray, advance_batch
+from .model import Params, is_clear
+
+DEFAULT_MIN_SPACE = 5
+"""Least space per passenger (sqft) allowed by default, the limit of LOS E."""
+
+DEFAULT_MAX_HEADWAY = 1800
+"""Longest headway (s) considered by default."""
+
+
+@dataclass
+class CapacityCurve:
+    """The capacity envelope of one platform, with one entry per load."""
+
+    loads: FloatArray
+    """Passengers arriving on each train."""
+
+    headway: FloatArray
+    """
+    Shortest sustainable headway (s), NaN where the platform gets too crowded
+    or doesn't clear within the longest headway considered.
+    """
+
+    min_inst_crowding: FloatArray
+    """
+    Least space per passenger (sqft) at the last headway tried, until the
+    second train's passengers cleared or the platform failed.
+    """
+
+    @property
+    def trains_per_hour(self) -> FloatArray:
+        """Most trains per hour the platform can sustain, 0 where it can't keep up."""
+        tph: FloatArray = np.nan_to_num(3600 / self.headway, nan=0.0)
+        return tph
+
+
+def repeated_arrivals(platform: Params, load: int, max_headway: int) -> Params:
+    """
+    Two trains of a repeated pattern: `load` passengers arriving on each, the
+    first at time 0 with the departing passengers of `platform`'s train 1, and
+    the second, with no departing passengers of its own, at a headway set by
+    `capacity_envelope` while simulating.
+    """
+    return dataclasses.replace(
+        platform,
+        simulation_time=2 * max_headway,
+        train1_arriving_pax=load,
+        train1_arrival_time=0,
+        train2_arriving_pax=load,
+        train2_arrival_time=2 * max_headway,
+        train2_departing_pax=0,
+        train2_boarding_pax=0,
+    )
+
+
+def _second_arrivals(
+    scenarios: Sequence[Params],
+    earliest: FloatArray,
+    min_space: float,
+    max_headway: int,
+) -> tuple[FloatArray, FloatArray, FloatArray]:
+    """
+    Simulate `repeated_arrivals` scenarios, with each second train arriving at
+    its `earliest` time, or as soon as the first train's passengers have
+    cleared after it.
+
+    :return: the headway of the second train in each scenario, the time (s)
+    its passengers took to clear, and the least space per passenger (sqft)
+    until then; the times are NaN where the platform got too crowded or took
+    longer than `max_headway`
+    """
+    n = len(scenarios)
+    headway = np.full(n, np.nan)
+    clear_time = np.full(n, np.nan)
+    min_inst_crowding = np.array([p.eff_area for p in scenarios], dtype=np.float64)
+
+    bp = BatchParams.from_params(scenarios)
+    state = BatchState.initial(bp)
+    running: NDArray[np.intp] = np.arange(n)
+    for time_after in range(2 * max_headway):
+        if not len(running):
+            break
+        step = advance_batch(bp, state, time_after)
+        min_inst_crowding[running] = np.minimum(
+            min_inst_crowding[running], step.inst_crowding
+        )
+        crowded = step.inst_crowding < min_space
+        clear = is_clear(state.arrived_pax_waiting_on_plat)
+        arrived = ~np.isnan(headway[running])
+        arrives = (
+            ~arrived
+            & clear
+            & (state.train1_remaining_arrivals <= 0)
+            & (earliest[running] <= time_after + 1)
+        )
+        headway[running[arrives]] = time_after + 1
+        bp.train2_arrival_time[arrives] = time_after + 1
+        since = time_after + 1 - bp.train2_arrival_time
+        cleared = arrived & clear & (state.train2_remaining_arrivals <= 0)
+        clear_time[running[cleared & ~crowded]] = since[cleared & ~crowded]
+        late = np.where(arrived, since, time_after + 1) >= max_headway
+        done = crowded | cleared | (late & ~arrives)
+        if done.any():
+            keep = ~done
+            running = running[keep]
+            bp = bp.take(keep)
+            state = state.take(keep)
+    return headway, clear_time, min_inst_crowding
+
+
+def capacity_envelope(
+    platforms: Mapping[str, Params],
+    loads: Sequence[int],
+    *,
+    min_space: float = DEFAULT_MIN_SPACE,
+    max_headway: int = DEFAULT_MAX_HEADWAY,
+) -> dict[str, CapacityCurve]:
+    """
+    Find the shortest sustainable headway of each platform for each load.
+
+    :param platforms: the platforms, keyed by name; their train 2 is ignored,
+    see `repeated_arrivals`
+    :param loads: the passengers arriving on each train
+    :param min_space: least space per passenger (sqft) allowed
+    :param max_headway: longest headway (s) considered
+    :return: the capacity curve of each platform
+    """
+    scenarios = [
+        repeated_arrivals(p, load, max_headway)
+        for p in platforms.values()
+        for load in loads
+    ]
+    n = len(scenarios)
+    headway = np.full(n, np.nan)
+    min_inst_crowding = np.array([p.eff_area for p in scenarios], dtype=np.float64)
+
+    earliest = np.zeros(n)
+    unsettled: NDArray[np.intp] = np.arange(n)
+    while len(unsettled):
+        tried, clear_time, crowding = _second_arrivals(
+            [scenarios[i] for i in unsettled],
+            earliest[unsettled],
+            min_space,
+            max_headway,
+        )
+        min_inst_crowding[unsettled] = crowding
+        sustainable = clear_time <= tried
+        headway[unsettled[sustainable]] = tried[sustainable]
+        # Try again with the time the second train took to clear as the headway.
+        retry = clear_time > tried
+        earliest[unsettled[retry]] = clear_time[retry]
+        unsettled = unsettled[retry]
+
+    per_platform = len(loads)
+    return {
+        name: CapacityCurve(
+            loads=np.asarray(loads, dtype=np.float64),
+            headway=headway[i * per_platform : (i + 1) * per_platform],
+            min_inst_crowding=min_inst_crowding[
+                i * per_platform : (i + 1) * per_platform
+            ],
+        )
+        for i, name in enumerate(platforms)
+    }
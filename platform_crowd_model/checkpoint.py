@@ -0,0 +1,211 @@
+"""
+Snapshots of a run part way through, to branch what-if runs off a shared start.
+
+A `Checkpoint` holds the `model.ModelState` counters at some second along with
+the results up to it. `resume` carries on from a checkpoint to the end of the
+run, optionally with changes to inputs that only come into play after it, such
+as the load, doors or arrival time of a train that hasn't arrived yet, so the
+shared start of several what-if runs is only simulated once:
+
+    start = take_checkpoint(params, params.train2_arrival_time)
+    results = branch(start, [replace(params, train2_arriving_pax=n) for n in loads])
+
+The results are the same as simulating each variant from the start.
+"""
+
+import dataclasses
+import json
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO
+
+import numpy as np
+
+from .model import (
+    MODEL_VERSION,
+    ModelState,
+    Params,
+    SimulationResult,
+    SimulationStep,
+    advance,
+)
+
+TRAIN_FIELDS = ("arriving_pax", "doors", "arrival_time")
+"""
+The fields of each train, prefixed with `train1_` or `train2_`, that can change
+when resuming from a checkpoint taken no later than the train's arrival.
+"""
+
+FREE_FIELDS = ("filename_prefix", "simulation_time")
+"""The fields that can always change when resuming from a checkpoint."""
+
+
+@dataclass
+class Checkpoint:
+    """The state of a run at the start of second `time_after`."""
+
+    params: Params
+    """The scenario being simulated."""
+
+    time_after: int
+    """Number of seconds simulated so far."""
+
+    state: ModelState
+    """The counters at `time_after`."""
+
+    prefix: SimulationResult
+    """The results of the seconds before `time_after`."""
+
+    def save(self, path: str | Path | BinaryIO) -> None:
+        """Save the checkpoint as an uncompressed `.npz` archive."""
+        fields = {
+            field.name: getattr(self.params, field.name)
+            for field in dataclasses.fields(self.params)
+            if field.name != "vce_widths"
+        }
+        meta = {
+            "version": MODEL_VERSION,
+            "time_after": self.time_after,
+            "state": dataclasses.asdict(self.state),
+            "params": fields,
+        }
+        np.savez(
+            path,
+            # NumPy scalars are stored as the Python numbers they hold.
+            meta=np.array(json.dumps(meta, default=lambda value: value.item())),
+            vce_widths=self.params.vce_widths,
+            **{name: getattr(self.prefix, name) for name in SimulationStep._fields},
+        )
+
+    @classmethod
+    def load(cls, path: str | Path | BinaryIO) -> "Checkpoint":
+        """
+        Load a checkpoint saved by `save`.
+
+        :raise ValueError: if it was saved by another version of the model
+        """
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta["version"] != MODEL_VERSION:
+                raise ValueError(
+                    f"checkpoint is from model version {meta['version']}, "
+                    f"expected {MODEL_VERSION}"
+                )
+            return cls(
+                params=Params(**meta["params"], vce_widths=data["vce_widths"]),
+                time_after=meta["time_after"],
+                state=ModelState(**meta["state"]),
+                prefix=SimulationResult(
+                    **{name: data[name] for name in SimulationStep._fields}
+                ),
+            )
+
+
+def _steps(
+    params: Params, state: ModelState, start: int, stop: int
+) -> Iterator[SimulationStep]:
+    for time_after in range(start, stop):
+        yield advance(params, state, time_after)
+
+
+def take_checkpoint(params: Params, time_after: int) -> Checkpoint:
+    """
+    Simulate a scenario up to a second and snapshot it.
+
+    :param params: the scenario to simulate
+    :param time_after: the second to stop at, from 0 to `params.simulation_time`
+    :return: the state at the start of that second, and the results before it
+    """
+    if not 0 <= time_after <= params.simulation_time:
+        raise ValueError(
+            f"expected a checkpoint time from 0 to {params.simulation_time} s, "
+            f"got {time_after}"
+        )
+    state = ModelState.initial(params)
+    prefix = SimulationResult.from_steps(
+        _steps(params, state, 0, time_after), time_after
+    )
+    return Checkpoint(params=params, time_after=time_after, state=state, prefix=prefix)
+
+
+def check_branch(checkpoint: Checkpoint, params: Params) -> None:
+    """
+    Check that `params` only changes inputs that don't affect
+    the run before `checkpoint`, see `TRAIN_FIELDS` and `FREE_FIELDS`.
+
+    :raise ValueError: if it changes any others
+    """
+    base = checkpoint.params
+    t = checkpoint.time_after
+    changed = []
+    for field in dataclasses.fields(Params):
+        name = field.name
+        before, after = getattr(base, name), getattr(params, name)
+        if name == "vce_widths":
+            same = np.array_equal(before, after)
+        else:
+            same = before == after
+        if same or name in FREE_FIELDS:
+            continue
+        train, _, train_field = name.partition("_")
+        if train_field in TRAIN_FIELDS and t <= min(
+            getattr(base, f"{train}_arrival_time"),
+            getattr(params, f"{train}_arrival_time"),
+        ):
+            continue
+        changed.append(name)
+    if changed:
+        raise ValueError(
+            f"can't resume from a checkpoint at {t} s with changes to "
+            f"{', '.join(changed)}, which affect the run before it"
+        )
+    if params.simulation_time < t:
+        raise ValueError(
+            f"can't resume from a checkpoint at {t} s "
+            f"to simulate only {params.simulation_time} s"
+        )
+
+
+def resume(checkpoint: Checkpoint, params: Params | None = None) -> SimulationResult:
+    """
+    Carry on simulating from a checkpoint to the end of the run.
+
+    :param checkpoint: where to start, which is left unchanged
+    :param params: the scenario to finish, defaults to the checkpoint's;
+    it may only change inputs that don't affect the run before the checkpoint,
+    see `check_branch`
+    :return: the results of the whole run, the same as `model.simulate(params)`
+    """
+    if params is None:
+        params = checkpoint.params
+    check_branch(checkpoint, params)
+    t = checkpoint.time_after
+    state = checkpoint.state.copy()
+    prefix = checkpoint.prefix
+    changes: dict[str, Any] = {}
+    for train in ("train1", "train2"):
+        arriving_pax = getattr(params, f"{train}_arriving_pax")
+        if arriving_pax != getattr(checkpoint.params, f"{train}_arriving_pax"):
+            # The train hasn't arrived, so nobody has got on or off it yet.
+            setattr(state, f"{train}_remaining_arrivals", float(arriving_pax))
+            changes[f"{train}_pax"] = np.full(t, float(arriving_pax))
+    if changes:
+        prefix = dataclasses.replace(prefix, **changes)
+
+    rest = SimulationResult.from_steps(
+        _steps(params, state, t, params.simulation_time), params.simulation_time - t
+    )
+    return SimulationResult(
+        **{
+            name: np.concatenate([getattr(prefix, name), getattr(rest, name)])
+            for name in SimulationStep._fields
+        }
+    )
+
+
+def branch(
+    checkpoint: Checkpoint, variants: Sequence[Params]
+) -> list[SimulationResult]:
+    """`resume` from one checkpoint with each of `variants`."""
+    return [resume(checkpoint, params) for params in variants]
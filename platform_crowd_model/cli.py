@@ -0,0 +1,1206 @@
+"""
+Command line interface, run with `uv run python -m platform_crowd_model`.
+"""
+
+import argparse
+import csv
+import dataclasses
+import json
+import math
+import statistics
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+from .cache import DEFAULT_MAX_BYTES, ResultCache, default_cache_dir
+from .calibrate import (
+    DEFAULT_BOUNDS,
+    DEFAULT_STARTS,
+    OBSERVABLE_COLUMNS,
+    calibrate,
+    read_observations,
+)
+from .capacity import (
+    DEFAULT_MAX_HEADWAY,
+    DEFAULT_MIN_SPACE,
+    capacity_envelope,
+)
+from .convergence import DEFAULT_DTS, ConvergenceRow, convergence_report
+from .export import EXPORT_FORMATS, export_result
+from .flowcurve import FLOW_CURVES, FlowCurve, flow_curve
+from .kpi import run_kpi_sweep
+from .los import GRADES
+from .model import Params
+from .optimize import (
+    MONOTONE_FIELDS,
+    Constraint,
+    all_of,
+    clears_within,
+    find_boundary,
+    los_at_most,
+    min_space_at_least,
+)
+from .montecarlo import MonteCarloParams, Normal, simulate_monte_carlo
+from .online import DEFAULT_EVERY, DEFAULT_HORIZON, MAX_HORIZON, ReplayRow, replay
+from .profiling import Profiler
+from .scenarios import penn_scenarios, penn_station
+from .sensitivity import DEFAULT_RELATIVE_STEP, KPIS, sensitivity_report
+from .stairs import STAIR_ASSIGNMENTS, simulate_stairs
+from .station import simulate_station
+from .timetable import (
+    DAY,
+    DEFAULT_CHUNK_SECONDS,
+    TIMETABLE_COLUMNS,
+    iter_day,
+    platform_trains,
+    read_timetable,
+)
+from .sweep import (
+    DEFAULT_CHUNK_SIZE,
+    SWEEPABLE_FIELDS,
+    expand_grid,
+    run_models,
+    run_sweep,
+)
+from .workbook import output_stem, run_model
+
+
+def parse_grid_values(name: str, spec: str) -> list[Any]:
+    """
+    Parse the values of one swept field.
+
+    :param name: the `Params` field being swept
+    :param spec: either a comma separated list of values (`0,60,120`)
+    or an inclusive range (`0:300:30`, start:stop:step)
+    :return: the values, converted to the field's type
+    """
+    if name not in SWEEPABLE_FIELDS:
+        raise argparse.ArgumentTypeError(
+            f"cannot sweep {name!r}, expected one of {', '.join(SWEEPABLE_FIELDS)}"
+        )
+    convert = SWEEPABLE_FIELDS[name]
+    assert callable(convert)
+    if ":" in spec:
+        start, stop, step = (convert(part) for part in spec.split(":"))
+        if step <= 0:
+            raise argparse.ArgumentTypeError(f"step must be positive in {spec!r}")
+        values = []
+        i = 0
+        while start + i * step <= stop:
+            values.append(start + i * step)
+            i += 1
+        return values
+    return [convert(part) for part in spec.split(",")]
+
+
+def parse_grid(specs: Sequence[str]) -> dict[str, list[Any]]:
+    grid: dict[str, list[Any]] = {}
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(
+                f"expected --grid FIELD=VALUES, got {spec!r}"
+            )
+        grid[name] = parse_grid_values(name, values)
+    return grid
+
+
+def sweep_command(args: argparse.Namespace) -> None:
+    base = penn_scenarios()[args.scenario]
+    grid = parse_grid(args.grid)
+    params = expand_grid(base, grid)
+    try:
+        curve = flow_curve(args.flow_curve)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from e
+    if args.cache and curve is not None:
+        raise argparse.ArgumentTypeError(
+            "the result cache only holds results of the exact flow curve, "
+            "so --cache can't be used with --flow-curve"
+        )
+    if args.summary_only:
+        if args.save_dir or args.cache:
+            raise argparse.ArgumentTypeError(
+                "--summary-only keeps no per-second results "
+                "to save or cache, so can't be used with --save-dir or --cache"
+            )
+        kpi_summary(params, grid, args, curve)
+        return
+    results = run_sweep(
+        params,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        cache=ResultCache(args.cache_dir) if args.cache else None,
+        flow_curve=curve,
+    )
+
+    if args.save_dir:
+        save_dir = Path(args.save_dir)
+        save_dir.mkdir(parents=True, exist_ok=True)
+        for i, result in enumerate(results):
+            export_result(result, save_dir / f"scenario_{i:06d}", args.format)
+
+    with open(args.output, "w", newline="") if args.output else sys.stdout as output:
+        writer = csv.writer(output)
+        writer.writerow(
+            [
+                "scenario",
+                *grid,
+                "peak_total_pax_on_platform",
+                "min_inst_crowding",
+                "worst_plat_crowd_los",
+                "worst_egress_los",
+            ]
+        )
+        for i, (p, result) in enumerate(zip(params, results)):
+            writer.writerow(
+                [
+                    i,
+                    *(getattr(p, name) for name in grid),
+                    result.total_pax_on_platform.max(initial=0),
+                    result.inst_crowding.min(initial=p.eff_area),
+                    max(result.plat_crowd_los.tolist(), default="A"),
+                    max(result.egress_los.tolist(), default="A"),
+                ]
+            )
+
+
+def kpi_summary(
+    params: Sequence[Params],
+    grid: dict[str, list[Any]],
+    args: argparse.Namespace,
+    curve: FlowCurve | None = None,
+) -> None:
+    kpis = run_kpi_sweep(
+        params, workers=args.workers, chunk_size=args.chunk_size, flow_curve=curve
+    )
+    with open(args.output, "w", newline="") if args.output else sys.stdout as output:
+        writer = csv.writer(output)
+        writer.writerow(
+            [
+                "scenario",
+                *grid,
+                "peak_total_pax_on_platform",
+                "peak_time",
+                "min_inst_crowding",
+                "clear_time",
+                "cleared",
+                "worst_plat_crowd_los",
+                "worst_egress_los",
+                *(f"plat_crowd_{grade}_seconds" for grade in GRADES),
+                *(f"egress_{grade}_seconds" for grade in GRADES),
+            ]
+        )
+        for i, (p, k) in enumerate(zip(params, kpis)):
+            writer.writerow(
+                [
+                    i,
+                    *(getattr(p, name) for name in grid),
+                    k.peak_total_pax_on_platform,
+                    k.peak_time,
+                    k.min_inst_crowding,
+                    k.clear_time,
+                    k.cleared,
+                    k.worst_plat_crowd_los,
+                    k.worst_egress_los,
+                    *k.plat_crowd_seconds,
+                    *k.egress_seconds,
+                ]
+            )
+
+
+def convergence_command(args: argparse.Namespace) -> None:
+    params = penn_scenarios()[args.scenario]
+    if args.simulation_time is not None:
+        params = dataclasses.replace(params, simulation_time=args.simulation_time)
+    dts = [float(dt) for dt in args.dt.split(",")] if args.dt else DEFAULT_DTS
+    try:
+        rows = convergence_report(params, dts, adaptive=args.adaptive)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from e
+
+    names = [field.name for field in dataclasses.fields(ConvergenceRow)]
+    with open(args.output, "w", newline="") if args.output else sys.stdout as output:
+        writer = csv.writer(output)
+        writer.writerow(names)
+        for row in rows:
+            writer.writerow([getattr(row, name) for name in names])
+
+
+def stairs_command(args: argparse.Namespace) -> None:
+    names = args.scenario or ["p3120"]
+    result = simulate_stairs(
+        [penn_scenarios()[name] for name in names], args.assignment
+    )
+
+    with open(args.output, "w", newline="") if args.output else sys.stdout as output:
+        writer = csv.writer(output)
+        writer.writerow(
+            [
+                "scenario",
+                "stair",
+                "width",
+                "peak_queue",
+                "peak_queue_per_ft",
+                "peak_up_rate",
+                "peak_down_rate",
+                "bottleneck",
+            ]
+        )
+        for i, name in enumerate(names):
+            _, stairs = result.scenario(i)
+            peak_queue = stairs.peak_queue
+            peak_up_rate = stairs.up_rate.max(axis=0, initial=0)
+            peak_down_rate = stairs.down_rate.max(axis=0, initial=0)
+            for stair in range(len(stairs)):
+                writer.writerow(
+                    [
+                        name,
+                        stair + 1,
+                        stairs.widths[stair],
+                        peak_queue[stair],
+                        peak_queue[stair] / stairs.widths[stair],
+                        peak_up_rate[stair],
+                        peak_down_rate[stair],
+                        stair == stairs.bottleneck,
+                    ]
+                )
+
+
+def station_command(args: argparse.Namespace) -> None:
+    params = penn_station(args.simulation_time)
+    if args.concourse_area is not None:
+        params.concourse_area = args.concourse_area
+    if args.exit_rate is not None:
+        params.concourse_exit_rate = args.exit_rate
+    result = simulate_station(params)
+
+    with open(args.output, "w", newline="") if args.output else sys.stdout as output:
+        writer = csv.writer(output)
+        writer.writerow(
+            [
+                "time_after",
+                *(f"{name}_total_pax_on_platform" for name in result.names),
+                "total_pax_on_platforms",
+                "concourse_pax",
+                "concourse_space",
+                "exit_rate",
+            ]
+        )
+        total = result.total_pax_on_platforms
+        for t in range(len(result)):
+            writer.writerow(
+                [
+                    t,
+                    *result.platforms.total_pax_on_platform[:, t],
+                    total[t],
+                    result.concourse_pax[t],
+                    result.concourse_space[t],
+                    result.exit_rate[t],
+                ]
+            )
+    print(
+        f"station peak: {total[result.peak_time]:.0f} pax on the platforms "
+        f"at {result.peak_time} s",
+        file=sys.stderr,
+    )
+
+
+def day_command(args: argparse.Namespace) -> None:
+    platform = penn_scenarios()[args.scenario]
+    timetable = read_timetable(args.timetable)
+    trains = (
+        platform_trains(timetable, args.track)
+        if args.track
+        else (train for _, train in timetable)
+    )
+
+    with open(args.output, "w", newline="") if args.output else sys.stdout as output:
+        writer = csv.writer(output)
+        writer.writerow(
+            [
+                "time_after",
+                "trains",
+                "off_rate",
+                "on_rate",
+                "down_rate",
+                "up_rate",
+                "left_behind",
+                "arrived_pax_waiting_on_plat",
+                "total_pax_on_platform",
+                "inst_crowding",
+                "plat_crowd_los",
+                "egress_los",
+            ]
+        )
+        try:
+            for chunk in iter_day(
+                platform,
+                trains,
+                simulation_time=args.simulation_time,
+                chunk_seconds=args.chunk_seconds,
+                lead_time=args.lead_time,
+            ):
+                plat_crowd_los, egress_los = chunk.los(platform.total_vce_width)
+                writer.writerows(
+                    zip(
+                        chunk.time_after,
+                        chunk.trains,
+                        chunk.off_rate,
+                        chunk.on_rate,
+                        chunk.down_rate,
+                        chunk.up_rate,
+                        chunk.left_behind,
+                        chunk.arrived_pax_waiting_on_plat,
+                        chunk.total_pax_on_platform,
+                        chunk.inst_crowding,
+                        plat_crowd_los,
+                        egress_los,
+                    )
+                )
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e)) from e
+
+
+def replay_command(args: argparse.Namespace) -> None:
+    platform = penn_scenarios()[args.scenario]
+    timetable = read_timetable(args.timetable)
+    trains = (
+        platform_trains(timetable, args.track)
+        if args.track
+        else (train for _, train in timetable)
+    )
+
+    names = [field.name for field in dataclasses.fields(ReplayRow)]
+    latencies = []
+    with open(args.output, "w", newline="") if args.output else sys.stdout as output:
+        writer = csv.writer(output)
+        writer.writerow(names)
+        try:
+            for row in replay(
+                platform,
+                trains,
+                simulation_time=args.simulation_time,
+                every=args.every,
+                horizon=args.horizon,
+                lead_time=args.lead_time,
+            ):
+                writer.writerow([getattr(row, name) for name in names])
+                latencies.append(row.latency)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e)) from e
+    if latencies:
+        print(
+            f"{len(latencies)} updates: median latency "
+            f"{statistics.median(latencies) * 1000:.2f} ms, "
+            f"max {max(latencies) * 1000:.2f} ms",
+            file=sys.stderr,
+        )
+
+
+def montecarlo_command(args: argparse.Namespace) -> None:
+    if args.replications < 1:
+        raise argparse.ArgumentTypeError(
+            f"--replications must be positive, got {args.replications}"
+        )
+    percentiles = tuple(float(p) for p in args.percentiles.split(","))
+    result = simulate_monte_carlo(
+        MonteCarloParams(
+            base=penn_scenarios()[args.scenario],
+            replications=args.replications,
+            seed=args.seed,
+            train_delay=Normal(0, args.delay_sd),
+            load_factor=Normal(1, args.load_cv),
+            boarder_factor=Normal(1, args.boarder_cv),
+            door_rate=Normal(1, args.door_rate_cv),
+        ),
+        percentiles,
+    )
+
+    with open(args.output, "w", newline="") if args.output else sys.stdout as output:
+        writer = csv.writer(output)
+        writer.writerow(
+            [
+                "time_after",
+                *(f"space_p{p:g}" for p in percentiles),
+                *(f"load_p{p:g}" for p in percentiles),
+                *(f"plat_crowd_{grade}_or_worse" for grade in GRADES[1:]),
+                *(f"egress_{grade}_or_worse" for grade in GRADES[1:]),
+            ]
+        )
+        for t in range(result.space_envelope.shape[1]):
+            writer.writerow(
+                [
+                    t,
+                    *result.space_envelope[:, t],
+                    *result.load_envelope[:, t],
+                    *result.plat_crowd_exceedance[t, 1:],
+                    *result.egress_exceedance[t, 1:],
+                ]
+            )
+    for name, exceedance in (
+        ("platform crowding", result.worst_plat_crowd_exceedance),
+        ("egress", result.worst_egress_exceedance),
+    ):
+        print(
+            f"P({name} reaches grade): "
+            + ", ".join(
+                f"{grade} {p:.3f}" for grade, p in zip(GRADES[1:], exceedance[1:])
+            ),
+            file=sys.stderr,
+        )
+
+
+def optimize_command(args: argparse.Namespace) -> None:
+    base = penn_scenarios()[args.scenario]
+    for name, values in parse_grid(args.set).items():
+        if len(values) != 1:
+            raise argparse.ArgumentTypeError(f"expected one value for --set {name}")
+        base = dataclasses.replace(base, **{name: values[0]})
+    constraints: list[Constraint] = []
+    if args.plat_crowd_los:
+        constraints.append(los_at_most(args.plat_crowd_los))
+    if args.egress_los:
+        constraints.append(los_at_most(args.egress_los, "egress"))
+    if args.min_space is not None:
+        constraints.append(min_space_at_least(args.min_space))
+    if args.clear_time is not None:
+        constraints.append(clears_within(args.clear_time))
+    if not constraints:
+        raise argparse.ArgumentTypeError(
+            "give at least one of --plat-crowd-los, --egress-los, "
+            "--min-space or --clear-time"
+        )
+    try:
+        boundary = find_boundary(
+            base,
+            args.field,
+            args.low,
+            args.high,
+            all_of(*constraints),
+            tolerance=args.tolerance,
+            batch_size=args.batch_size,
+        )
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from e
+
+    match boundary.feasible:
+        case "nowhere":
+            print(f"no {args.field} in [{args.low}, {args.high}] meets the target")
+        case "everywhere":
+            print(f"every {args.field} in [{args.low}, {args.high}] meets the target")
+        case "above":
+            print(f"smallest {args.field} meeting the target: {boundary.value:g}")
+        case "below":
+            print(f"largest {args.field} meeting the target: {boundary.value:g}")
+    if boundary.kpis is not None:
+        k = boundary.kpis
+        print(
+            f"  worst LOS {k.worst_plat_crowd_los} (platform), "
+            f"{k.worst_egress_los} (egress); "
+            f"min space {k.min_inst_crowding:.2f} sqft/pax; "
+            + (
+                f"clears at {k.clear_time} s"
+                if k.cleared
+                else f"not cleared by {k.clear_time} s"
+            )
+        )
+    print(f"  {boundary.simulations} simulations")
+
+
+def capacity_command(args: argparse.Namespace) -> None:
+    scenarios = penn_scenarios()
+    names = args.scenario or list(scenarios)
+    loads = parse_grid_values("train1_arriving_pax", args.loads)
+    curves = capacity_envelope(
+        {name: scenarios[name] for name in names},
+        loads,
+        min_space=args.min_space,
+        max_headway=args.max_headway,
+    )
+
+    with open(args.output, "w", newline="") if args.output else sys.stdout as output:
+        writer = csv.writer(output)
+        writer.writerow(
+            ["scenario", "load", "headway", "trains_per_hour", "min_inst_crowding"]
+        )
+        for name, curve in curves.items():
+            writer.writerows(
+                zip(
+                    [name] * len(loads),
+                    loads,
+                    curve.headway,
+                    curve.trains_per_hour,
+                    curve.min_inst_crowding,
+                )
+            )
+
+
+def parse_bounds(specs: Sequence[str]) -> dict[str, tuple[float, float]]:
+    if not specs:
+        return dict(DEFAULT_BOUNDS)
+    bounds = {}
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        low, colon, high = values.partition(":")
+        if not sep or not colon:
+            raise argparse.ArgumentTypeError(
+                f"expected --fit NAME=LOW:HIGH, got {spec!r}"
+            )
+        bounds[name] = (float(low), float(high))
+    return bounds
+
+
+def calibrate_command(args: argparse.Namespace) -> None:
+    try:
+        result = calibrate(
+            penn_scenarios()[args.scenario],
+            read_observations(args.observations),
+            parse_bounds(args.fit),
+            starts=args.starts,
+            seed=args.seed,
+            workers=args.workers,
+        )
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from e
+
+    for name, value in result.values.items():
+        print(f"{name} = {value:g}")
+    for name, rmse in result.rmse.items():
+        print(f"  RMSE of {name}: {rmse:g}")
+    print(f"  {result.evaluations} simulations, best of {len(result.searches)} starts")
+
+
+def sensitivity_command(args: argparse.Namespace) -> None:
+    params = penn_scenarios()[args.scenario]
+    if args.simulation_time is not None:
+        params = dataclasses.replace(params, simulation_time=args.simulation_time)
+    report = sensitivity_report(params, args.relative_step, args.assignment)
+    if math.isnan(report.kpis["clear_time"]):
+        print(
+            f"the platform doesn't clear within {params.simulation_time} s, so the "
+            "clear_time columns are NaN; try a longer --simulation-time",
+            file=sys.stderr,
+        )
+
+    with open(args.output, "w", newline="") if args.output else sys.stdout as output:
+        writer = csv.writer(output)
+        writer.writerow(
+            ["input", "value", "step"]
+            + [f"{kpi}_{kind}" for kpi in KPIS for kind in ("gradient", "elasticity")]
+        )
+        for row in report.rows:
+            writer.writerow(
+                [row.input, row.value, row.step]
+                + [v for kpi in KPIS for v in (row.gradient[kpi], row.elasticity[kpi])]
+            )
+
+
+def profile_command(args: argparse.Namespace) -> None:
+    scenarios = penn_scenarios()
+    params = [scenarios[name] for name in args.scenario or ["p3120"]]
+    if args.cprofile is not None:
+        if len(params) != 1:
+            raise argparse.ArgumentTypeError("--cprofile takes a single --scenario")
+        with Profiler(output_stem(params[0]), args.memory, args.cprofile) as profiler:
+            run_model(params[0], write_only=args.write_only, profiler=profiler)
+        reports = [profiler.report()]
+    else:
+        reports = (
+            run_models(
+                params,
+                workers=args.workers,
+                write_only=args.write_only,
+                profile=True,
+                memory=args.memory,
+            )
+            or []
+        )
+
+    with open(args.output, "w") if args.output else sys.stdout as output:
+        if args.json:
+            json.dump([report.to_dict() for report in reports], output, indent=2)
+            output.write("\n")
+            return
+        for report in reports:
+            print(report.format(), file=output)
+        total = sum(report.total_seconds for report in reports)
+        print(f"total: {len(reports)} scenarios, {total:.4f} s", file=output)
+
+
+def cache_command(args: argparse.Namespace) -> None:
+    cache = ResultCache(args.cache_dir)
+    match args.action:
+        case "info":
+            entries = cache.entries()
+            print(
+                f"{cache.directory}: {len(entries)} results, {cache.size_bytes()} bytes"
+            )
+        case "clear":
+            print(f"removed {cache.clear()} results from {cache.directory}")
+        case "evict":
+            removed = cache.evict(args.max_bytes)
+            print(f"removed {removed} results from {cache.directory}")
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="platform_crowd_model",
+        description="Model platform crowding and alighting and boarding at NY Penn Station.",
+    )
+    subparsers = parser.add_subparsers(required=True)
+
+    sweep = subparsers.add_parser(
+        "sweep",
+        help="run a parameter sweep in parallel and write a CSV summary",
+        description="Run every combination of the --grid values in parallel "
+        "and write one CSV row per scenario.",
+    )
+    sweep.add_argument(
+        "--scenario",
+        choices=list(penn_scenarios()),
+        default="p3120",
+        help="the scenario to take the non-swept parameters from",
+    )
+    sweep.add_argument(
+        "--grid",
+        action="append",
+        default=[],
+        metavar="FIELD=VALUES",
+        help="a Params field and its values, "
+        "either comma separated (0,60,120) or an inclusive range (0:300:30); "
+        "can be repeated",
+    )
+    sweep.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="number of worker processes (default: number of CPUs)",
+    )
+    sweep.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="number of scenarios simulated together by a worker",
+    )
+    sweep.add_argument("--output", help="CSV file to write (default: standard output)")
+    sweep.add_argument(
+        "--save-dir",
+        help="also save each scenario's per-second results in this directory, "
+        "named by the scenario number in the CSV summary",
+    )
+    sweep.add_argument(
+        "--format",
+        choices=EXPORT_FORMATS,
+        default="npy",
+        help="format of the results saved in --save-dir (default: npy)",
+    )
+    sweep.add_argument(
+        "--cache",
+        action="store_true",
+        help="reuse results stored in the result cache and store new ones",
+    )
+    sweep.add_argument(
+        "--cache-dir",
+        help=f"result cache directory (default: {default_cache_dir()})",
+    )
+    sweep.add_argument(
+        "--summary-only",
+        action="store_true",
+        help="only keep each scenario's KPIs, without storing per-second results, "
+        "and add its clearance time and seconds in each LOS grade to the CSV",
+    )
+    sweep.add_argument(
+        "--flow-curve",
+        choices=FLOW_CURVES,
+        default="exact",
+        help="how to evaluate the stair flow curve: the model's formula "
+        "or its density form (default: exact)",
+    )
+    sweep.set_defaults(func=sweep_command)
+
+    convergence = subparsers.add_parser(
+        "convergence",
+        help="compare a scenario's results across time steps",
+        description="Simulate a scenario with each time step and write a CSV "
+        "of its results, runtime, error against the smallest time step "
+        "and conservation error.",
+    )
+    convergence.add_argument(
+        "--scenario",
+        choices=list(penn_scenarios()),
+        default="p3120",
+        help="the scenario to simulate",
+    )
+    convergence.add_argument(
+        "--dt",
+        help="comma separated time steps in seconds "
+        f"(default: {','.join(map(str, DEFAULT_DTS))})",
+    )
+    convergence.add_argument(
+        "--simulation-time",
+        type=int,
+        help="override the scenario's simulation time (s)",
+    )
+    convergence.add_argument(
+        "--no-adaptive",
+        dest="adaptive",
+        action="store_false",
+        help="don't also simulate each time step with adaptive_dt",
+    )
+    convergence.add_argument(
+        "--output", help="CSV file to write (default: standard output)"
+    )
+    convergence.set_defaults(func=convergence_command)
+
+    stairs = subparsers.add_parser(
+        "stairs",
+        help="find the bottleneck stairs of scenarios",
+        description="Simulate scenarios with a queue at every stair "
+        "and write one CSV row per stair with its peak queue and flow rates.",
+    )
+    stairs.add_argument(
+        "--scenario",
+        action="append",
+        choices=list(penn_scenarios()),
+        help="a scenario to simulate, can be repeated (default: p3120)",
+    )
+    stairs.add_argument(
+        "--assignment",
+        choices=STAIR_ASSIGNMENTS,
+        default="width",
+        help="how alighting passengers choose a stair (default: width)",
+    )
+    stairs.add_argument("--output", help="CSV file to write (default: standard output)")
+    stairs.set_defaults(func=stairs_command)
+
+    station = subparsers.add_parser(
+        "station",
+        help="simulate every platform together with a shared concourse",
+        description="Simulate the platforms of the station together, "
+        "with the crowd on their shared concourse slowing passengers coming down, "
+        "and write a CSV of the passengers on each platform and the concourse.",
+    )
+    station.add_argument(
+        "--simulation-time",
+        type=int,
+        default=600,
+        help="time to simulate (s) (default: %(default)s)",
+    )
+    station.add_argument(
+        "--concourse-area",
+        type=float,
+        help="shared concourse area (sqft) (default: 5000 per platform)",
+    )
+    station.add_argument(
+        "--exit-rate",
+        type=float,
+        help="rate (pax/s) at which arriving passengers leave the concourse "
+        "(default: unlimited)",
+    )
+    station.add_argument(
+        "--output", help="CSV file to write (default: standard output)"
+    )
+    station.set_defaults(func=station_command)
+
+    day = subparsers.add_parser(
+        "day",
+        help="simulate a platform through a day's timetable",
+        description="Simulate a platform through every train of a timetable "
+        "and write its per-second results as a CSV, one chunk at a time. "
+        f"The timetable is a CSV file with columns {', '.join(TIMETABLE_COLUMNS)} "
+        "and optionally boarding_pax; arrival_time is in seconds or HH:MM[:SS] "
+        "and dwell in seconds.",
+    )
+    day.add_argument("timetable", help="the timetable CSV file")
+    day.add_argument(
+        "--scenario",
+        choices=list(penn_scenarios()),
+        default="p3120",
+        help="the scenario to take the platform from (default: p3120)",
+    )
+    day.add_argument(
+        "--track",
+        action="append",
+        help="only simulate trains on this track, can be repeated "
+        "(default: every train in the timetable)",
+    )
+    day.add_argument(
+        "--simulation-time",
+        type=int,
+        default=DAY,
+        help="time to simulate (s) (default: %(default)s)",
+    )
+    day.add_argument(
+        "--chunk-seconds",
+        type=int,
+        default=DEFAULT_CHUNK_SECONDS,
+        help="number of seconds simulated between writes (default: %(default)s)",
+    )
+    day.add_argument(
+        "--lead-time",
+        type=float,
+        default=0,
+        help="time (s) before its arrival that a train's boarders show up "
+        "(default: %(default)s)",
+    )
+    day.add_argument("--output", help="CSV file to write (default: standard output)")
+    day.set_defaults(func=day_command)
+
+    replay_parser = subparsers.add_parser(
+        "replay",
+        help="replay a timetable through the live forecasting model",
+        description="Feed the trains of a timetable, as for the day command, "
+        "one at a time into the live model as they are announced, forecast "
+        "the space per passenger and LOS grades at regular times, and write "
+        "one CSV row per forecast with the time each update took.",
+    )
+    replay_parser.add_argument("timetable", help="the timetable CSV file")
+    replay_parser.add_argument(
+        "--scenario",
+        choices=list(penn_scenarios()),
+        default="p3120",
+        help="the scenario to take the platform from (default: p3120)",
+    )
+    replay_parser.add_argument(
+        "--track",
+        action="append",
+        help="only replay trains on this track, can be repeated "
+        "(default: every train in the timetable)",
+    )
+    replay_parser.add_argument(
+        "--simulation-time",
+        type=int,
+        default=DAY,
+        help="time to replay (s) (default: %(default)s)",
+    )
+    replay_parser.add_argument(
+        "--every",
+        type=int,
+        default=DEFAULT_EVERY,
+        help="seconds between forecasts (default: %(default)s)",
+    )
+    replay_parser.add_argument(
+        "--horizon",
+        type=int,
+        default=DEFAULT_HORIZON,
+        help=f"seconds each forecast looks ahead, up to {MAX_HORIZON} "
+        "(default: %(default)s)",
+    )
+    replay_parser.add_argument(
+        "--lead-time",
+        type=float,
+        default=0,
+        help="time (s) before its arrival that a train is announced "
+        "(default: %(default)s)",
+    )
+    replay_parser.add_argument(
+        "--output", help="CSV file to write (default: standard output)"
+    )
+    replay_parser.set_defaults(func=replay_command)
+
+    montecarlo = subparsers.add_parser(
+        "montecarlo",
+        help="simulate a scenario with uncertain inputs many times",
+        description="Simulate many replications of a scenario with normally "
+        "distributed train delays, loads and door throughput, and write a CSV of "
+        "the percentile envelopes of space per passenger and platform load and the "
+        "probability of each LOS grade or worse every second.",
+    )
+    montecarlo.add_argument(
+        "--scenario",
+        choices=list(penn_scenarios()),
+        default="p3120",
+        help="the scenario to vary (default: p3120)",
+    )
+    montecarlo.add_argument(
+        "--replications",
+        type=int,
+        default=1000,
+        help="number of replications (default: %(default)s)",
+    )
+    montecarlo.add_argument(
+        "--seed", type=int, help="random seed, for reproducible results"
+    )
+    montecarlo.add_argument(
+        "--delay-sd",
+        type=float,
+        default=0,
+        help="standard deviation (s) of train delays (default: %(default)s)",
+    )
+    montecarlo.add_argument(
+        "--load-cv",
+        type=float,
+        default=0,
+        help="coefficient of variation of arriving loads (default: %(default)s)",
+    )
+    montecarlo.add_argument(
+        "--boarder-cv",
+        type=float,
+        default=0,
+        help="coefficient of variation of departing loads (default: %(default)s)",
+    )
+    montecarlo.add_argument(
+        "--door-rate-cv",
+        type=float,
+        default=0,
+        help="coefficient of variation of door throughput (default: %(default)s)",
+    )
+    montecarlo.add_argument(
+        "--percentiles",
+        default="50,90,99",
+        help="comma separated percentiles of the envelopes (default: %(default)s)",
+    )
+    montecarlo.add_argument(
+        "--output", help="CSV file to write (default: standard output)"
+    )
+    montecarlo.set_defaults(func=montecarlo_command)
+
+    optimize = subparsers.add_parser(
+        "optimize",
+        help="find the value of a parameter that just meets a design target",
+        description="Find the smallest (or largest) value of --field between "
+        "--low and --high that meets every given target, assuming the targets "
+        "only get easier (or harder) to meet as it grows.",
+    )
+    optimize.add_argument(
+        "--scenario",
+        choices=list(penn_scenarios()),
+        default="p3120",
+        help="the scenario to take the other parameters from (default: p3120)",
+    )
+    optimize.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="FIELD=VALUE",
+        help="override a Params field of the scenario, can be repeated",
+    )
+    optimize.add_argument(
+        "--field",
+        choices=list(SWEEPABLE_FIELDS),
+        default=MONOTONE_FIELDS[0],
+        metavar="FIELD",
+        help=f"the Params field to vary, e.g. {', '.join(MONOTONE_FIELDS)} "
+        "(default: %(default)s)",
+    )
+    optimize.add_argument("--low", type=float, required=True, help="lowest value")
+    optimize.add_argument("--high", type=float, required=True, help="highest value")
+    optimize.add_argument(
+        "--plat-crowd-los",
+        choices=list(GRADES),
+        help="worst platform crowding LOS allowed",
+    )
+    optimize.add_argument(
+        "--egress-los", choices=list(GRADES), help="worst egress LOS allowed"
+    )
+    optimize.add_argument(
+        "--min-space", type=float, help="least space per passenger allowed (sqft)"
+    )
+    optimize.add_argument(
+        "--clear-time",
+        type=int,
+        help="latest time (s) by which arrived passengers must clear the platform",
+    )
+    optimize.add_argument(
+        "--tolerance",
+        type=float,
+        help="how close to the boundary to get (default: 1/1000 of the range)",
+    )
+    optimize.add_argument(
+        "--batch-size",
+        type=int,
+        default=8,
+        help="number of candidates simulated together in each round "
+        "(default: %(default)s)",
+    )
+    optimize.set_defaults(func=optimize_command)
+
+    capacity = subparsers.add_parser(
+        "capacity",
+        help="find each platform's shortest sustainable headway for each load",
+        description="For each scenario's platform and each train load, find the "
+        "shortest headway at which arriving passengers clear the platform before "
+        "the next train without the space per passenger dropping below "
+        "--min-space, testing each headway with a second train arriving at it, "
+        "and write one CSV row per platform and load.",
+    )
+    capacity.add_argument(
+        "--scenario",
+        action="append",
+        choices=list(penn_scenarios()),
+        help="a scenario to take the platform from, can be repeated "
+        "(default: every scenario)",
+    )
+    capacity.add_argument(
+        "--loads",
+        default="100:3000:100",
+        help="passengers arriving on each train, either comma separated "
+        "or an inclusive start:stop:step range (default: %(default)s)",
+    )
+    capacity.add_argument(
+        "--min-space",
+        type=float,
+        default=DEFAULT_MIN_SPACE,
+        help="least space per passenger allowed (sqft) (default: %(default)s)",
+    )
+    capacity.add_argument(
+        "--max-headway",
+        type=int,
+        default=DEFAULT_MAX_HEADWAY,
+        help="longest headway considered (s) (default: %(default)s)",
+    )
+    capacity.add_argument(
+        "--output", help="CSV file to write (default: standard output)"
+    )
+    capacity.set_defaults(func=capacity_command)
+
+    calibration = subparsers.add_parser(
+        "calibrate",
+        help="fit model constants to observed counts",
+        description="Fit model constants of a scenario to observed time series "
+        "by minimizing their mean squared error, with a search from many random "
+        "starting points. The observations are a CSV file with a time_after "
+        f"column and any of {', '.join(OBSERVABLE_COLUMNS)}.",
+    )
+    calibration.add_argument("observations", help="the observations CSV file")
+    calibration.add_argument(
+        "--scenario",
+        choices=list(penn_scenarios()),
+        default="p3120",
+        help="the scenario observed (default: p3120)",
+    )
+    calibration.add_argument(
+        "--fit",
+        action="append",
+        metavar="NAME=LOW:HIGH",
+        help=f"a parameter to fit and its bounds, one of {', '.join(DEFAULT_BOUNDS)}; "
+        "can be repeated (default: all of them, within "
+        + ", ".join(f"{low:g}:{high:g}" for low, high in DEFAULT_BOUNDS.values())
+        + ")",
+    )
+    calibration.add_argument(
+        "--starts",
+        type=int,
+        default=DEFAULT_STARTS,
+        help="number of random starting points (default: %(default)s)",
+    )
+    calibration.add_argument("--seed", type=int, help="seed of the starting points")
+    calibration.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of worker processes to split the starts across "
+        "(default: %(default)s)",
+    )
+    calibration.set_defaults(func=calibrate_command)
+
+    sensitivity = subparsers.add_parser(
+        "sensitivity",
+        help="rank which inputs drive a scenario's results",
+        description="Estimate the gradient and elasticity of the clearance time, "
+        "peak platform load and least space per passenger with respect to every "
+        "numeric input and stair width, by central differences, and write one CSV "
+        "row per input.",
+    )
+    sensitivity.add_argument(
+        "--scenario",
+        choices=list(penn_scenarios()),
+        default="p3120",
+        help="the scenario to analyse (default: p3120)",
+    )
+    sensitivity.add_argument(
+        "--relative-step",
+        type=float,
+        default=DEFAULT_RELATIVE_STEP,
+        help="central difference step as a share of each input's value "
+        "(default: %(default)s)",
+    )
+    sensitivity.add_argument(
+        "--assignment",
+        choices=STAIR_ASSIGNMENTS,
+        default="width",
+        help="how alighting passengers choose a stair (default: width)",
+    )
+    sensitivity.add_argument(
+        "--simulation-time",
+        type=int,
+        help="override the scenario's simulation time (s), which must be long "
+        "enough for the platform to clear to get the clearance time's sensitivity",
+    )
+    sensitivity.add_argument(
+        "--output", help="CSV file to write (default: standard output)"
+    )
+    sensitivity.set_defaults(func=sensitivity_command)
+
+    profile = subparsers.add_parser(
+        "profile",
+        help="find where running scenarios spends its time",
+        description="Run scenarios as `run_model` does, saving their workbooks, "
+        "and print the wall time, and optionally the peak memory, of each phase: "
+        "simulating, writing cells, tracing, building charts and saving.",
+    )
+    profile.add_argument(
+        "--scenario",
+        action="append",
+        choices=list(penn_scenarios()),
+        help="a scenario to run, can be repeated (default: p3120)",
+    )
+    profile.add_argument(
+        "--write-only",
+        action="store_true",
+        help="stream each workbook out as it is simulated",
+    )
+    profile.add_argument(
+        "--memory",
+        action="store_true",
+        help="also record the peak memory of each phase, which slows the run down",
+    )
+    profile.add_argument(
+        "--cprofile",
+        metavar="PATH",
+        help="also dump cProfile stats of a single scenario's run to this file",
+    )
+    profile.add_argument(
+        "--workers",
+        type=int,
+        help="number of worker processes (default: number of CPUs)",
+    )
+    profile.add_argument(
+        "--json", action="store_true", help="write the reports as JSON"
+    )
+    profile.add_argument(
+        "--output",
+        help="file to write the reports to (default: standard output)",
+    )
+    profile.set_defaults(func=profile_command)
+
+    cache = subparsers.add_parser(
+        "cache",
+        help="inspect or invalidate the result cache",
+        description="Inspect or invalidate the on-disk cache of simulation results.",
+    )
+    cache.add_argument(
+        "action",
+        choices=["info", "clear", "evict"],
+        help="info: show the cache size; clear: remove every result; "
+        "evict: remove least recently used results down to --max-bytes",
+    )
+    cache.add_argument(
+        "--cache-dir",
+        help=f"result cache directory (default: {default_cache_dir()})",
+    )
+    cache.add_argument(
+        "--max-bytes",
+        type=int,
+        default=DEFAULT_MAX_BYTES,
+        help="size to evict down to (default: %(default)s)",
+    )
+    cache.set_defaults(func=cache_command)
+
+    args = parser.parse_args(argv)
+    try:
+        args.func(args)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
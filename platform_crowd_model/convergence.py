@@ -0,0 +1,131 @@
+"""
+Convergence of the results as the time step `Params.dt` shrinks,
+to choose a `dt` that is accurate enough without costing more than it needs to.
+"""
+
+import dataclasses
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+
+from .model import Params, SimulationResult, clear_time, is_clear, simulate
+
+DEFAULT_DTS = (1, 0.5, 0.25, 0.2, 0.1)
+"""The time steps (s) compared by default."""
+
+
+@dataclass
+class ConvergenceRow:
+    """The results of one scenario simulated with one time step."""
+
+    dt: float
+    """The time step (s)."""
+
+    adaptive: bool
+    """Whether `dt` was only used where the model refines, see `Params.adaptive_dt`."""
+
+    runtime: float
+    """Wall-clock time (s) the simulation took."""
+
+    peak_total_pax_on_platform: float
+    """Most passengers on the platform at once."""
+
+    min_inst_crowding: float
+    """Least space per passenger (sqft)."""
+
+    clear_time: float
+    """
+    Second after which the platform is clear of arrived passengers, NaN if it
+    isn't clear at the end of the simulation (see `model.clear_time`).
+    """
+
+    cleared: bool
+    """Whether the platform is clear of arrived passengers at the end."""
+
+    max_abs_error: float
+    """
+    Largest difference in passengers on the platform from the reference run,
+    which uses the smallest `dt` without adapting.
+    """
+
+    conservation_error: float
+    """Largest number of passengers gained or lost by the model, see `conservation_error`."""
+
+
+def conservation_error(params: Params, result: SimulationResult) -> float:
+    """
+    The largest difference, over every second, between the number of passengers
+    in the model (on the trains, on the platform, waiting upstairs to come down,
+    or gone upstairs) and the number it started with.
+    """
+    initial = (
+        params.train1_arriving_pax
+        + params.train2_arriving_pax
+        + params.train1_departing_pax
+        + params.train2_departing_pax
+    )
+    upstairs = (
+        params.train1_departing_pax
+        - params.train1_boarding_pax
+        + params.train2_departing_pax
+        - params.train2_boarding_pax
+        - np.cumsum(result.down_rate)
+    )
+    exited = np.cumsum(result.up_rate)
+    in_model = (
+        result.train1_pax
+        + result.train2_pax
+        + result.total_pax_on_platform
+        + upstairs
+        + exited
+    )
+    return float(np.abs(in_model - initial).max(initial=0))
+
+
+def convergence_report(
+    params: Params, dts: Sequence[float] = DEFAULT_DTS, adaptive: bool = True
+) -> list[ConvergenceRow]:
+    """
+    Simulate a scenario with each time step in `dts` and compare the results.
+
+    :param params: the scenario to simulate; its `dt` and `adaptive_dt` are ignored
+    :param dts: the time steps (s) to compare
+    :param adaptive: also simulate each `dt` below 1 s with `adaptive_dt`
+    :return: one row per simulation, in the order of `dts`,
+    each fixed step followed by its adaptive counterpart
+    """
+    runs: list[tuple[Params, float, SimulationResult]] = []
+    for dt in dts:
+        for adaptive_dt in (False, True) if adaptive and dt < 1 else (False,):
+            p = dataclasses.replace(params, dt=dt, adaptive_dt=adaptive_dt)
+            start = time.perf_counter()
+            result = simulate(p)
+            runs.append((p, time.perf_counter() - start, result))
+
+    if not runs:
+        return []
+    _, _, reference = min(
+        (run for run in runs if not run[0].adaptive_dt), key=lambda run: run[0].dt
+    )
+    return [
+        ConvergenceRow(
+            dt=p.dt,
+            adaptive=p.adaptive_dt,
+            runtime=runtime,
+            peak_total_pax_on_platform=float(
+                result.total_pax_on_platform.max(initial=0)
+            ),
+            min_inst_crowding=float(result.inst_crowding.min(initial=p.eff_area)),
+            clear_time=float(clear_time(result.arrived_pax_waiting_on_plat)),
+            cleared=bool(is_clear(result.arrived_pax_waiting_on_plat[-1:]).all()),
+            max_abs_error=float(
+                np.abs(
+                    result.total_pax_on_platform - reference.total_pax_on_platform
+                ).max(initial=0)
+            ),
+            conservation_error=conservation_error(p, result),
+        )
+        for p, runtime, result in runs
+    ]
@@ -0,0 +1,308 @@
+"""
+An event-driven integrator that skips over stretches of time where every
+flow rate stays constant, such as when nothing is happening before a train
+arrives or while a queue drains at a capped rate.
+
+Instead of one step per second, the simulation is stored as a list of
+`Segment`s. Within a segment every rate is constant, so the counters change
+linearly and the per-second results can be reconstructed when needed with
+`EventResult.to_grid`.
+
+A run of constant rates is found by stepping the model at the end of the
+candidate run (and at the peak of the density-flow curves, if it is crossed)
+and checking that the rates are unchanged. Every branch condition in the
+rate functions is either monotone along a linear path or a level set of a
+concave density-flow curve, so if the rates match at those points they match
+at every second in between.
+"""
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .los import egress_codes, grade_letters, plat_crowd_codes
+from .model import (
+    ModelState,
+    Params,
+    SimulationResult,
+    SimulationStep,
+    advance,
+)
+
+RATE_FIELDS = (
+    "train1_off_rate",
+    "train2_off_rate",
+    "train1_on_rate",
+    "train2_on_rate",
+    "down_rate",
+    "up_rate",
+)
+"""The `SimulationStep` fields that must stay constant within a segment."""
+
+STATE_TOLERANCE = 1e-9
+"""Relative tolerance when checking that the counters change linearly."""
+
+CONCOURSE_AREA = 5000
+"""The concourse area (sqft) used by the model for the downstairs flow."""
+
+_STATE_INDEX = {name: i for i, name in enumerate(ModelState.__slots__)}
+
+
+@dataclass
+class Segment:
+    """A stretch of seconds during which every flow rate is constant."""
+
+    start: int
+    """The first second of the segment."""
+
+    length: int
+    """The number of seconds in the segment."""
+
+    step: SimulationStep
+    """The output of the first second; the rates are the same for every second."""
+
+    first_state: tuple[float, ...]
+    """The counters (see `ModelState`) after the first second."""
+
+    delta: tuple[float, ...]
+    """The change in each counter per second."""
+
+
+@dataclass
+class EventResult:
+    """The output of `integrate_events`."""
+
+    params: Params
+    segments: list[Segment]
+
+    @property
+    def event_times(self) -> list[int]:
+        """The seconds at which the rates change."""
+        return [segment.start for segment in self.segments]
+
+    def to_grid(self) -> SimulationResult:
+        """Reconstruct the per-second results on the same grid as `model.simulate`."""
+        n = self.params.simulation_time
+        eff_area = self.params.eff_area
+        w = self.params.total_vce_width
+        columns: dict[str, NDArray[np.floating]] = {
+            name: np.empty(n) for name in SimulationStep._fields
+        }
+
+        def counter(
+            segment: Segment, name: str, j: NDArray[np.floating]
+        ) -> NDArray[np.floating]:
+            i = _STATE_INDEX[name]
+            return segment.first_state[i] + j * segment.delta[i]
+
+        for segment in self.segments:
+            span = slice(segment.start, segment.start + segment.length)
+            j = np.arange(segment.length, dtype=np.float64)
+            for name in (*RATE_FIELDS, "net_pax_flow_rate"):
+                columns[name][span] = getattr(segment.step, name)
+            columns["train1_pax"][span] = counter(
+                segment, "train1_remaining_arrivals", j
+            ) + counter(segment, "train1_new_pax", j)
+            columns["train2_pax"][span] = counter(
+                segment, "train2_remaining_arrivals", j
+            ) + counter(segment, "train2_new_pax", j)
+            columns["departing_pax_on_plat_1"][span] = counter(
+                segment, "train1_boarders_on_plat", j
+            )
+            columns["departing_pax_on_plat_2"][span] = counter(
+                segment, "train2_boarders_on_plat", j
+            )
+            columns["arrived_pax_waiting_on_plat"][span] = counter(
+                segment, "arrived_pax_waiting_on_plat", j
+            )
+            total = counter(segment, "total_pax_on_platform", j)
+            columns["total_pax_on_platform"][span] = total
+            columns["inst_crowding"][span] = np.divide(
+                eff_area, total, out=np.full_like(total, eff_area), where=total > 0
+            )
+            # The first second of a segment was stepped exactly, so use it as is.
+            for name in SimulationStep._fields:
+                if name not in ("time_after", "plat_crowd_los", "egress_los"):
+                    columns[name][segment.start] = getattr(segment.step, name)
+
+        inst_crowding = columns["inst_crowding"]
+        up_rate = columns["up_rate"]
+        return SimulationResult(
+            time_after=np.arange(n, dtype=np.int64),
+            train1_pax=columns["train1_pax"],
+            train2_pax=columns["train2_pax"],
+            train1_off_rate=columns["train1_off_rate"],
+            train2_off_rate=columns["train2_off_rate"],
+            train1_on_rate=columns["train1_on_rate"],
+            train2_on_rate=columns["train2_on_rate"],
+            down_rate=columns["down_rate"],
+            up_rate=up_rate,
+            departing_pax_on_plat_1=columns["departing_pax_on_plat_1"],
+            departing_pax_on_plat_2=columns["departing_pax_on_plat_2"],
+            arrived_pax_waiting_on_plat=columns["arrived_pax_waiting_on_plat"],
+            total_pax_on_platform=columns["total_pax_on_platform"],
+            inst_crowding=inst_crowding,
+            net_pax_flow_rate=columns["net_pax_flow_rate"],
+            plat_crowd_los=grade_letters(plat_crowd_codes(inst_crowding)),
+            egress_los=grade_letters(egress_codes(w, up_rate)),
+        )
+
+
+def _flow_peak(a: float) -> float:
+    """
+    The density (pax) at which the density-flow curve
+    `(111 * a / k - 162) / (a / k) ** 2` used by the rate functions peaks.
+    """
+    return max(1, 111 * a / 324)
+
+
+class _RunFinder:
+    """Finds how long the rates of one second stay constant."""
+
+    def __init__(
+        self,
+        params: Params,
+        time_after: int,
+        before: tuple[float, ...],
+        after: ModelState,
+        step: SimulationStep,
+    ) -> None:
+        self.params = params
+        self.time_after = time_after
+        self.before = before
+        self.after = after.values()
+        self.delta = tuple(b - a for a, b in zip(before, self.after))
+        self.rates = tuple(getattr(step, name) for name in RATE_FIELDS)
+        self.probes = self._peak_crossings(step)
+        self.second: tuple[SimulationStep, ModelState] | None = None
+        """The exact output of and counters after the second second of the run."""
+
+    def _peak_crossings(self, step: SimulationStep) -> list[float]:
+        """The (fractional) seconds into the run at which a density-flow curve peaks."""
+        probes = []
+        i = _STATE_INDEX["arrived_pax_waiting_on_plat"]
+        # The platform clearance rate sees the queue after this second's alighting.
+        k0 = self.before[i] + step.train1_off_rate + step.train2_off_rate
+        if self.delta[i] != 0:
+            probes.append((_flow_peak(self.params.eff_area) - k0) / self.delta[i])
+        for name in ("train1_boarders_upstairs", "train2_boarders_upstairs"):
+            i = _STATE_INDEX[name]
+            if self.delta[i] != 0:
+                probes.append(
+                    (_flow_peak(CONCOURSE_AREA) - self.before[i]) / self.delta[i]
+                )
+        return probes
+
+    def state_at(self, j: int) -> ModelState:
+        """The counters `j` seconds into the run, assuming constant rates."""
+        if j == 1:
+            return ModelState(*self.after)
+        return ModelState(*(x + j * d for x, d in zip(self.before, self.delta)))
+
+    def _same_rates(self, j: int) -> ModelState | None:
+        """
+        Step the model `j` seconds into the run, returning the counters after that
+        second if its rates and change in counters match the first second.
+        """
+        state = self.state_at(j)
+        before = state.values()
+        step = advance(self.params, state, self.time_after + j)
+        if j == 1:
+            self.second = step, state.copy()
+        if tuple(getattr(step, name) for name in RATE_FIELDS) != self.rates:
+            return None
+        for x, y, d in zip(before, state.values(), self.delta):
+            if not math.isclose(y - x, d, rel_tol=STATE_TOLERANCE, abs_tol=1e-12):
+                return None
+        return state
+
+    def holds(self, n: int) -> ModelState | None:
+        """
+        Whether the rates stay constant for `n` seconds,
+        returning the counters after the last of them if they do.
+        """
+        last = self._same_rates(n - 1)
+        if last is None:
+            return None
+        for probe in self.probes:
+            for j in {math.floor(probe), math.ceil(probe)}:
+                if 0 < j < n - 1 and self._same_rates(j) is None:
+                    return None
+        return last
+
+    def longest(self, limit: int) -> tuple[int, ModelState]:
+        """
+        The longest run of at most `limit` seconds with constant rates,
+        and the counters after it.
+        """
+        good, state = 1, ModelState(*self.after)
+        # Grow the run exponentially until it breaks, then bisect.
+        bad = limit + 1
+        n = 2
+        while n <= limit:
+            last = self.holds(n)
+            if last is None:
+                bad = n
+                break
+            good, state = n, last
+            n *= 2
+        else:
+            if good < limit:
+                last = self.holds(limit)
+                if last is not None:
+                    return limit, last
+                bad = limit
+        while bad - good > 1:
+            mid = (good + bad) // 2
+            last = self.holds(mid)
+            if last is None:
+                bad = mid
+            else:
+                good, state = mid, last
+        return good, state
+
+
+def integrate_events(params: Params) -> EventResult:
+    """
+    Simulate a scenario, jumping over stretches of time where every rate is constant.
+
+    :param params: the scenario to simulate, with `dt` of 1 s
+    :return: the segments of constant rates, see `EventResult.to_grid`
+    to get per-second results
+    """
+    if params.dt != 1:
+        raise ValueError(
+            f"the event integrator only supports 1 s time steps, got dt={params.dt}"
+        )
+    segments: list[Segment] = []
+    if params.simulation_time <= 0:
+        return EventResult(params=params, segments=segments)
+    state = ModelState.initial(params)
+    before = state.values()
+    step = advance(params, state, 0)
+    time_after = 0
+    while time_after < params.simulation_time:
+        finder = _RunFinder(params, time_after, before, state, step)
+        length, next_state = finder.longest(params.simulation_time - time_after)
+        segments.append(
+            Segment(
+                start=time_after,
+                length=length,
+                step=step,
+                first_state=finder.after,
+                delta=finder.delta,
+            )
+        )
+        time_after += length
+        if time_after >= params.simulation_time:
+            break
+        before = next_state.values()
+        if length == 1 and finder.second is not None:
+            # The next second was already stepped while looking for a longer run.
+            step, state = finder.second
+        else:
+            state = next_state
+            step = advance(params, state, time_after)
+    return EventResult(params=params, segments=segments)
@@ -0,0 +1,155 @@
+"""
+Compact exports of `SimulationResult`s, and loaders to read them back.
+
+Three formats are supported:
+
+- `npz`: all columns in one uncompressed NumPy `.npz` archive
+- `npy`: a directory with one `<column>.npy` file per column,
+  which can be memory-mapped when loaded
+- `csv`: one row per simulated second, for use in other tools
+"""
+
+import csv
+import dataclasses
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any, BinaryIO, Literal
+
+import numpy as np
+
+from .model import SimulationResult
+
+type ExportFormat = Literal["npz", "npy", "csv"]
+
+EXPORT_FORMATS: tuple[ExportFormat, ...] = ("npz", "npy", "csv")
+
+COLUMN_NAMES = tuple(field.name for field in dataclasses.fields(SimulationResult))
+"""The names of the exported columns, in order."""
+
+_STR_COLUMNS = {"plat_crowd_los", "egress_los"}
+
+
+def export_path(stem: str | Path, format: ExportFormat) -> Path:
+    """The file (or for `npy`, the directory) `export_result` writes for `stem`."""
+    stem = Path(stem)
+    if format == "npy":
+        return stem
+    return stem.with_name(f"{stem.name}.{format}")
+
+
+def save_npz(result: SimulationResult, path: str | Path | BinaryIO) -> None:
+    """Save every column of `result` into one uncompressed `.npz` archive."""
+    np.savez(path, **{name: getattr(result, name) for name in COLUMN_NAMES})
+
+
+def save_npy_dir(result: SimulationResult, directory: str | Path) -> None:
+    """Save each column of `result` as `<column>.npy` inside `directory`."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for name in COLUMN_NAMES:
+        np.save(directory / f"{name}.npy", getattr(result, name))
+
+
+def save_csv(result: SimulationResult, path: str | Path) -> None:
+    """Save `result` as CSV with a header row of column names."""
+    columns: list[list[Any]] = [getattr(result, name).tolist() for name in COLUMN_NAMES]
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMN_NAMES)
+        writer.writerows(zip(*columns))
+
+
+def export_result(
+    result: SimulationResult, stem: str | Path, format: ExportFormat
+) -> Path:
+    """
+    Save `result` in the given format.
+
+    :param result: the results to save
+    :param stem: the path to save to, without an extension
+    :param format: one of `EXPORT_FORMATS`
+    :return: the path written, see `export_path`
+    """
+    path = export_path(stem, format)
+    match format:
+        case "npz":
+            save_npz(result, path)
+        case "npy":
+            save_npy_dir(result, path)
+        case "csv":
+            save_csv(result, path)
+    return path
+
+
+def load_npz(path: str | Path) -> SimulationResult:
+    """Load a result saved by `save_npz`."""
+    with np.load(path) as data:
+        return SimulationResult(**{name: data[name] for name in COLUMN_NAMES})
+
+
+def load_npy_dir(directory: str | Path, mmap: bool = True) -> SimulationResult:
+    """
+    Load a result saved by `save_npy_dir`.
+
+    :param directory: the directory the columns were saved in
+    :param mmap: memory-map the columns read-only instead of reading them,
+    so only the parts that are used get read from disk
+    :return: the result
+    """
+    directory = Path(directory)
+    mmap_mode: Literal["r"] | None = "r" if mmap else None
+    return SimulationResult(
+        **{
+            name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode)
+            for name in COLUMN_NAMES
+        }
+    )
+
+
+def load_csv(path: str | Path) -> SimulationResult:
+    """Load a result saved by `save_csv`."""
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = list(reader)
+    columns = dict(zip(header, zip(*rows))) if rows else dict.fromkeys(header, ())
+    values: dict[str, Any] = {}
+    for name in COLUMN_NAMES:
+        if name == "time_after":
+            values[name] = np.array(columns[name], dtype=np.int64)
+        elif name in _STR_COLUMNS:
+            values[name] = np.array(columns[name], dtype="<U1")
+        else:
+            values[name] = np.array(columns[name], dtype=np.float64)
+    return SimulationResult(**values)
+
+
+def load_result(path: str | Path, mmap: bool = True) -> SimulationResult:
+    """
+    Load a result written by `export_result`, picking the format from the path.
+
+    :param path: an `.npz` or `.csv` file, or an `npy` directory
+    :param mmap: memory-map the columns of an `npy` directory
+    :return: the result
+    """
+    path = Path(path)
+    if path.is_dir():
+        return load_npy_dir(path, mmap=mmap)
+    if path.suffix == ".npz":
+        return load_npz(path)
+    if path.suffix == ".csv":
+        return load_csv(path)
+    raise ValueError(f"don't know how to load {path}")
+
+
+def scan_results(
+    paths: Iterable[str | Path], mmap: bool = True
+) -> Iterator[tuple[Path, SimulationResult]]:
+    """
+    Lazily load many exported results, one at a time.
+
+    With memory-mapped `npy` directories, only the columns and rows
+    that are actually used are read from disk.
+    """
+    for path in paths:
+        yield Path(path), load_result(path, mmap=mmap)
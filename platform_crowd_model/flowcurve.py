@@ -0,0 +1,52 @@
+"""
+Alternative evaluations of the stair flow curve of `model.plat_clearance_fn`
+and `model.plat_ingress_fn` for batch runs.
+
+At M sqft per passenger the curve is P = (111M - 162)/M², which in terms of the
+density D = 1/M (pax/sqft) is the quadratic P = D(111 - 162D). The VCE width only
+enters the clearance and ingress rates through caps that are applied exactly, so
+a curve only needs to be keyed on the density. A `FlowCurve` takes densities and
+returns the flow; pass one as `flow_curve` to `batch.simulate_batch` and friends
+to use it for a run instead of the model's own formula.
+
+There is no lookup table: the curve is only a few array operations, and in
+NumPy the gathers of a table cost more than the formula, so a table was both
+slower and less accurate (see `benchmarks.flow_curves`).
+"""
+
+from collections.abc import Callable
+
+from .batch import FloatArray
+
+type FlowCurve = Callable[[FloatArray], FloatArray]
+"""The stair flow curve, from densities (pax/sqft)."""
+
+FLOW_CURVES = ("exact", "polynomial")
+"""
+The flow curves that can be selected by name, see `flow_curve`:
+the model's own formula and its density form.
+"""
+
+
+def polynomial_flow(density: FloatArray) -> FloatArray:
+    """The flow curve in its density form, equal to the model's up to rounding."""
+    flow: FloatArray = density * (111 - 162 * density)
+    return flow
+
+
+def flow_curve(name: str) -> FlowCurve | None:
+    """
+    A flow curve by name, see `FLOW_CURVES`.
+
+    :param name: the curve
+    :return: the curve, or `None` for the model's own formula
+    """
+    match name:
+        case "exact":
+            return None
+        case "polynomial":
+            return polynomial_flow
+        case _:
+            raise ValueError(
+                f"unknown flow curve {name!r}, expected one of {', '.join(FLOW_CURVES)}"
+            )
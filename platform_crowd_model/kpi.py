@@ -0,0 +1,217 @@
+"""
+Summary-only runs: the handful of KPIs most sweeps need, accumulated inside
+the time-step loop without keeping any per-second results.
+
+`simulate_kpis` and `simulate_batch_kpis` use a fixed amount of memory per
+scenario however long the simulation, and `ScenarioKPIs` is small enough that
+the KPIs of a million scenarios fit comfortably in memory.
+"""
+
+import functools
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .batch import (
+    BatchParams,
+    BatchState,
+    FloatArray,
+    advance_batch,
+    batchable,
+)
+from .flowcurve import FlowCurve
+from .los import GRADES, egress_codes, plat_crowd_codes
+from .model import Params, SimulationStep, is_clear, iter_simulation
+from .sweep import DEFAULT_CHUNK_SIZE, map_scenarios
+
+
+@dataclass(slots=True, frozen=True)
+class ScenarioKPIs:
+    """The summary results of one scenario."""
+
+    peak_total_pax_on_platform: float
+    """Most passengers on the platform at once."""
+
+    peak_time: int
+    """First second with `peak_total_pax_on_platform` passengers on the platform."""
+
+    min_inst_crowding: float
+    """Least space per passenger (sqft)."""
+
+    clear_time: int
+    """
+    Second after which the platform is clear of arrived passengers (see
+    `model.is_clear`), or the simulation time if it isn't clear by then
+    (see `cleared`).
+    """
+
+    cleared: bool
+    """Whether the platform is clear of arrived passengers at the end."""
+
+    plat_crowd_seconds: tuple[int, ...]
+    """Seconds spent in each platform crowding grade, in the order of `GRADES`."""
+
+    egress_seconds: tuple[int, ...]
+    """Seconds spent in each egress grade, in the order of `GRADES`."""
+
+    @property
+    def worst_plat_crowd_los(self) -> str:
+        """The worst platform crowding grade reached, `A` for an empty simulation."""
+        return _worst(self.plat_crowd_seconds)
+
+    @property
+    def worst_egress_los(self) -> str:
+        """The worst egress grade reached, `A` for an empty simulation."""
+        return _worst(self.egress_seconds)
+
+
+def _worst(seconds: tuple[int, ...]) -> str:
+    return max((grade for grade, n in zip(GRADES, seconds) if n), default=GRADES[0])
+
+
+class KPIAccumulator:
+    """Accumulates the KPIs of one scenario, one second at a time."""
+
+    def __init__(self, params: Params) -> None:
+        self.peak_total_pax_on_platform = 0.0
+        self.peak_time = 0
+        self.min_inst_crowding = params.eff_area
+        self.clear_time = 0
+        self.cleared = True
+        self.plat_crowd_seconds = dict.fromkeys(GRADES, 0)
+        self.egress_seconds = dict.fromkeys(GRADES, 0)
+
+    def add(self, step: SimulationStep) -> None:
+        """Include one second of results."""
+        if step.total_pax_on_platform > self.peak_total_pax_on_platform:
+            self.peak_total_pax_on_platform = step.total_pax_on_platform
+            self.peak_time = step.time_after
+        if step.inst_crowding < self.min_inst_crowding:
+            self.min_inst_crowding = step.inst_crowding
+        self.cleared = is_clear(step.arrived_pax_waiting_on_plat)
+        if not self.cleared:
+            self.clear_time = step.time_after + 1
+        self.plat_crowd_seconds[step.plat_crowd_los] += 1
+        self.egress_seconds[step.egress_los] += 1
+
+    def result(self) -> ScenarioKPIs:
+        return ScenarioKPIs(
+            peak_total_pax_on_platform=self.peak_total_pax_on_platform,
+            peak_time=self.peak_time,
+            min_inst_crowding=self.min_inst_crowding,
+            clear_time=self.clear_time,
+            cleared=self.cleared,
+            plat_crowd_seconds=tuple(self.plat_crowd_seconds.values()),
+            egress_seconds=tuple(self.egress_seconds.values()),
+        )
+
+
+def simulate_kpis(params: Params) -> ScenarioKPIs:
+    """
+    Run the time-step loop for one scenario, keeping only its KPIs.
+
+    :param params: the scenario to simulate
+    :return: the KPIs, equal to those of the full per-second results
+    """
+    kpis = KPIAccumulator(params)
+    for step in iter_simulation(params):
+        kpis.add(step)
+    return kpis.result()
+
+
+def simulate_batch_kpis(
+    params: Sequence[Params] | BatchParams, flow_curve: FlowCurve | None = None
+) -> list[ScenarioKPIs]:
+    """
+    Run the time-step loop for many scenarios at once, keeping only their KPIs.
+
+    :param params: the scenarios to simulate, all with 1 s time steps
+    :param flow_curve: the stair flow curve to use instead of the model's formula,
+    see `flowcurve`
+    :return: the KPIs of every scenario, in order
+    """
+    bp = params if isinstance(params, BatchParams) else BatchParams.from_params(params)
+    n = len(bp)
+    peak: FloatArray = np.zeros(n)
+    peak_time: NDArray[np.int64] = np.zeros(n, dtype=np.int64)
+    min_inst_crowding: FloatArray = bp.eff_area.astype(np.float64)
+    clear_time: NDArray[np.int64] = np.zeros(n, dtype=np.int64)
+    cleared: NDArray[np.bool_] = np.ones(n, dtype=np.bool_)
+    plat_crowd_seconds: NDArray[np.int64] = np.zeros((n, len(GRADES)), dtype=np.int64)
+    egress_seconds: NDArray[np.int64] = np.zeros((n, len(GRADES)), dtype=np.int64)
+    scenarios = np.arange(n)
+
+    state = BatchState.initial(bp)
+    for time_after in range(int(bp.simulation_time.max(initial=0))):
+        step = advance_batch(bp, state, time_after, flow_curve=flow_curve)
+        active = time_after < bp.simulation_time
+        total = state.total_pax_on_platform
+        higher = active & (total > peak)
+        peak[higher] = total[higher]
+        peak_time[higher] = time_after
+        np.minimum(
+            min_inst_crowding,
+            step.inst_crowding,
+            out=min_inst_crowding,
+            where=active,
+        )
+        waiting = ~is_clear(state.arrived_pax_waiting_on_plat)
+        clear_time[active & waiting] = time_after + 1
+        # The last second each scenario is active decides whether it cleared.
+        cleared[active] = ~waiting[active]
+        plat_crowd = plat_crowd_codes(step.inst_crowding)
+        egress = egress_codes(bp.total_vce_width, step.plat_egress_rate)
+        plat_crowd_seconds[scenarios[active], plat_crowd[active]] += 1
+        egress_seconds[scenarios[active], egress[active]] += 1
+
+    return [
+        ScenarioKPIs(
+            peak_total_pax_on_platform=float(peak[i]),
+            peak_time=int(peak_time[i]),
+            min_inst_crowding=float(min_inst_crowding[i]),
+            clear_time=int(clear_time[i]),
+            cleared=bool(cleared[i]),
+            plat_crowd_seconds=tuple(plat_crowd_seconds[i].tolist()),
+            egress_seconds=tuple(egress_seconds[i].tolist()),
+        )
+        for i in range(n)
+    ]
+
+
+def _kpi_chunk(
+    params: Sequence[Params], flow_curve: FlowCurve | None = None
+) -> list[ScenarioKPIs]:
+    batched = [i for i, p in enumerate(params) if batchable(p)]
+    batch = simulate_batch_kpis([params[i] for i in batched], flow_curve)
+    results = dict(zip(batched, batch))
+    return [
+        results[i] if i in results else simulate_kpis(p) for i, p in enumerate(params)
+    ]
+
+
+def run_kpi_sweep(
+    params: Sequence[Params],
+    *,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    flow_curve: FlowCurve | None = None,
+) -> list[ScenarioKPIs]:
+    """
+    Simulate many scenarios in parallel, keeping only their KPIs,
+    like `sweep.run_sweep`.
+
+    :param params: the scenarios to simulate
+    :param workers: number of worker processes, defaults to the number of CPUs
+    :param chunk_size: number of scenarios simulated together as one batch
+    :param flow_curve: the stair flow curve of the batched scenarios,
+    see `sweep.run_sweep`
+    :return: the KPIs, in the same order as `params`
+    """
+    return map_scenarios(
+        functools.partial(_kpi_chunk, flow_curve=flow_curve),
+        params,
+        workers=workers,
+        chunk_size=chunk_size,
+    )
@@ -0,0 +1,91 @@
+"""
+Array versions of `model.plat_crowd_grade` and `model.egress_crowd_grade`
+that grade whole time series, or whole batches of them, in one call.
+
+Grades are returned as compact integer codes, indices into `GRADES`
+(0 for A up to 5 for F), which `grade_letters` turns back into letters.
+"""
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+GRADES = "ABCDEF"
+"""The LOS grades, best first, indexed by their codes."""
+
+PLAT_CROWD_LIMITS = (35, 25, 15, 10, 5)
+"""
+Least space per passenger (sqft) above which the platform crowding grade
+is A to E, see `model.plat_crowd_grade`.
+"""
+
+EGRESS_LIMITS = (5, 7, 9.5, 13, 17)
+"""
+Most upstairs flow (pax/ft/min) up to which the egress grade is A to E,
+see `model.egress_crowd_grade`.
+"""
+
+type GradeCodes = NDArray[np.int8]
+
+_LETTERS = np.array(list(GRADES), dtype="<U1")
+
+
+def plat_crowd_codes(inst_crowding: ArrayLike) -> GradeCodes:
+    """
+    Array version of `model.plat_crowd_grade`.
+
+    :param inst_crowding: platform space per passenger (sqft), any shape
+    :return: the grade codes, in the same shape
+    """
+    x = np.asarray(inst_crowding)
+    codes = np.zeros(x.shape, dtype=np.int8)
+    # Every limit not exceeded lowers the grade by one, as the if/elif chain does.
+    for limit in PLAT_CROWD_LIMITS:
+        codes += ~(x > limit)
+    return codes
+
+
+def egress_codes(w: ArrayLike, plat_egress_rate: ArrayLike) -> GradeCodes:
+    """
+    Array version of `model.egress_crowd_grade`.
+
+    :param w: total width of vertical circulation elements,
+    broadcastable against `plat_egress_rate`, e.g. one per scenario of shape
+    (scenarios, 1) for rates of shape (scenarios, seconds)
+    :param plat_egress_rate: upstairs flow rates (pax/s)
+    :return: the grade codes, in the broadcast shape
+    """
+    width = np.asarray(w)
+    rate = np.asarray(plat_egress_rate)
+    codes = np.zeros(np.broadcast_shapes(width.shape, rate.shape), dtype=np.int8)
+    for limit in EGRESS_LIMITS:
+        codes += ~(rate <= width * limit / 60)
+    return codes
+
+
+def grade_letters(codes: ArrayLike) -> NDArray[np.str_]:
+    """The LOS letters of grade codes, in the same shape."""
+    letters: NDArray[np.str_] = _LETTERS[np.asarray(codes)]
+    return letters
+
+
+def time_in_grade(
+    codes: ArrayLike, lengths: ArrayLike | None = None
+) -> NDArray[np.int64]:
+    """
+    Count the seconds spent in each grade.
+
+    :param codes: grade codes with time along the last axis,
+    e.g. of shape (seconds,) or (scenarios, seconds)
+    :param lengths: only count the first `lengths` seconds of each series,
+    for batches of different simulation times
+    :return: the seconds in each grade, of shape (..., len(GRADES))
+    """
+    c = np.asarray(codes)
+    if lengths is not None:
+        counted = np.arange(c.shape[-1]) < np.asarray(lengths)[..., np.newaxis]
+        c = np.where(counted, c, len(GRADES))
+    counts: NDArray[np.int64] = np.stack(
+        [np.count_nonzero(c == code, axis=-1) for code in range(len(GRADES))],
+        axis=-1,
+    ).astype(np.int64)
+    return counts
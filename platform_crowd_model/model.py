@@ -0,0 +1,845 @@
+"""
+The platform clearance model itself: rate functions, parameters and the
+time-step loop.
+
+This module only depends on NumPy, so it can be used to run scenarios
+without building a spreadsheet.
+"""
+
+import math
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Literal, NamedTuple, overload
+
+import numpy as np
+from numpy.typing import NDArray
+
+if TYPE_CHECKING:
+    from .cache import ResultCache
+    from .tracing import Tracer
+
+MODEL_VERSION = "2"
+"""
+Version of the model's equations.
+Bump this whenever a change alters the results of existing `Params`,
+so that cached results are no longer used.
+"""
+
+MIN_DT = 0.1
+"""The shortest supported time step (s)."""
+
+QUEUE_CHANGE = 0.1
+"""
+With `Params.adaptive_dt`, seconds in which a queue grows or shrinks
+by more than this fraction are refined.
+"""
+
+QUEUE_CHANGE_MIN_PAX = 0.1
+"""Changes in a queue smaller than this many passengers never refine a second."""
+
+CLEAR_PAX = 1
+"""A platform with fewer arrived passengers than this waiting is clear."""
+
+# basic flow: train egress > platform crowd > VCE egress rate > back to
+# platform crowd
+
+
+# keep high VCE egress rate if queues at stairs are long
+def alight_rate_fn(k: float, t: float, t0: float, u: float) -> float:
+    """
+    :param k: number of people waiting to get off train
+    :param t: time pass counter (s)
+    :param t0: train arrival time
+    :param u: train(x)doors*rate (1 pax/door/s)
+    :return: egress rate from train to platform across all doors (pax/s)
+    """
+    if t > t0:
+        return min(k, u)
+    else:
+        return 0
+
+
+def plat_clearance_fn(karr: float, a: float, w: float, qmax: float) -> float:
+    """
+    :param a: usable platform area
+    :param w: total width of vertical circulation elements
+    :param: karr: number of people waiting to get onto a stairwell
+    :param: qmax: number of people that can fit around stair thresholds
+    :return: platform egress rate on stairs
+    """
+    if karr <= qmax:
+        return min(
+            karr,
+            min(17 * w / 60, (111 * a / max(1, karr) - 162) / (a / max(1, karr)) ** 2),
+        )
+    else:
+        return max(
+            10 * w / 60,
+            # Min of upstairs LOS C/D boundary flow rate
+            min(17 * w / 60, (111 * a / max(1, karr) - 162) / (a / max(1, karr)) ** 2),
+        )
+
+
+def plat_ingress_fn(kdep: float, a: float, w: float, r_up: float) -> float:
+    """
+    :param kdep: number of people waiting to get onto a stairwell
+    :param a: usable concourse area
+    :param w: total width of vertical circulation elements
+    :param: r_up: upstairs flow, passed from plat_egress_fn
+    :return: platform ingress rate on stairs
+    """
+    # 1st question, how much downstairs flow demand exists?
+    # 2nd question, how much stair capacity does upstairs flow take?
+    # P = (111M - 162)/(M^2) is the upstairs flow eq per ft wide.
+    if kdep > 0:
+        return min(
+            kdep,
+            min(
+                max(0, 12 * w / 60 - r_up),
+                # Max of downstairs LOS C/D boundary flow rate
+                max(
+                    0,
+                    (
+                        (111 * (a / max(1, kdep)) - 162) / ((a / max(1, kdep)) ** 2)
+                        - r_up
+                    ),
+                ),
+            ),
+        )
+    else:
+        return 0
+
+
+def boarder_frac_fn(trainA_boarders: float, trainB_boarders: float) -> float:
+    if trainA_boarders + trainB_boarders > 0:
+        return trainA_boarders / (trainB_boarders + trainA_boarders)
+    else:
+        return 1
+
+
+def boarder_shares(boarders: NDArray[np.floating]) -> NDArray[np.floating]:
+    """
+    `boarder_frac_fn` for any number of trains.
+
+    :param boarders: passengers waiting upstairs to board each train,
+    with the trains along the last axis
+    :return: each train's share of them, or 1 for every train if there are none;
+    with two trains, the first share is `boarder_frac_fn(boarders[0], boarders[1])`
+    """
+    total = boarders.sum(axis=-1, keepdims=True)
+    return np.divide(boarders, total, out=np.ones_like(boarders), where=total > 0)
+
+
+def board_rate_fn(
+    r_max: float,
+    r_off: float,
+    sim_t: float,
+    arr_t: float,
+    dep_t: float,
+    boarders: float,
+) -> float:
+    """
+    :param vmax: maximum train deboard rate,
+    pass train1_doors or train2_doors from params, since 1 door/sec
+    :param r_off: train alight rate, pass alight_rate_fn
+    :param sim_t: time in seconds, pass counter
+    :param arr_t: train arrival time
+    :param: dep_t: train departure time
+    :param: boarders: number of passengers waiting on platform to board,
+    pass departing_pax_on_plat
+    :return: train ingress rate across all doors (pax/s)
+    """
+    if arr_t < sim_t < dep_t:
+        return min(r_max - r_off, boarders)
+    else:
+        return 0
+
+
+def space_per_pax_fn(k: float, a: float) -> float:
+    """
+    :param k: people on platform (pax)
+    :param a: usable platform area (ft^2)
+    :return: space per passenger (ft^2/pax)
+    """
+    if k > 0:
+        return a / k
+    else:
+        return a
+
+
+def plat_crowd_grade(inst_crowding: float) -> str:
+    if inst_crowding > 35:
+        return "A"
+    elif 25 < inst_crowding <= 35:
+        return "B"
+    elif 15 < inst_crowding <= 25:
+        return "C"
+    elif 10 < inst_crowding <= 15:
+        return "D"
+    elif 5 < inst_crowding <= 10:
+        return "E"
+    else:
+        return "F"
+
+
+def egress_crowd_grade(w: float, plat_egress_rate: float) -> str:
+    if plat_egress_rate <= w * 5 / 60:
+        return "A"
+    elif w * 5 / 60 < plat_egress_rate <= w * 7 / 60:
+        return "B"
+    elif w * 7 / 60 < plat_egress_rate <= w * 9.5 / 60:
+        return "C"
+    elif w * 9.5 / 60 < plat_egress_rate <= w * 13 / 60:
+        return "D"
+    elif w * 13 / 60 < plat_egress_rate <= w * 17 / 60:
+        return "E"
+    else:
+        return "F"
+
+
+@overload
+def is_clear(arrived_pax_waiting_on_plat: float) -> bool: ...
+
+
+@overload
+def is_clear(
+    arrived_pax_waiting_on_plat: NDArray[np.floating],
+) -> NDArray[np.bool_]: ...
+
+
+def is_clear(
+    arrived_pax_waiting_on_plat: float | NDArray[np.floating],
+) -> bool | NDArray[np.bool_]:
+    """Whether the platform is clear of arrived passengers, see `CLEAR_PAX`."""
+    return arrived_pax_waiting_on_plat < CLEAR_PAX
+
+
+def clear_time(
+    arrived_pax_waiting_on_plat: NDArray[np.floating],
+) -> NDArray[np.float64]:
+    """
+    The clearance time of one or more runs: the second after which the platform
+    is clear (see `is_clear`) for the rest of the run, 0 if it always is, or NaN
+    if it isn't clear at the end of the run, so its clearance time is unknown.
+
+    :param arrived_pax_waiting_on_plat: the arrived passengers waiting on the
+    platform, one second per entry along the last axis
+    :return: the clearance time (s) of each run
+    """
+    waiting = ~is_clear(arrived_pax_waiting_on_plat)
+    if not waiting.shape[-1]:
+        return np.zeros(waiting.shape[:-1])
+    last = waiting.shape[-1] - np.argmax(waiting[..., ::-1], axis=-1)
+    cleared_at = np.where(waiting.any(axis=-1), last, 0).astype(np.float64)
+    return np.where(waiting[..., -1], np.nan, cleared_at)
+
+
+@dataclass
+class Params:
+    filename_prefix: str
+    """Prefix of filename to save the spreadsheet in."""
+
+    simulation_time: int
+    """Time (in seconds) to simulate."""
+
+    platform_width: float
+    """Platform width (in feet)."""
+
+    platform_length: float
+    """Platform length (in feet)."""
+
+    usable_platform_area_multiplier: float
+    """
+    A multiplier to estimate the usable platform area (in square feet)
+    given obstructive elements on the platform (e.x. stairs, escalators, elevators, columns).
+    """
+
+    train1_arriving_pax: float
+    """Number of passengers arriving on train 1."""
+
+    train2_arriving_pax: float
+    """Number of passengers arriving on train 2."""
+
+    train1_departing_pax: float
+    """Number of passengers departing on train 1."""
+
+    train2_departing_pax: float
+    """Number of passengers departing on train 2."""
+
+    train1_doors: float
+    """Number of doors (single-door equivalents) on train 1."""
+
+    train2_doors: float
+    """Number of doors (single-door equivalents) on train 2."""
+
+    train1_arrival_time: int
+    """Time (in seconds) when train 1 arrives."""
+
+    train2_arrival_time: int
+    """Time (in seconds) when train 2 arrives."""
+
+    queue_length: float
+    """Length (in feet) of the queue in front of each stair that pushes max flow."""
+
+    total_vce_width: float
+    """Total width (in feet) of all of the VCEs (vertical circulation elements) going upstairs."""
+
+    vce_widths: NDArray[np.floating]
+    """Widths (in feet) of each VCE (vertical circulation element)."""
+
+    train1_boarding_pax: float
+    """Number of passengers already on the platform at time 0 wanting to board train 1."""
+
+    train2_boarding_pax: float
+    """Number of passengers already on the platform at time 0 wanting to board train 2."""
+
+    dt: float = 1
+    """
+    Length (in seconds) of each time step, between 0.1 and 1.
+    One second must be a whole number of steps; results are still reported per second.
+    """
+
+    adaptive_dt: bool = False
+    """
+    Only use steps of `dt` for the seconds around train arrivals and
+    queue transitions (a queue forming, emptying or changing quickly,
+    or the stair queue crossing `queue_length`), and 1 second steps elsewhere.
+    """
+
+    def __post_init__(self) -> None:
+        if not MIN_DT <= self.dt <= 1:
+            raise ValueError(f"dt must be between {MIN_DT} and 1 s, got {self.dt}")
+        if not math.isclose(self.steps_per_second * self.dt, 1):
+            raise ValueError(f"1 s must be a whole number of steps, got dt={self.dt}")
+
+    @property
+    def steps_per_second(self) -> int:
+        """Number of steps of length `dt` in one second."""
+        return round(1 / self.dt)
+
+    @property
+    def eff_area(self) -> float:
+        """Usable platform area (in square feet)."""
+        return (
+            self.platform_width
+            * self.platform_length
+            * self.usable_platform_area_multiplier
+        )
+
+
+@dataclass
+class SimulationResult:
+    """
+    The per-second output of `simulate`, one array per spreadsheet column.
+
+    Every array has one entry per simulated second.
+    """
+
+    time_after: NDArray[np.int64]
+    """Time after the start of the simulation (s)."""
+
+    train1_pax: NDArray[np.floating]
+    """Passengers on train 1."""
+
+    train2_pax: NDArray[np.floating]
+    """Passengers on train 2."""
+
+    train1_off_rate: NDArray[np.floating]
+    """Train 1 alight rate (pax/s)."""
+
+    train2_off_rate: NDArray[np.floating]
+    """Train 2 alight rate (pax/s)."""
+
+    train1_on_rate: NDArray[np.floating]
+    """Train 1 board rate (pax/s)."""
+
+    train2_on_rate: NDArray[np.floating]
+    """Train 2 board rate (pax/s)."""
+
+    down_rate: NDArray[np.floating]
+    """Downstairs rate onto the platform (pax/s)."""
+
+    up_rate: NDArray[np.floating]
+    """Upstairs rate off of the platform (pax/s)."""
+
+    departing_pax_on_plat_1: NDArray[np.floating]
+    """Train 1 departing passengers on the platform."""
+
+    departing_pax_on_plat_2: NDArray[np.floating]
+    """Train 2 departing passengers on the platform."""
+
+    arrived_pax_waiting_on_plat: NDArray[np.floating]
+    """Arrived passengers on the platform waiting to go upstairs."""
+
+    total_pax_on_platform: NDArray[np.floating]
+    """Total passengers on the platform."""
+
+    inst_crowding: NDArray[np.floating]
+    """Platform space per passenger (sqft)."""
+
+    net_pax_flow_rate: NDArray[np.floating]
+    """Net platform flow rate (pax/s)."""
+
+    plat_crowd_los: NDArray[np.str_]
+    """Platform crowding LOS grade."""
+
+    egress_los: NDArray[np.str_]
+    """Egress LOS grade."""
+
+    @classmethod
+    def from_steps(
+        cls, steps: Iterable["SimulationStep"], n: int
+    ) -> "SimulationResult":
+        """
+        Collect `n` steps, such as those of `iter_simulation`, into a result.
+
+        :param steps: the steps, of which the first `n` are used
+        :param n: number of steps
+        :return: the result
+        """
+        result = cls(
+            time_after=np.empty(n, dtype=np.int64),
+            train1_pax=np.empty(n),
+            train2_pax=np.empty(n),
+            train1_off_rate=np.empty(n),
+            train2_off_rate=np.empty(n),
+            train1_on_rate=np.empty(n),
+            train2_on_rate=np.empty(n),
+            down_rate=np.empty(n),
+            up_rate=np.empty(n),
+            departing_pax_on_plat_1=np.empty(n),
+            departing_pax_on_plat_2=np.empty(n),
+            arrived_pax_waiting_on_plat=np.empty(n),
+            total_pax_on_platform=np.empty(n),
+            inst_crowding=np.empty(n),
+            net_pax_flow_rate=np.empty(n),
+            plat_crowd_los=np.empty(n, dtype="<U1"),
+            egress_los=np.empty(n, dtype="<U1"),
+        )
+        columns = [getattr(result, name) for name in SimulationStep._fields]
+        for i, step in zip(range(n), steps):
+            for column, value in zip(columns, step):
+                column[i] = value
+        return result
+
+    def __len__(self) -> int:
+        return len(self.time_after)
+
+    def steps(self) -> Iterator["SimulationStep"]:
+        """Iterate over the rows of the result, like `iter_simulation`."""
+        columns = [getattr(self, name).tolist() for name in SimulationStep._fields]
+        for row in zip(*columns):
+            yield SimulationStep(*row)
+
+
+class SimulationStep(NamedTuple):
+    """One second of output from `iter_simulation`, one value per column."""
+
+    time_after: int
+    train1_pax: float
+    train2_pax: float
+    train1_off_rate: float
+    train2_off_rate: float
+    train1_on_rate: float
+    train2_on_rate: float
+    down_rate: float
+    up_rate: float
+    departing_pax_on_plat_1: float
+    departing_pax_on_plat_2: float
+    arrived_pax_waiting_on_plat: float
+    total_pax_on_platform: float
+    inst_crowding: float
+    net_pax_flow_rate: float
+    plat_crowd_los: str
+    egress_los: str
+
+
+@dataclass(slots=True)
+class ModelState:
+    """The counters of the time-step loop, between two time steps."""
+
+    train1_remaining_arrivals: float
+    """Passengers still waiting to get off train 1."""
+
+    train2_remaining_arrivals: float
+    """Passengers still waiting to get off train 2."""
+
+    train1_new_pax: float
+    """Passengers that have boarded train 1."""
+
+    train2_new_pax: float
+    """Passengers that have boarded train 2."""
+
+    train1_boarders_upstairs: float
+    """Passengers for train 1 that are still upstairs."""
+
+    train2_boarders_upstairs: float
+    """Passengers for train 2 that are still upstairs."""
+
+    train1_boarders_on_plat: float
+    """Passengers for train 1 waiting on the platform."""
+
+    train2_boarders_on_plat: float
+    """Passengers for train 2 waiting on the platform."""
+
+    arrived_pax_waiting_on_plat: float
+    """Arrived passengers on the platform waiting to go upstairs."""
+
+    total_pax_on_platform: float
+    """Total passengers on the platform."""
+
+    @classmethod
+    def initial(cls, params: Params) -> "ModelState":
+        """The state at time 0."""
+        train1_boarders_on_plat = float(params.train1_boarding_pax)
+        train2_boarders_on_plat = float(params.train2_boarding_pax)
+        return cls(
+            train1_remaining_arrivals=float(params.train1_arriving_pax),
+            train2_remaining_arrivals=float(params.train2_arriving_pax),
+            train1_new_pax=0,
+            train2_new_pax=0,
+            train1_boarders_upstairs=float(
+                params.train1_departing_pax - params.train1_boarding_pax
+            ),
+            train2_boarders_upstairs=float(
+                params.train2_departing_pax - params.train2_boarding_pax
+            ),
+            train1_boarders_on_plat=train1_boarders_on_plat,
+            train2_boarders_on_plat=train2_boarders_on_plat,
+            arrived_pax_waiting_on_plat=0,
+            total_pax_on_platform=train1_boarders_on_plat + train2_boarders_on_plat,
+        )
+
+    def copy(self) -> "ModelState":
+        return ModelState(*self.values())
+
+    def restore(self, other: "ModelState") -> None:
+        """Set every counter to its value in `other`."""
+        for name in self.__slots__:
+            setattr(self, name, getattr(other, name))
+
+    def values(self) -> tuple[float, ...]:
+        """The counters, in field order."""
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+
+type _Rates = tuple[float, float, float, float, float, float, float, float]
+"""
+The flow rates (pax/s) of one time step, in the order
+train1_off_rate, train2_off_rate, plat_egress_rate, plat_ingress_rate_1,
+plat_ingress_rate_2, train1_on_rate, train2_on_rate,
+followed by the space per passenger after it.
+"""
+
+
+def _substep(params: Params, s: ModelState, time_after: float, dt: float) -> _Rates:
+    """
+    Advance `s` by one time step of `dt` seconds, in place.
+
+    Each flow moves `rate * dt` passengers from one counter to another,
+    and no rate takes more passengers than its source holds,
+    so passengers are conserved for any `dt`.
+
+    :return: the flow rates during the step and the space per passenger after it,
+    see `_Rates`
+    """
+    eff_area = params.eff_area
+
+    train1_off_rate = alight_rate_fn(
+        s.train1_remaining_arrivals,
+        time_after,
+        params.train1_arrival_time,
+        params.train1_doors,
+    )
+    s.train1_remaining_arrivals -= train1_off_rate * dt
+    if s.train1_remaining_arrivals < 0:
+        s.train1_remaining_arrivals = 0
+    train2_off_rate = alight_rate_fn(
+        s.train2_remaining_arrivals,
+        time_after,
+        params.train2_arrival_time,
+        params.train2_doors,
+    )
+    s.train2_remaining_arrivals -= train2_off_rate * dt
+    if s.train2_remaining_arrivals < 0:
+        s.train2_remaining_arrivals = 0
+    s.total_pax_on_platform += (train1_off_rate + train2_off_rate) * dt
+    s.arrived_pax_waiting_on_plat += (train1_off_rate + train2_off_rate) * dt
+    # Never take more passengers up the stairs than are waiting for them.
+    plat_egress_rate = min(
+        plat_clearance_fn(
+            s.arrived_pax_waiting_on_plat,
+            eff_area,
+            params.total_vce_width,
+            params.total_vce_width * params.queue_length / 5,
+        ),
+        s.arrived_pax_waiting_on_plat / dt,
+    )
+    s.arrived_pax_waiting_on_plat -= plat_egress_rate * dt
+    if s.arrived_pax_waiting_on_plat < 0:
+        s.arrived_pax_waiting_on_plat = 0
+    s.total_pax_on_platform -= plat_egress_rate * dt
+    plat_ingress_rate_1 = plat_ingress_fn(
+        s.train1_boarders_upstairs,
+        5000,
+        params.total_vce_width
+        * boarder_frac_fn(s.train1_boarders_upstairs, s.train2_boarders_upstairs),
+        plat_egress_rate,
+    )
+
+    plat_ingress_rate_2 = plat_ingress_fn(
+        s.train2_boarders_upstairs,
+        5000,
+        params.total_vce_width
+        * boarder_frac_fn(s.train2_boarders_upstairs, s.train1_boarders_upstairs),
+        plat_egress_rate,
+    )
+    s.train1_boarders_on_plat += plat_ingress_rate_1 * dt
+    s.train2_boarders_on_plat += plat_ingress_rate_2 * dt
+    s.total_pax_on_platform += plat_ingress_rate_1 * dt
+    s.total_pax_on_platform += plat_ingress_rate_2 * dt
+    train1_on_rate = board_rate_fn(
+        params.train1_doors,
+        train1_off_rate,
+        time_after,
+        params.train1_arrival_time,
+        params.simulation_time,
+        s.train1_boarders_on_plat,
+    )
+    train2_on_rate = board_rate_fn(
+        params.train2_doors,
+        train2_off_rate,
+        time_after,
+        params.train2_arrival_time,
+        params.simulation_time,
+        s.train2_boarders_on_plat,
+    )
+
+    s.train1_boarders_on_plat -= train1_on_rate * dt
+
+    s.train2_boarders_on_plat -= train2_on_rate * dt
+
+    s.total_pax_on_platform -= train1_on_rate * dt
+
+    s.total_pax_on_platform -= train2_on_rate * dt
+
+    s.train1_boarders_upstairs -= plat_ingress_rate_1 * dt
+
+    s.train2_boarders_upstairs -= plat_ingress_rate_2 * dt
+
+    s.train1_new_pax += train1_on_rate * dt
+
+    s.train2_new_pax += train2_on_rate * dt
+
+    inst_crowding = space_per_pax_fn(s.total_pax_on_platform, eff_area)
+    if s.total_pax_on_platform < 0:
+        s.total_pax_on_platform = 0
+    if s.train1_boarders_on_plat < 0:
+        s.train1_boarders_on_plat = 0
+    if s.train2_boarders_on_plat < 0:
+        s.train2_boarders_on_plat = 0
+    if s.arrived_pax_waiting_on_plat < 0:
+        s.arrived_pax_waiting_on_plat = 0
+    return (
+        train1_off_rate,
+        train2_off_rate,
+        plat_egress_rate,
+        plat_ingress_rate_1,
+        plat_ingress_rate_2,
+        train1_on_rate,
+        train2_on_rate,
+        inst_crowding,
+    )
+
+
+_QUEUES = (
+    "train1_remaining_arrivals",
+    "train2_remaining_arrivals",
+    "train1_boarders_upstairs",
+    "train2_boarders_upstairs",
+    "train1_boarders_on_plat",
+    "train2_boarders_on_plat",
+    "arrived_pax_waiting_on_plat",
+)
+
+
+def _substeps(params: Params, s: ModelState, time_after: int, n: int) -> _Rates:
+    """
+    Advance `s` by one second in `n` steps, in place.
+
+    :return: the rates averaged over the second, and the crowding at its end
+    """
+    dt = 1 / n
+    moved = [0.0] * 7
+    inst_crowding = 0.0
+    for i in range(n):
+        *step_rates, inst_crowding = _substep(params, s, time_after + i * dt, dt)
+        for j, rate in enumerate(step_rates):
+            moved[j] += rate * dt
+    return (
+        moved[0],
+        moved[1],
+        moved[2],
+        moved[3],
+        moved[4],
+        moved[5],
+        moved[6],
+        inst_crowding,
+    )
+
+
+def _needs_refinement(
+    params: Params, before: ModelState, after: ModelState, time_after: int
+) -> bool:
+    """
+    Whether the second starting at `time_after`, stepped from `before` to `after`
+    in one step, should be redone in steps of `params.dt`.
+    """
+    for arrival_time in (params.train1_arrival_time, params.train2_arrival_time):
+        if time_after <= arrival_time < time_after + 1:
+            return True
+    for name in _QUEUES:
+        # This also catches queues forming or emptying.
+        change = abs(getattr(after, name) - getattr(before, name))
+        if change > max(
+            QUEUE_CHANGE_MIN_PAX,
+            QUEUE_CHANGE * max(getattr(before, name), getattr(after, name)),
+        ):
+            return True
+    qmax = params.total_vce_width * params.queue_length / 5
+    return (before.arrived_pax_waiting_on_plat <= qmax) != (
+        after.arrived_pax_waiting_on_plat <= qmax
+    )
+
+
+def advance(params: Params, state: ModelState, time_after: int) -> SimulationStep:
+    """
+    Advance `state` by one second, in place.
+
+    The second is simulated in `params.steps_per_second` steps
+    (or, with `params.adaptive_dt`, only if it needs refining),
+    and the rates reported are averaged over the second.
+
+    :param params: the scenario being simulated
+    :param state: the counters at `time_after`, updated in place
+    :param time_after: the current time (s)
+    :return: the output of this second
+    """
+    s = state
+    n = params.steps_per_second
+    if params.adaptive_dt and n > 1:
+        # Try the whole second as one step, and only redo it in steps of `dt`
+        # if something changes within it.
+        before = s.copy()
+        rates = _substep(params, s, time_after, 1)
+        if _needs_refinement(params, before, s, time_after):
+            s.restore(before)
+        else:
+            n = 1
+    elif n == 1:
+        rates = _substep(params, s, time_after, 1)
+    if n > 1:
+        rates = _substeps(params, s, time_after, n)
+    (
+        train1_off_rate,
+        train2_off_rate,
+        plat_egress_rate,
+        plat_ingress_rate_1,
+        plat_ingress_rate_2,
+        train1_on_rate,
+        train2_on_rate,
+        inst_crowding,
+    ) = rates
+
+    net_pax_flow_rate = (
+        plat_ingress_rate_1
+        + plat_ingress_rate_2
+        + train1_off_rate
+        + train2_off_rate
+        - plat_egress_rate
+        - train1_on_rate
+        - train2_on_rate
+    )
+
+    return SimulationStep(
+        time_after=time_after,
+        train1_pax=s.train1_remaining_arrivals + s.train1_new_pax,
+        train2_pax=s.train2_remaining_arrivals + s.train2_new_pax,
+        train1_off_rate=train1_off_rate,
+        train2_off_rate=train2_off_rate,
+        train1_on_rate=train1_on_rate,
+        train2_on_rate=train2_on_rate,
+        down_rate=plat_ingress_rate_1 + plat_ingress_rate_2,
+        up_rate=plat_egress_rate,
+        departing_pax_on_plat_1=s.train1_boarders_on_plat,
+        departing_pax_on_plat_2=s.train2_boarders_on_plat,
+        arrived_pax_waiting_on_plat=s.arrived_pax_waiting_on_plat,
+        total_pax_on_platform=s.total_pax_on_platform,
+        inst_crowding=inst_crowding,
+        net_pax_flow_rate=net_pax_flow_rate,
+        plat_crowd_los=plat_crowd_grade(inst_crowding),
+        egress_los=egress_crowd_grade(params.total_vce_width, plat_egress_rate),
+    )
+
+
+def iter_simulation(params: Params) -> Iterator[SimulationStep]:
+    """
+    Run the time-step loop for one scenario, yielding each second as it is computed.
+
+    :param params: the scenario to simulate
+    :return: one step per simulated second
+    """
+    state = ModelState.initial(params)
+    for time_after in range(params.simulation_time):
+        yield advance(params, state, time_after)
+
+
+def simulate(
+    params: Params,
+    cache: "ResultCache | None" = None,
+    integrator: Literal["fixed", "event"] = "fixed",
+    tracer: "Tracer | None" = None,
+) -> SimulationResult:
+    """
+    Run the time-step loop for one scenario.
+
+    :param params: the scenario to simulate
+    :param cache: if given, return the stored result of `params` if there is one,
+    and store the result otherwise; the cache only holds fixed-step results,
+    so the event integrator doesn't use it
+    :param integrator: `"fixed"` steps every second, `"event"` jumps over stretches
+    where the rates are constant (see `events.integrate_events`) and gives the same
+    results up to floating-point rounding
+    :param tracer: call this with every second of the run, see `tracing`;
+    a stored or event-driven result is traced once it is complete
+    :return: the per-second results, one array per column
+    """
+    if integrator == "event":
+        from .events import integrate_events
+
+        result = integrate_events(params).to_grid()
+        if tracer is not None:
+            from .tracing import trace_result
+
+            trace_result(result, tracer)
+        return result
+
+    if cache is not None:
+        cached = cache.get(params)
+        if cached is not None:
+            if tracer is not None:
+                from .tracing import trace_result
+
+                trace_result(cached, tracer)
+            return cached
+
+    steps = iter_simulation(params)
+    if tracer is not None:
+        from .tracing import traced
+
+        steps = traced(steps, tracer)
+    result = SimulationResult.from_steps(steps, params.simulation_time)
+
+    if cache is not None:
+        cache.put(params, result)
+    return result
@@ -0,0 +1,302 @@
+"""
+Monte Carlo runs: sample uncertain inputs of a scenario many times and run
+every replication through the batch engine, to get percentile envelopes of
+crowding and the probabilities of reaching each LOS grade.
+
+Every input is sampled up front from one seeded NumPy generator, so the
+results only depend on the seed, not on how the replications are split
+into batches.
+
+The envelopes need every replication's value at each second, so the run moves
+through time one window at a time, taking every batch through the window before
+the next: only one window of per-second values is ever held, not the whole run.
+"""
+
+import dataclasses
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .batch import BatchParams, BatchState, FloatArray, advance_batch
+from .los import GRADES, egress_codes, plat_crowd_codes
+from .model import Params
+
+DEFAULT_PERCENTILES = (50, 90, 99)
+"""The percentiles of the envelopes by default."""
+
+DEFAULT_BATCH_SIZE = 1024
+"""Number of replications simulated together by default."""
+
+DEFAULT_WINDOW = 600
+"""Number of seconds whose per-second values are held at once by default."""
+
+
+@dataclass(frozen=True)
+class Fixed:
+    """Always the same value."""
+
+    value: float
+
+    def sample(self, rng: np.random.Generator, n: int) -> FloatArray:
+        return np.full(n, self.value, dtype=np.float64)
+
+
+@dataclass(frozen=True)
+class Normal:
+    """A normal distribution."""
+
+    mean: float
+    sd: float
+
+    def sample(self, rng: np.random.Generator, n: int) -> FloatArray:
+        return rng.normal(self.mean, self.sd, n)
+
+
+@dataclass(frozen=True)
+class Uniform:
+    """A uniform distribution between `low` and `high`."""
+
+    low: float
+    high: float
+
+    def sample(self, rng: np.random.Generator, n: int) -> FloatArray:
+        return rng.uniform(self.low, self.high, n)
+
+
+@dataclass(frozen=True)
+class Triangular:
+    """A triangular distribution between `low` and `high`, peaking at `mode`."""
+
+    low: float
+    mode: float
+    high: float
+
+    def sample(self, rng: np.random.Generator, n: int) -> FloatArray:
+        return rng.triangular(self.low, self.mode, self.high, n)
+
+
+type Distribution = Fixed | Normal | Uniform | Triangular
+
+
+@dataclass
+class MonteCarloParams:
+    """
+    A scenario and the distributions of its uncertain inputs.
+
+    Each input is sampled independently for each train of each replication,
+    and clipped to the values it can take.
+    """
+
+    base: Params
+    """The scenario to vary, which must use 1 s time steps."""
+
+    replications: int = 1000
+    """Number of replications to simulate."""
+
+    seed: int | None = None
+    """Seed of the random number generator, `None` for a fresh one every run."""
+
+    train_delay: Distribution = Fixed(0)
+    """Delay (s) added to each train's arrival time; negative for early trains."""
+
+    load_factor: Distribution = Fixed(1)
+    """Factor applied to the passengers arriving on each train."""
+
+    boarder_factor: Distribution = Fixed(1)
+    """Factor applied to the passengers departing on each train."""
+
+    door_rate: Distribution = Fixed(1)
+    """Throughput (pax/door/s) of each train's doors, for alighting and boarding."""
+
+    on_platform_share: Distribution | None = None
+    """
+    Share of each train's departing passengers already on the platform at time 0,
+    the rest coming down from upstairs; `None` keeps the shares of `base`.
+    """
+
+    def sample(self) -> BatchParams:
+        """Sample the inputs of every replication."""
+        rng = np.random.default_rng(self.seed)
+        n = self.replications
+        single = BatchParams.from_params([self.base])
+        bp = BatchParams(
+            **{
+                field.name: np.repeat(getattr(single, field.name), n)
+                for field in dataclasses.fields(BatchParams)
+            }
+        )
+        for train in ("train1", "train2"):
+            arrival_time = getattr(bp, f"{train}_arrival_time")
+            arriving = getattr(bp, f"{train}_arriving_pax")
+            departing = getattr(bp, f"{train}_departing_pax")
+            boarding = getattr(bp, f"{train}_boarding_pax")
+            doors = getattr(bp, f"{train}_doors")
+            share = (
+                np.divide(boarding, departing, out=np.zeros(n), where=departing > 0)
+                if self.on_platform_share is None
+                else np.clip(self.on_platform_share.sample(rng, n), 0, 1)
+            )
+            departing = departing * np.maximum(self.boarder_factor.sample(rng, n), 0)
+            setattr(
+                bp,
+                f"{train}_arrival_time",
+                np.maximum(arrival_time + self.train_delay.sample(rng, n), 0),
+            )
+            setattr(
+                bp,
+                f"{train}_arriving_pax",
+                arriving * np.maximum(self.load_factor.sample(rng, n), 0),
+            )
+            setattr(bp, f"{train}_departing_pax", departing)
+            setattr(bp, f"{train}_boarding_pax", departing * share)
+            setattr(
+                bp,
+                f"{train}_doors",
+                doors * np.maximum(self.door_rate.sample(rng, n), 0),
+            )
+        return bp
+
+
+@dataclass
+class MonteCarloResult:
+    """
+    The output of `simulate_monte_carlo`.
+
+    Envelopes have shape (percentiles, seconds); the per-second exceedance
+    probabilities have shape (seconds, grades), for the grades in `los.GRADES`.
+    """
+
+    percentiles: tuple[float, ...]
+    """The percentiles of the envelopes."""
+
+    space_envelope: FloatArray
+    """
+    Platform space per passenger (sqft) that the given percentage of replications
+    have at least, each second; the P90 envelope is the space that is beaten
+    in 90% of replications.
+    """
+
+    load_envelope: FloatArray
+    """
+    Passengers on the platform that the given percentage of replications
+    have at most, each second.
+    """
+
+    plat_crowd_exceedance: FloatArray
+    """Probability of each platform crowding grade or worse, each second."""
+
+    egress_exceedance: FloatArray
+    """Probability of each egress grade or worse, each second."""
+
+    worst_plat_crowd_exceedance: FloatArray
+    """Probability of reaching each platform crowding grade or worse at some point."""
+
+    worst_egress_exceedance: FloatArray
+    """Probability of reaching each egress grade or worse at some point."""
+
+    peak_total_pax_on_platform: FloatArray
+    """Most passengers on the platform at once, in each replication."""
+
+    min_inst_crowding: FloatArray
+    """Least space per passenger (sqft), in each replication."""
+
+    def __len__(self) -> int:
+        """The number of replications."""
+        return len(self.peak_total_pax_on_platform)
+
+
+def _exceedance(counts: NDArray[np.int64], n: int) -> FloatArray:
+    """Probabilities of each grade or worse, from counts of each grade."""
+    worse: NDArray[np.int64] = np.cumsum(counts[..., ::-1], axis=-1)[..., ::-1]
+    return worse / max(n, 1)
+
+
+def simulate_monte_carlo(
+    params: MonteCarloParams,
+    percentiles: tuple[float, ...] = DEFAULT_PERCENTILES,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    window: int = DEFAULT_WINDOW,
+) -> MonteCarloResult:
+    """
+    Simulate every replication of a Monte Carlo run.
+
+    Memory use grows with the number of replications times `window`, not with
+    the simulation time, and neither `batch_size` nor `window` changes the results.
+
+    :param params: the scenario and its uncertain inputs
+    :param percentiles: the percentiles of the envelopes
+    :param batch_size: number of replications stepped together, which bounds
+    the working arrays of the batch engine
+    :param window: number of seconds whose per-second values are held at once
+    :return: the envelopes and exceedance probabilities
+    """
+    if batch_size < 1 or window < 1:
+        raise ValueError(
+            f"batch_size and window must be positive, got {batch_size} and {window}"
+        )
+    sampled = params.sample()
+    n = len(sampled)
+    seconds = params.base.simulation_time
+    grades = len(GRADES)
+    q = np.asarray(percentiles, dtype=np.float64) / 100
+
+    batches = []
+    for start in range(0, n, batch_size):
+        rows = slice(start, min(start + batch_size, n))
+        bp = sampled.take(rows)
+        batches.append((rows, bp, BatchState.initial(bp)))
+
+    space_envelope = np.empty((len(q), seconds))
+    load_envelope = np.empty((len(q), seconds))
+    plat_crowd_counts = np.zeros((seconds, grades), dtype=np.int64)
+    egress_counts = np.zeros((seconds, grades), dtype=np.int64)
+    worst_plat_crowd = np.zeros(n, dtype=np.int8)
+    worst_egress = np.zeros(n, dtype=np.int8)
+    peak_total_pax_on_platform = np.zeros(n)
+    min_inst_crowding = np.full(n, float(params.base.eff_area))
+
+    for start_time in range(0, seconds, window):
+        times = range(start_time, min(start_time + window, seconds))
+        inst_crowding = np.empty((n, len(times)))
+        total_pax_on_platform = np.empty((n, len(times)))
+        for rows, bp, state in batches:
+            for i, time_after in enumerate(times):
+                step = advance_batch(bp, state, time_after)
+                inst_crowding[rows, i] = step.inst_crowding
+                total_pax_on_platform[rows, i] = state.total_pax_on_platform
+                plat_crowd = plat_crowd_codes(step.inst_crowding)
+                egress = egress_codes(bp.total_vce_width, step.plat_egress_rate)
+                plat_crowd_counts[time_after] += np.bincount(
+                    plat_crowd, minlength=grades
+                )
+                egress_counts[time_after] += np.bincount(egress, minlength=grades)
+                np.maximum(
+                    worst_plat_crowd[rows], plat_crowd, out=worst_plat_crowd[rows]
+                )
+                np.maximum(worst_egress[rows], egress, out=worst_egress[rows])
+        columns = slice(times.start, times.stop)
+        space_envelope[:, columns] = np.quantile(inst_crowding, 1 - q, axis=0)
+        load_envelope[:, columns] = np.quantile(total_pax_on_platform, q, axis=0)
+        np.maximum(
+            peak_total_pax_on_platform,
+            total_pax_on_platform.max(axis=1),
+            out=peak_total_pax_on_platform,
+        )
+        np.minimum(min_inst_crowding, inst_crowding.min(axis=1), out=min_inst_crowding)
+
+    return MonteCarloResult(
+        percentiles=tuple(percentiles),
+        space_envelope=space_envelope,
+        load_envelope=load_envelope,
+        plat_crowd_exceedance=_exceedance(plat_crowd_counts, n),
+        egress_exceedance=_exceedance(egress_counts, n),
+        worst_plat_crowd_exceedance=_exceedance(
+            np.bincount(worst_plat_crowd, minlength=grades), n
+        ),
+        worst_egress_exceedance=_exceedance(
+            np.bincount(worst_egress, minlength=grades), n
+        ),
+        peak_total_pax_on_platform=peak_total_pax_on_platform,
+        min_inst_crowding=min_inst_crowding,
+    )
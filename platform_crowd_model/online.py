@@ -0,0 +1,233 @@
+"""
+Live crowding forecasts for one platform, driven by train arrivals as they
+are announced.
+
+An `OnlineModel` holds the counters of a `timetable.LivePlatform` at the current
+time. `push_arrival` adds a train to it, `advance` simulates only the seconds
+the clock moves on by, and `forecast` runs a copy of it ahead to project the
+space per passenger and LOS grades. Nothing is ever re-simulated from the start,
+so the cost of an update only depends on how far it looks ahead, which is capped
+at `MAX_HORIZON` seconds, not on how long the model has been running.
+
+`replay` feeds a recorded timetable through an `OnlineModel` to test it offline,
+timing every update.
+"""
+
+import math
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .model import Params
+from .timetable import DAY, DayChunk, LivePlatform
+from .trains import Train
+
+DEFAULT_HORIZON = 300
+"""Number of seconds a forecast looks ahead by default."""
+
+MAX_HORIZON = 3600
+"""Most seconds a forecast can look ahead, which bounds the cost of one."""
+
+DEFAULT_EVERY = 60
+"""Seconds between the forecasts of `replay` by default."""
+
+
+@dataclass
+class Forecast:
+    """The projected results of the seconds after an `OnlineModel`'s current time."""
+
+    results: DayChunk
+    """The projected per-second results."""
+
+    plat_crowd_los: NDArray[np.str_]
+    """The projected platform crowding LOS grade of every second."""
+
+    egress_los: NDArray[np.str_]
+    """The projected egress LOS grade of every second."""
+
+    @property
+    def min_inst_crowding(self) -> float:
+        """Least space per passenger (sqft) projected."""
+        return float(self.results.inst_crowding.min())
+
+    @property
+    def min_inst_crowding_at(self) -> int:
+        """The time (s) of the least space per passenger projected."""
+        return int(self.results.time_after[np.argmin(self.results.inst_crowding)])
+
+    @property
+    def worst_plat_crowd_los(self) -> str:
+        """The worst platform crowding LOS grade projected."""
+        return str(np.sort(self.plat_crowd_los)[-1])
+
+    @property
+    def worst_egress_los(self) -> str:
+        """The worst egress LOS grade projected."""
+        return str(np.sort(self.egress_los)[-1])
+
+
+def _check_horizon(horizon: int) -> None:
+    if not 1 <= horizon <= MAX_HORIZON:
+        raise ValueError(f"expected a horizon from 1 to {MAX_HORIZON} s, got {horizon}")
+
+
+class OnlineModel:
+    """One platform simulated as time passes, with trains added as they are announced."""
+
+    def __init__(self, platform: Params, start_time: int = 0) -> None:
+        """
+        :param platform: the platform, whose `train1_*` and `train2_*` fields
+        are ignored, and which must use 1 s time steps
+        :param start_time: the time (s) to start the clock at, on the same scale
+        as the arrival and departure times of the trains; `time_after` is then
+        the current time, before which every second has been simulated
+        """
+        self.platform = platform
+        self.time_after = start_time
+        self._model = LivePlatform(platform, DAY)
+
+    @property
+    def trains(self) -> list[Train]:
+        """The trains in the model: at the platform, or with boarders on their way."""
+        return list(self._model.trains)
+
+    @property
+    def total_pax_on_platform(self) -> float:
+        """Total passengers on the platform now."""
+        return self._model.state.total_pax_on_platform
+
+    def push_arrival(self, train: Train) -> None:
+        """
+        Add a train, whose boarders show up now, upstairs or
+        (`Train.boarding_pax`) on the platform.
+
+        :param train: the train, which must have a departure time; it can
+        arrive later, or may have already arrived, in which case its passengers
+        start getting off straight away
+        """
+        if train.departure_time is None:
+            raise ValueError("a live train needs a departure time")
+        self._model.admit(train)
+
+    def advance(self, seconds: int) -> DayChunk:
+        """
+        Move the clock on, simulating only the new seconds.
+
+        :param seconds: number of seconds to move on by
+        :return: the results of those seconds
+        """
+        if seconds < 0:
+            raise ValueError(f"can't advance by a negative time, got {seconds} s")
+        chunk = DayChunk.empty(self.time_after, seconds)
+        self._model.run(chunk, 0, seconds)
+        self.time_after += seconds
+        return chunk
+
+    def forecast(self, horizon: int = DEFAULT_HORIZON) -> Forecast:
+        """
+        Project the next seconds from the current state, assuming no more trains
+        are pushed, without moving the clock on.
+
+        :param horizon: number of seconds to look ahead, up to `MAX_HORIZON`
+        :return: the projected results
+        """
+        _check_horizon(horizon)
+        chunk = DayChunk.empty(self.time_after, horizon)
+        self._model.copy().run(chunk, 0, horizon)
+        plat_crowd_los, egress_los = chunk.los(self.platform.total_vce_width)
+        return Forecast(
+            results=chunk, plat_crowd_los=plat_crowd_los, egress_los=egress_los
+        )
+
+
+@dataclass
+class ReplayRow:
+    """One forecast made by `replay`."""
+
+    time_after: int
+    """The time (s) of the forecast."""
+
+    trains: int
+    """Number of trains in the model."""
+
+    total_pax_on_platform: float
+    """Total passengers on the platform at the time of the forecast."""
+
+    min_inst_crowding: float
+    """Least space per passenger (sqft) forecast."""
+
+    min_inst_crowding_at: int
+    """The time (s) of the least space per passenger forecast."""
+
+    plat_crowd_los: str
+    """The worst platform crowding LOS grade forecast."""
+
+    egress_los: str
+    """The worst egress LOS grade forecast."""
+
+    latency: float
+    """
+    Wall time (s) of the update: pushing the trains announced since the last
+    forecast, advancing the clock to this one and forecasting.
+    """
+
+
+def replay(
+    platform: Params,
+    trains: Iterable[Train],
+    simulation_time: int = DAY,
+    every: int = DEFAULT_EVERY,
+    horizon: int = DEFAULT_HORIZON,
+    lead_time: float = 0,
+) -> Iterator[ReplayRow]:
+    """
+    Feed recorded trains through an `OnlineModel`, forecasting at regular times.
+
+    Each train is pushed `lead_time` before it arrives, as `timetable.iter_day`
+    admits it, so the model's own results match `iter_day`'s.
+
+    :param platform: the platform, see `OnlineModel`
+    :param trains: the trains calling at the platform, in order of arrival
+    :param simulation_time: time (in seconds) to replay
+    :param every: seconds between forecasts
+    :param horizon: number of seconds each forecast looks ahead
+    :param lead_time: time (s) before its arrival that a train is announced
+    :return: one row per forecast
+    """
+    if every < 1:
+        raise ValueError(f"every must be positive, got {every}")
+    _check_horizon(horizon)
+    model = OnlineModel(platform)
+    pending = iter(trains)
+    upcoming = next(pending, None)
+    announced = -math.inf
+
+    for time_after in range(0, simulation_time, every):
+        start = time.perf_counter()
+        while upcoming is not None and upcoming.arrival_time - lead_time <= time_after:
+            if upcoming.arrival_time - lead_time < announced:
+                raise ValueError(
+                    f"trains must be in order of arrival, got {upcoming.arrival_time} "
+                    f"after {announced + lead_time}"
+                )
+            announced = upcoming.arrival_time - lead_time
+            model.advance(max(math.ceil(announced) - model.time_after, 0))
+            model.push_arrival(upcoming)
+            upcoming = next(pending, None)
+        model.advance(time_after - model.time_after)
+        forecast = model.forecast(min(horizon, simulation_time - time_after))
+        latency = time.perf_counter() - start
+
+        yield ReplayRow(
+            time_after=time_after,
+            trains=len(model.trains),
+            total_pax_on_platform=model.total_pax_on_platform,
+            min_inst_crowding=forecast.min_inst_crowding,
+            min_inst_crowding_at=forecast.min_inst_crowding_at,
+            plat_crowd_los=forecast.worst_plat_crowd_los,
+            egress_los=forecast.worst_egress_los,
+            latency=latency,
+        )
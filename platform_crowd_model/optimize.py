@@ -0,0 +1,195 @@
+"""
+Design questions such as "the smallest `total_vce_width` that keeps the platform
+at LOS D or better": find where a constraint on a scenario's KPIs starts (or
+stops) holding as one parameter varies.
+
+The constraint is assumed to be monotone in the parameter, which holds for
+`MONOTONE_FIELDS`. Instead of bisecting one simulation at a time, every round
+simulates a batch of evenly spaced candidates at once and narrows the bracket
+to the gap where the constraint changes, so each answer takes a few batched
+rounds of simulations rather than a brute-force grid.
+"""
+
+import dataclasses
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any, Literal
+
+import numpy as np
+
+from .kpi import ScenarioKPIs, run_kpi_sweep
+from .los import GRADES
+from .model import Params
+from .sweep import SWEEPABLE_FIELDS
+
+type Constraint = Callable[[ScenarioKPIs], bool]
+"""Whether the KPIs of a scenario meet a design target."""
+
+MONOTONE_FIELDS = (
+    "total_vce_width",
+    "train2_arrival_time",
+    "usable_platform_area_multiplier",
+)
+"""`Params` fields that crowding only improves (or only worsens) with."""
+
+DEFAULT_BATCH_SIZE = 8
+"""Number of candidates simulated together in each round by default."""
+
+
+def los_at_most(
+    grade: str, measure: Literal["plat_crowd", "egress"] = "plat_crowd"
+) -> Constraint:
+    """A constraint that the worst LOS grade reached is `grade` or better."""
+    if grade not in GRADES:
+        raise ValueError(f"expected one of {', '.join(GRADES)}, got {grade!r}")
+
+    def meets(kpis: ScenarioKPIs) -> bool:
+        worst = (
+            kpis.worst_plat_crowd_los
+            if measure == "plat_crowd"
+            else kpis.worst_egress_los
+        )
+        return worst <= grade
+
+    return meets
+
+
+def min_space_at_least(sqft: float) -> Constraint:
+    """A constraint that the platform space per passenger never drops below `sqft`."""
+    return lambda kpis: kpis.min_inst_crowding >= sqft
+
+
+def clears_within(seconds: int) -> Constraint:
+    """
+    A constraint that arrived passengers clear the platform within `seconds`;
+    a scenario that hasn't cleared by the end of its simulation never meets it.
+    """
+    return lambda kpis: kpis.cleared and kpis.clear_time <= seconds
+
+
+def all_of(*constraints: Constraint) -> Constraint:
+    """A constraint that every one of `constraints` holds."""
+    return lambda kpis: all(c(kpis) for c in constraints)
+
+
+@dataclass
+class Boundary:
+    """The result of `find_boundary`."""
+
+    field: str
+    """The `Params` field varied."""
+
+    value: float | None
+    """
+    The feasible value closest to the boundary, within `tolerance` of it,
+    or `None` if the constraint holds at neither end of the range.
+    """
+
+    feasible: Literal["above", "below", "everywhere", "nowhere"]
+    """Which side of `value` the constraint holds on."""
+
+    bracket: tuple[float, float]
+    """The last infeasible and first feasible values found, in either order."""
+
+    simulations: int
+    """Number of scenarios simulated."""
+
+    kpis: ScenarioKPIs | None
+    """The KPIs at `value`."""
+
+
+def find_boundary(
+    base: Params,
+    field: str,
+    low: float,
+    high: float,
+    constraint: Constraint,
+    *,
+    tolerance: float | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Boundary:
+    """
+    Find the value of `field` between `low` and `high` where `constraint`
+    starts or stops holding.
+
+    :param base: the scenario to take the other fields from
+    :param field: the `Params` field to vary, see `MONOTONE_FIELDS`
+    :param low: the lowest value to consider
+    :param high: the highest value to consider
+    :param constraint: the design target the KPIs must meet
+    :param tolerance: how close to the boundary the answer must be;
+    by default 1/1000 of the range, and at least 1 for integer fields
+    :param batch_size: number of candidates simulated together in each round
+    :return: the boundary and the KPIs there
+    """
+    if field not in SWEEPABLE_FIELDS:
+        raise ValueError(
+            f"cannot vary {field!r}, expected one of {', '.join(SWEEPABLE_FIELDS)}"
+        )
+    if not low < high:
+        raise ValueError(f"expected low < high, got {low} and {high}")
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+    integer = SWEEPABLE_FIELDS[field] is int
+    if tolerance is None:
+        tolerance = (high - low) / 1000
+    if integer:
+        tolerance = max(tolerance, 1)
+
+    simulations = 0
+
+    def scenario(v: float) -> Params:
+        value: Any = round(v) if integer else v
+        return dataclasses.replace(base, **{field: value})
+
+    def evaluate(values: Sequence[float]) -> list[ScenarioKPIs]:
+        nonlocal simulations
+        simulations += len(values)
+        return run_kpi_sweep(
+            [scenario(v) for v in values],
+            workers=1,
+            chunk_size=max(len(values), 1),
+        )
+
+    def candidates(a: float, b: float) -> list[float]:
+        inner = np.linspace(a, b, batch_size + 2)[1:-1]
+        values = np.unique(np.round(inner)) if integer else inner
+        return [float(v) for v in values if a < v < b]
+
+    low_kpis, high_kpis = evaluate([low, high])
+    low_ok, high_ok = constraint(low_kpis), constraint(high_kpis)
+    if low_ok == high_ok:
+        return Boundary(
+            field=field,
+            value=low if low_ok else None,
+            feasible="everywhere" if low_ok else "nowhere",
+            bracket=(low, high),
+            simulations=simulations,
+            kpis=low_kpis if low_ok else None,
+        )
+
+    # Keep `infeasible` and `feasible` on either side of the boundary.
+    infeasible, feasible = (low, high) if high_ok else (high, low)
+    feasible_kpis = high_kpis if high_ok else low_kpis
+    while abs(feasible - infeasible) > tolerance:
+        values = candidates(min(infeasible, feasible), max(infeasible, feasible))
+        if not values:
+            break
+        if not high_ok:
+            values.reverse()
+        # Walk from the infeasible end: the first feasible candidate
+        # and the one before it bracket the boundary.
+        for v, kpis in zip(values, evaluate(values)):
+            if constraint(kpis):
+                feasible, feasible_kpis = v, kpis
+                break
+            infeasible = v
+
+    return Boundary(
+        field=field,
+        value=feasible,
+        feasible="above" if high_ok else "below",
+        bracket=(infeasible, feasible),
+        simulations=simulations,
+        kpis=feasible_kpis,
+    )
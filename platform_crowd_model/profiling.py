@@ -0,0 +1,159 @@
+"""
+Opt-in instrumentation of where a run spends its time and memory.
+
+`workbook.run_model`, `workbook.calc_workbook` and `sweep.run_models` take a
+`Profiler` that records the wall time, and optionally the peak memory, of each
+phase of a run: the time loop, writing cells, tracing, building charts and
+saving. Without one, each phase costs a single `None` check.
+"""
+
+import cProfile
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+
+@dataclass
+class PhaseStats:
+    """The measurements of one phase of a run."""
+
+    seconds: float = 0
+    """Wall time (s) spent in the phase."""
+
+    calls: int = 0
+    """Number of times the phase was entered."""
+
+    peak_bytes: int | None = None
+    """
+    Most memory (bytes) allocated during the phase on top of what was allocated
+    when it started, or `None` if memory isn't tracked.
+    """
+
+
+@dataclass
+class ProfileReport:
+    """The output of `Profiler.report`."""
+
+    label: str
+    """What was profiled, such as the scenario's output filename."""
+
+    phases: dict[str, PhaseStats] = field(default_factory=dict)
+    """The measurements of each phase, in the order they first ran."""
+
+    total_seconds: float = 0
+    """Wall time (s) from the start of the profile, including untracked phases."""
+
+    @property
+    def peak_bytes(self) -> int | None:
+        """Most memory (bytes) allocated during any phase, if memory is tracked."""
+        peaks = [p.peak_bytes for p in self.phases.values() if p.peak_bytes is not None]
+        return max(peaks, default=None)
+
+    def to_dict(self) -> dict[str, Any]:
+        """The report as plain data, for JSON output."""
+        return asdict(self) | {"peak_bytes": self.peak_bytes}
+
+    def format(self) -> str:
+        """The report as a table, one row per phase."""
+        lines = [f"{self.label}: {self.total_seconds:.4f} s"]
+        for name, stats in self.phases.items():
+            share = stats.seconds / self.total_seconds if self.total_seconds else 0
+            line = f"  {name:<10} {stats.seconds:>9.4f} s {share:>6.1%}"
+            if stats.peak_bytes is not None:
+                line += f" {stats.peak_bytes / 2**20:>9.2f} MiB"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+class Profiler:
+    """
+    Records the wall time, and optionally the peak memory, of each phase of a run.
+
+    Use it as a context manager to track memory with `tracemalloc` or to
+    collect a cProfile dump over the whole run. Phases shouldn't be nested.
+    """
+
+    def __init__(
+        self,
+        label: str = "",
+        memory: bool = False,
+        cprofile_path: str | Path | None = None,
+    ) -> None:
+        """
+        :param label: what is being profiled
+        :param memory: also record the peak memory of each phase,
+        which slows the run down
+        :param cprofile_path: also run cProfile and dump its stats to this file,
+        which can be read with `pstats` or snakeviz
+        """
+        self.label = label
+        self.memory = memory
+        self.cprofile_path = cprofile_path
+        self.phases: dict[str, PhaseStats] = {}
+        self._start = time.perf_counter()
+        self._end: float | None = None
+        self._started_tracing = False
+        self._cprofile: cProfile.Profile | None = None
+
+    def __enter__(self) -> "Profiler":
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self.cprofile_path is not None:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        self._start = time.perf_counter()
+        self._end = None
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._end = time.perf_counter()
+        if self._cprofile is not None and self.cprofile_path is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.cprofile_path)
+            self._cprofile = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Record the time, and memory, spent inside this context as phase `name`."""
+        stats = self.phases.setdefault(name, PhaseStats())
+        tracing = self.memory and tracemalloc.is_tracing()
+        if tracing:
+            allocated = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats.seconds += time.perf_counter() - start
+            stats.calls += 1
+            if tracing:
+                peak = tracemalloc.get_traced_memory()[1] - allocated
+                stats.peak_bytes = max(stats.peak_bytes or 0, peak)
+
+    def report(self) -> ProfileReport:
+        """The measurements so far."""
+        end = time.perf_counter() if self._end is None else self._end
+        return ProfileReport(
+            label=self.label,
+            phases={name: PhaseStats(**asdict(s)) for name, s in self.phases.items()},
+            total_seconds=end - self._start,
+        )
+
+
+def phase(profiler: Profiler | None, name: str) -> AbstractContextManager[None]:
+    """`profiler.phase(name)`, or a context that does nothing without a profiler."""
+    return nullcontext() if profiler is None else profiler.phase(name)
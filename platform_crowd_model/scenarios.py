@@ -0,0 +1,325 @@
+"""
+The Penn Station platform scenarios that have been studied so far.
+"""
+
+import numpy as np
+
+from .model import Params
+from .station import StationParams
+
+
+def penn_scenarios() -> dict[str, Params]:
+    """
+    Build the studied scenarios, keyed by their name.
+
+    A fresh set of `Params` is built on every call, so callers are free to modify them.
+    """
+    # params are labeled  with p<platform number><time in seconds> recon indicates that a platform was modelled accounting for penn reconstruction plans
+    params_p3120 = Params(
+        filename_prefix="platform3",
+        simulation_time=600,
+        platform_width=18,
+        platform_length=900,
+        usable_platform_area_multiplier=0.75,
+        train1_arriving_pax=1620,
+        train2_arriving_pax=1620,
+        train1_departing_pax=400,
+        train2_departing_pax=400,
+        train1_boarding_pax=200,
+        train2_boarding_pax=200,
+        train1_doors=40,
+        train2_doors=40,
+        train1_arrival_time=0,
+        train2_arrival_time=120,
+        queue_length=20,
+        total_vce_width=42.5,
+        vce_widths=(
+            1
+            / 12
+            * np.transpose(
+                np.array(
+                    [
+                        [60, 1],
+                        [60, 1],
+                        [40, 1],
+                        [54, 1],
+                        [40, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                    ]
+                )
+            )
+        ),
+    )
+    params_p3300 = Params(
+        filename_prefix="platform3",
+        simulation_time=600,
+        platform_width=18,
+        platform_length=900,
+        usable_platform_area_multiplier=0.75,
+        train1_arriving_pax=1620,
+        train2_arriving_pax=1620,
+        train1_departing_pax=400,
+        train2_departing_pax=400,
+        train1_boarding_pax=200,
+        train2_boarding_pax=200,
+        train1_doors=40,
+        train2_doors=40,
+        train1_arrival_time=0,
+        train2_arrival_time=300,
+        queue_length=20,
+        total_vce_width=42.5,
+        vce_widths=(
+            1
+            / 12
+            * np.transpose(
+                np.array(
+                    [
+                        [60, 1],
+                        [60, 1],
+                        [40, 1],
+                        [54, 1],
+                        [40, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                    ]
+                )
+            )
+        ),
+    )
+    params_p3recon120 = Params(
+        filename_prefix="platform3_recon",
+        simulation_time=600,
+        platform_width=18,
+        platform_length=900,
+        usable_platform_area_multiplier=0.75,
+        train1_arriving_pax=1620,
+        train2_arriving_pax=1620,
+        train1_departing_pax=400,
+        train2_departing_pax=400,
+        train1_boarding_pax=200,
+        train2_boarding_pax=200,
+        train1_doors=40,
+        train2_doors=40,
+        train1_arrival_time=0,
+        train2_arrival_time=120,
+        queue_length=20,
+        total_vce_width=44.75,
+        vce_widths=(
+            1
+            / 12
+            * np.transpose(
+                np.array(
+                    [
+                        [60, 1],
+                        [60, 1],
+                        [40, 1],
+                        [54, 1],
+                        [40, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                    ]
+                )
+            )
+        ),
+    )
+    params_p3recon300 = Params(
+        filename_prefix="platform3_recon",
+        simulation_time=600,
+        platform_width=18,
+        platform_length=900,
+        usable_platform_area_multiplier=0.75,
+        train1_arriving_pax=1620,
+        train2_arriving_pax=1620,
+        train1_departing_pax=400,
+        train2_departing_pax=400,
+        train1_boarding_pax=200,
+        train2_boarding_pax=200,
+        train1_doors=40,
+        train2_doors=40,
+        train1_arrival_time=0,
+        train2_arrival_time=300,
+        queue_length=20,
+        total_vce_width=44.75,
+        vce_widths=(
+            1
+            / 12
+            * np.transpose(
+                np.array(
+                    [
+                        [60, 1],
+                        [60, 1],
+                        [40, 1],
+                        [54, 1],
+                        [40, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                    ]
+                )
+            )
+        ),
+    )
+    params_p60 = Params(
+        filename_prefix="platform6",
+        simulation_time=600,
+        platform_width=15,
+        platform_length=1100,
+        usable_platform_area_multiplier=0.75,
+        train1_arriving_pax=1620,
+        train2_arriving_pax=1620,
+        train1_departing_pax=400,
+        train2_departing_pax=400,
+        train1_boarding_pax=200,
+        train2_boarding_pax=200,
+        train1_doors=40,
+        train2_doors=40,
+        train1_arrival_time=0,
+        train2_arrival_time=0,
+        queue_length=20,
+        total_vce_width=48.168,
+        vce_widths=(
+            1
+            / 12
+            * np.transpose(
+                np.array(
+                    [
+                        [60, 1],
+                        [60, 1],
+                        [40, 1],
+                        [54, 1],
+                        [40, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                    ]
+                )
+            )
+        ),
+    )
+    params_p10120 = Params(
+        filename_prefix="platform10",
+        simulation_time=600,
+        platform_width=42,
+        platform_length=1100,
+        usable_platform_area_multiplier=0.75,
+        train1_arriving_pax=1620,
+        train2_arriving_pax=1620,
+        train1_departing_pax=400,
+        train2_departing_pax=400,
+        train1_boarding_pax=200,
+        train2_boarding_pax=200,
+        train1_doors=40,
+        train2_doors=40,
+        train1_arrival_time=0,
+        train2_arrival_time=120,
+        queue_length=20,
+        total_vce_width=70.58,
+        vce_widths=(
+            1
+            / 12
+            * np.transpose(
+                np.array(
+                    [
+                        [60, 1],
+                        [60, 1],
+                        [40, 1],
+                        [54, 1],
+                        [40, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                    ]
+                )
+            )
+        ),
+    )
+    params_p11120 = Params(
+        filename_prefix="platform11",
+        simulation_time=600,
+        platform_width=18,
+        platform_length=1100,
+        usable_platform_area_multiplier=0.75,
+        train1_arriving_pax=1620,
+        train2_arriving_pax=1620,
+        train1_departing_pax=400,
+        train2_departing_pax=400,
+        train1_boarding_pax=200,
+        train2_boarding_pax=200,
+        train1_doors=40,
+        train2_doors=40,
+        train1_arrival_time=0,
+        train2_arrival_time=120,
+        queue_length=20,
+        total_vce_width=43.58,
+        vce_widths=(
+            1
+            / 12
+            * np.transpose(
+                np.array(
+                    [
+                        [60, 1],
+                        [60, 1],
+                        [40, 1],
+                        [54, 1],
+                        [40, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                        [54, 1],
+                    ]
+                )
+            )
+        ),
+    )
+    return {
+        "p3120": params_p3120,
+        "p3300": params_p3300,
+        "p3recon120": params_p3recon120,
+        "p3recon300": params_p3recon300,
+        "p60": params_p60,
+        "p10120": params_p10120,
+        "p11120": params_p11120,
+    }
+
+
+def penn_station(simulation_time: int = 600) -> StationParams:
+    """
+    The studied platforms of the existing station, one scenario per platform,
+    sharing a concourse of 5000 sqft per platform.
+    """
+    scenarios = penn_scenarios()
+    platforms = {
+        "platform3": scenarios["p3120"],
+        "platform6": scenarios["p60"],
+        "platform10": scenarios["p10120"],
+        "platform11": scenarios["p11120"],
+    }
+    return StationParams(
+        platforms=platforms,
+        simulation_time=simulation_time,
+        concourse_area=5000 * len(platforms),
+    )
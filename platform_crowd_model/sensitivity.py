@@ -0,0 +1,175 @@
+"""
+Sensitivity of a scenario's results to each of its inputs, by central
+differences: every numeric `Params` field and every entry of `vce_widths`
+is nudged down and up, and all 2×N perturbed scenarios run as one batch.
+Every input is non-negative, so one within a step of 0 is only nudged up
+from its value, giving a one-sided difference.
+
+Nudging an entry of `vce_widths` widens or narrows that stair alone:
+`total_vce_width` changes with it, so that the other stairs keep their
+effective widths. The stairs are simulated with the per-stair model of
+`stairs`, so under the `equal` and `shortest_queue` assignments this also
+shows how a stair's share of the passengers depends on its width.
+
+The clearance time is only known for runs whose platform clears before the end
+of the simulation, so it is NaN, along with its gradients and elasticities,
+when the scenario or a perturbed run of it doesn't clear: lengthen
+`simulation_time` to get it.
+"""
+
+import dataclasses
+import math
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from .batch import FloatArray
+from .model import Params, clear_time
+from .stairs import StairAssignment, simulate_stairs
+from .sweep import SWEEPABLE_FIELDS
+
+SENSITIVITY_FIELDS = tuple(
+    name for name in SWEEPABLE_FIELDS if name not in ("simulation_time", "dt")
+)
+"""The numeric `Params` fields whose sensitivity is reported."""
+
+DEFAULT_RELATIVE_STEP = 0.01
+"""Difference step as a share of each input's value by default."""
+
+MIN_STEPS = {"train1_arrival_time": 5.0, "train2_arrival_time": 5.0}
+"""
+Smallest steps of inputs that the model resolves coarsely, such as arrival
+times that only take effect on whole seconds.
+"""
+
+KPIS = ("clear_time", "peak_total_pax_on_platform", "min_inst_crowding")
+"""The results whose sensitivity is reported."""
+
+
+@dataclass
+class SensitivityRow:
+    """The sensitivity of the KPIs to one input."""
+
+    input: str
+    """The `Params` field, or `vce_widths[i]` for the width of stair `i`."""
+
+    value: float
+    """The input's value in the scenario."""
+
+    step: float
+    """
+    The difference step, taken both ways from `value`, or only up from it
+    where `value` is less than a step from 0.
+    """
+
+    gradient: dict[str, float]
+    """The derivative of each KPI with respect to the input."""
+
+    elasticity: dict[str, float]
+    """
+    The relative change in each KPI per relative change in the input,
+    NaN where the KPI or the input is 0, or the KPI is unknown.
+    """
+
+
+@dataclass
+class SensitivityReport:
+    """The output of `sensitivity_report`."""
+
+    kpis: dict[str, float]
+    """
+    The scenario's own KPIs, with a NaN `clear_time` if the platform doesn't
+    clear by the end of the simulation.
+    """
+
+    rows: list[SensitivityRow]
+    """One row per input."""
+
+    def ranked(self, kpi: str) -> list[SensitivityRow]:
+        """The rows, most elastic first for `kpi`."""
+        return sorted(
+            self.rows,
+            key=lambda row: -np.nan_to_num(abs(row.elasticity[kpi]), nan=-1.0),
+        )
+
+
+def _with_input(params: Params, name: str, value: float) -> Params:
+    if name.startswith("vce_widths["):
+        widths = np.array(params.vce_widths, dtype=np.float64)
+        widths[0, int(name[len("vce_widths[") : -1])] = value
+        # Keep the effective widths of the other stairs, see `stairs.stair_widths`.
+        total = params.total_vce_width * widths.sum() / params.vce_widths[0].sum()
+        return dataclasses.replace(params, vce_widths=widths, total_vce_width=total)
+    changes: dict[str, Any] = {
+        name: round(value) if SWEEPABLE_FIELDS[name] is int else value
+    }
+    return dataclasses.replace(params, **changes)
+
+
+def sensitivity_report(
+    params: Params,
+    relative_step: float = DEFAULT_RELATIVE_STEP,
+    assignment: StairAssignment = "width",
+) -> SensitivityReport:
+    """
+    Estimate the sensitivity of the KPIs of `params` to each of its inputs.
+
+    :param params: the scenario, which must use 1 s time steps
+    :param relative_step: difference step as a share of each input's value
+    (see also `MIN_STEPS`)
+    :param assignment: how alighting passengers choose a stair, see `stairs`
+    :return: the gradients and elasticities of every KPI for every input,
+    NaN for the clearance time where the scenario or either perturbed run
+    of an input doesn't clear
+    """
+    inputs = [(name, float(getattr(params, name))) for name in SENSITIVITY_FIELDS]
+    inputs += [
+        (f"vce_widths[{i}]", float(w)) for i, w in enumerate(params.vce_widths[0])
+    ]
+    steps = [
+        max(relative_step * abs(value), MIN_STEPS.get(name, relative_step))
+        for name, value in inputs
+    ]
+    # Keep integer fields (the arrival times) whole.
+    steps = [
+        math.ceil(h) if SWEEPABLE_FIELDS.get(name) is int else h
+        for (name, _), h in zip(inputs, steps)
+    ]
+    lows = [max(value - h, 0) for (_, value), h in zip(inputs, steps)]
+    scenarios = [params]
+    for (name, value), h, low in zip(inputs, steps, lows):
+        scenarios.append(_with_input(params, name, low))
+        scenarios.append(_with_input(params, name, value + h))
+
+    lumped = simulate_stairs(scenarios, assignment).lumped
+    kpis: dict[str, FloatArray] = {
+        "clear_time": clear_time(lumped.arrived_pax_waiting_on_plat),
+        "peak_total_pax_on_platform": lumped.total_pax_on_platform.max(
+            axis=1, initial=0
+        ),
+        "min_inst_crowding": np.minimum(
+            lumped.inst_crowding.min(axis=1, initial=np.inf), lumped.eff_area
+        ),
+    }
+
+    base = {kpi: float(values[0]) for kpi, values in kpis.items()}
+    rows = []
+    for j, ((name, value), h, low) in enumerate(zip(inputs, steps, lows)):
+        gradient = {
+            kpi: float((values[2 + 2 * j] - values[1 + 2 * j]) / (value + h - low))
+            for kpi, values in kpis.items()
+        }
+        rows.append(
+            SensitivityRow(
+                input=name,
+                value=value,
+                step=h,
+                gradient=gradient,
+                elasticity={
+                    kpi: g * value / base[kpi] if value and base[kpi] else np.nan
+                    for kpi, g in gradient.items()
+                },
+            )
+        )
+    return SensitivityReport(kpis=base, rows=rows)
@@ -0,0 +1,375 @@
+"""
+A version of the batch model that keeps a queue at each VCE (stair) instead
+of lumping them all into `Params.total_vce_width`.
+
+Each stair's effective width is its share of `total_vce_width`, in proportion
+to `Params.vce_widths[0]`. Alighting passengers join the stairs according to a
+`StairAssignment` rule, and every stair then clears its own queue with the
+flow equations of the lumped model scaled down to its share of the width.
+Passengers coming down split between the stairs by width. So when passengers
+join the stairs in proportion to their width, this gives the same results as
+`batch.simulate_batch`; other rules show how uneven queues slow clearance.
+
+Every array has the stairs along its last axis; scenarios with fewer stairs
+than others in the batch are padded with zero-width stairs that carry no flow.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Literal
+
+import numpy as np
+
+from .batch import (
+    BatchParams,
+    BatchResult,
+    BatchState,
+    BatchStep,
+    FloatArray,
+    alight_rate_arr,
+    board_rate_arr,
+    boarder_frac_arr,
+    plat_clearance_arr,
+    plat_ingress_arr,
+    space_per_pax_arr,
+)
+from .model import Params, SimulationResult
+
+type StairAssignment = Literal["width", "equal", "shortest_queue"]
+"""
+How alighting passengers choose a stair:
+
+- `width`: in proportion to each stair's width
+- `equal`: the same number at every stair
+- `shortest_queue`: at the stairs with the fewest passengers waiting,
+  filling up the shortest queues until they match the next shortest, so the
+  queues even out whatever the widths and narrow stairs get left behind
+"""
+
+STAIR_ASSIGNMENTS: tuple[StairAssignment, ...] = ("width", "equal", "shortest_queue")
+
+
+def stair_widths(params: Params) -> FloatArray:
+    """The effective width (ft) of each stair in `params`."""
+    widths: FloatArray = np.asarray(params.vce_widths[0], dtype=np.float64)
+    effective: FloatArray = params.total_vce_width * widths / widths.sum()
+    return effective
+
+
+def _fill_shortest(
+    stairs: FloatArray, queue: FloatArray, alighting: FloatArray
+) -> FloatArray:
+    """
+    The passengers joining each stair when they fill up the shortest queues:
+    the queues below some level are all topped up to it, with the level set so
+    that every alighting passenger joins one.
+    """
+    length = np.where(stairs > 0, queue, np.inf)
+    order = np.argsort(length, axis=-1)
+    count = np.cumsum(np.take_along_axis(stairs, order, axis=-1), axis=-1)
+    waiting = np.cumsum(np.take_along_axis(queue, order, axis=-1), axis=-1)
+    # Topping up any set of queues to a level takes no more than the passengers
+    # alighting, so the level is the lowest of the shortest 1, 2, ... queues'.
+    level: FloatArray = np.divide(
+        alighting[:, np.newaxis] + waiting,
+        count,
+        out=np.full_like(waiting, np.inf),
+        where=count > 0,
+    ).min(axis=-1)
+    joining: FloatArray = np.where(
+        stairs > 0, np.maximum(level[:, np.newaxis] - queue, 0), 0.0
+    )
+    return joining
+
+
+def assign_shares(
+    assignment: StairAssignment,
+    widths: FloatArray,
+    queue: FloatArray,
+    alighting: FloatArray,
+) -> FloatArray:
+    """
+    The share of this second's alighting passengers that join each stair.
+
+    :param assignment: the rule to use, see `StairAssignment`
+    :param widths: the effective width of each stair, zero for padding
+    :param queue: the passengers already waiting at each stair
+    :param alighting: the passengers alighting this second in each scenario
+    :return: the shares, summing to 1 over the stairs of each scenario
+    """
+    stairs = (widths > 0).astype(np.float64)
+    weights: FloatArray
+    match assignment:
+        case "width":
+            weights = widths
+        case "equal":
+            weights = stairs
+        case "shortest_queue":
+            joining = _fill_shortest(stairs, queue, alighting)
+            # Nobody is left to join a stair, so any shares will do.
+            weights = np.where((alighting > 0)[:, np.newaxis], joining, stairs)
+    return np.divide(weights, weights.sum(axis=-1, keepdims=True))
+
+
+@dataclass
+class StairParams:
+    """`BatchParams` plus the stairs of each scenario."""
+
+    batch: BatchParams
+    widths: FloatArray
+    """Effective width of each stair, shape (scenarios, stairs), zero for padding."""
+
+    @classmethod
+    def from_params(cls, params: Sequence[Params]) -> "StairParams":
+        per_scenario = [stair_widths(p) for p in params]
+        widths = np.zeros((len(params), max((len(w) for w in per_scenario), default=0)))
+        for i, w in enumerate(per_scenario):
+            widths[i, : len(w)] = w
+        return cls(batch=BatchParams.from_params(params), widths=widths)
+
+    @property
+    def width_share(self) -> FloatArray:
+        """Each stair's share of the total width."""
+        return np.divide(self.widths, self.widths.sum(axis=-1, keepdims=True))
+
+    def __len__(self) -> int:
+        return len(self.batch)
+
+
+@dataclass
+class StairStep:
+    """The per-stair flow rates (pax/s) of one time step, shape (scenarios, stairs)."""
+
+    up_rate: FloatArray
+    down_rate: FloatArray
+
+
+def advance_stairs(
+    sp: StairParams,
+    state: BatchState,
+    queue: FloatArray,
+    time_after: int,
+    assignment: StairAssignment = "width",
+) -> tuple[BatchStep, StairStep]:
+    """
+    Advance every scenario by one second, in place, like `batch.advance_batch`
+    but with a queue at every stair.
+
+    :param sp: the scenarios being simulated
+    :param state: the counters at `time_after`, updated in place;
+    `arrived_pax_waiting_on_plat` is kept equal to the sum of `queue`
+    :param queue: the arrived passengers waiting at each stair, updated in place
+    :param time_after: the current time (s)
+    :param assignment: how alighting passengers choose a stair
+    :return: the lumped flow rates and crowding, and the per-stair flow rates
+    """
+    bp = sp.batch
+    s = state
+    stairs = sp.widths > 0
+    share = sp.width_share
+
+    train1_off_rate = alight_rate_arr(
+        s.train1_remaining_arrivals,
+        time_after,
+        bp.train1_arrival_time,
+        bp.train1_doors,
+    )
+    s.train1_remaining_arrivals = np.maximum(
+        s.train1_remaining_arrivals - train1_off_rate, 0
+    )
+    train2_off_rate = alight_rate_arr(
+        s.train2_remaining_arrivals,
+        time_after,
+        bp.train2_arrival_time,
+        bp.train2_doors,
+    )
+    s.train2_remaining_arrivals = np.maximum(
+        s.train2_remaining_arrivals - train2_off_rate, 0
+    )
+    alighting = train1_off_rate + train2_off_rate
+    s.total_pax_on_platform = s.total_pax_on_platform + alighting
+    queue += alighting[:, np.newaxis] * assign_shares(
+        assignment, sp.widths, queue, alighting
+    )
+    # Each stair flows like the lumped model scaled down to its share of the width.
+    safe_share = np.where(stairs, share, 1)
+    up_rate = np.where(
+        stairs,
+        np.minimum(
+            share
+            * plat_clearance_arr(
+                queue / safe_share,
+                bp.eff_area[:, np.newaxis],
+                bp.total_vce_width[:, np.newaxis],
+                (bp.total_vce_width * bp.queue_length / 5)[:, np.newaxis],
+            ),
+            queue,
+        ),
+        0.0,
+    )
+    queue -= up_rate
+    np.maximum(queue, 0, out=queue)
+    plat_egress_rate = up_rate.sum(axis=-1)
+    s.total_pax_on_platform = s.total_pax_on_platform - plat_egress_rate
+
+    def ingress(boarders: FloatArray, others: FloatArray) -> FloatArray:
+        """Per-stair ingress rates of the passengers boarding one train."""
+        frac = boarder_frac_arr(boarders, others)
+        return np.where(
+            stairs,
+            share
+            * plat_ingress_arr(
+                boarders[:, np.newaxis],
+                5000,
+                (bp.total_vce_width * frac)[:, np.newaxis],
+                up_rate / safe_share,
+            ),
+            0.0,
+        )
+
+    ingress_1 = ingress(s.train1_boarders_upstairs, s.train2_boarders_upstairs)
+    ingress_2 = ingress(s.train2_boarders_upstairs, s.train1_boarders_upstairs)
+    plat_ingress_rate_1 = ingress_1.sum(axis=-1)
+    plat_ingress_rate_2 = ingress_2.sum(axis=-1)
+    s.train1_boarders_on_plat = s.train1_boarders_on_plat + plat_ingress_rate_1
+    s.train2_boarders_on_plat = s.train2_boarders_on_plat + plat_ingress_rate_2
+    s.total_pax_on_platform = s.total_pax_on_platform + plat_ingress_rate_1
+    s.total_pax_on_platform = s.total_pax_on_platform + plat_ingress_rate_2
+    simulation_time = bp.simulation_time.astype(np.float64)
+    train1_on_rate = board_rate_arr(
+        bp.train1_doors,
+        train1_off_rate,
+        time_after,
+        bp.train1_arrival_time,
+        simulation_time,
+        s.train1_boarders_on_plat,
+    )
+    train2_on_rate = board_rate_arr(
+        bp.train2_doors,
+        train2_off_rate,
+        time_after,
+        bp.train2_arrival_time,
+        simulation_time,
+        s.train2_boarders_on_plat,
+    )
+    s.train1_boarders_on_plat = s.train1_boarders_on_plat - train1_on_rate
+    s.train2_boarders_on_plat = s.train2_boarders_on_plat - train2_on_rate
+    s.total_pax_on_platform = s.total_pax_on_platform - train1_on_rate
+    s.total_pax_on_platform = s.total_pax_on_platform - train2_on_rate
+    s.train1_boarders_upstairs = s.train1_boarders_upstairs - plat_ingress_rate_1
+    s.train2_boarders_upstairs = s.train2_boarders_upstairs - plat_ingress_rate_2
+    s.train1_new_pax = s.train1_new_pax + train1_on_rate
+    s.train2_new_pax = s.train2_new_pax + train2_on_rate
+    s.arrived_pax_waiting_on_plat = queue.sum(axis=-1)
+
+    inst_crowding = space_per_pax_arr(s.total_pax_on_platform, bp.eff_area)
+    s.total_pax_on_platform = np.maximum(s.total_pax_on_platform, 0)
+    s.train1_boarders_on_plat = np.maximum(s.train1_boarders_on_plat, 0)
+    s.train2_boarders_on_plat = np.maximum(s.train2_boarders_on_plat, 0)
+
+    return (
+        BatchStep(
+            train1_off_rate=train1_off_rate,
+            train2_off_rate=train2_off_rate,
+            train1_on_rate=train1_on_rate,
+            train2_on_rate=train2_on_rate,
+            plat_ingress_rate_1=plat_ingress_rate_1,
+            plat_ingress_rate_2=plat_ingress_rate_2,
+            plat_egress_rate=plat_egress_rate,
+            inst_crowding=inst_crowding,
+        ),
+        StairStep(up_rate=up_rate, down_rate=ingress_1 + ingress_2),
+    )
+
+
+@dataclass
+class StairSeries:
+    """The per-stair results of one scenario, each of shape (seconds, stairs)."""
+
+    widths: FloatArray
+    """Effective width (ft) of each stair."""
+
+    queue: FloatArray
+    """Arrived passengers waiting at each stair."""
+
+    up_rate: FloatArray
+    """Upstairs flow rate (pax/s) of each stair."""
+
+    down_rate: FloatArray
+    """Downstairs flow rate (pax/s) of each stair."""
+
+    def __len__(self) -> int:
+        return len(self.widths)
+
+    @property
+    def peak_queue(self) -> FloatArray:
+        """The longest queue at each stair."""
+        peak: FloatArray = self.queue.max(axis=0, initial=0)
+        return peak
+
+    @property
+    def bottleneck(self) -> int:
+        """The stair with the longest queue per foot of width."""
+        return int(np.argmax(self.peak_queue / self.widths))
+
+
+@dataclass
+class StairResult:
+    """
+    The output of `simulate_stairs`: the lumped per-second results
+    as a `BatchResult`, and the per-stair results of shape
+    (scenarios, seconds, stairs).
+    """
+
+    lumped: BatchResult
+    widths: FloatArray
+    queue: FloatArray
+    up_rate: FloatArray
+    down_rate: FloatArray
+
+    def __len__(self) -> int:
+        return len(self.lumped)
+
+    def scenario(self, i: int) -> tuple[SimulationResult, StairSeries]:
+        """The lumped and per-stair results of scenario `i`, trimmed to its length."""
+        n = int(self.lumped.simulation_time[i])
+        stairs = self.widths[i] > 0
+        return self.lumped.scenario(i), StairSeries(
+            widths=self.widths[i, stairs].copy(),
+            queue=self.queue[i, :n][:, stairs].copy(),
+            up_rate=self.up_rate[i, :n][:, stairs].copy(),
+            down_rate=self.down_rate[i, :n][:, stairs].copy(),
+        )
+
+
+def simulate_stairs(
+    params: Sequence[Params] | StairParams, assignment: StairAssignment = "width"
+) -> StairResult:
+    """
+    Run the time-step loop for many scenarios at once, with a queue at every stair.
+
+    :param params: the scenarios to simulate
+    :param assignment: how alighting passengers choose a stair
+    :return: the lumped and per-stair results of every scenario
+    """
+    sp = params if isinstance(params, StairParams) else StairParams.from_params(params)
+    lumped = BatchResult.empty(sp.batch)
+    shape = (len(sp), lumped.seconds, sp.widths.shape[1])
+    result = StairResult(
+        lumped=lumped,
+        widths=sp.widths,
+        queue=np.empty(shape),
+        up_rate=np.empty(shape),
+        down_rate=np.empty(shape),
+    )
+
+    state = BatchState.initial(sp.batch)
+    queue = np.zeros((len(sp), sp.widths.shape[1]))
+    for time_after in range(lumped.seconds):
+        step, stair_step = advance_stairs(sp, state, queue, time_after, assignment)
+        lumped.record(time_after, state, step)
+        result.queue[:, time_after] = queue
+        result.up_rate[:, time_after] = stair_step.up_rate
+        result.down_rate[:, time_after] = stair_step.down_rate
+
+    return result
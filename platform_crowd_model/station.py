@@ -0,0 +1,128 @@
+"""
+A whole-station model: every platform advances together as one batch,
+and all of them share one concourse upstairs.
+
+On its own, each platform's downstairs flow is limited by the density of its
+own boarders on a 5000 sqft concourse. Here the limit is instead the density
+of the shared concourse, which holds every platform's boarders waiting to go
+down plus the arriving passengers who have come up and not yet left it, so
+a crowd from one platform slows boarding at all the others.
+"""
+
+import dataclasses
+import math
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+import numpy as np
+
+from .batch import BatchParams, BatchResult, BatchState, FloatArray, advance_batch
+from .model import Params, SimulationResult
+
+
+@dataclass
+class StationParams:
+    """The platforms of a station and its shared concourse."""
+
+    platforms: Mapping[str, Params]
+    """Each platform's scenario, keyed by name."""
+
+    simulation_time: int
+    """Time (in seconds) to simulate, replacing each platform's own."""
+
+    concourse_area: float
+    """Usable concourse area (in square feet) shared by every platform."""
+
+    concourse_exit_rate: float = math.inf
+    """
+    Rate (pax/s) at which passengers who came up from the platforms leave the
+    concourse; by default they leave as soon as they arrive.
+    """
+
+
+@dataclass
+class StationResult:
+    """
+    The per-second output of `simulate_station`.
+
+    `platforms` has one scenario per platform, in the order of
+    `StationParams.platforms`; the concourse arrays have one entry per second.
+    """
+
+    names: list[str]
+    """The platform names."""
+
+    platforms: BatchResult
+    """The results of every platform."""
+
+    concourse_pax: FloatArray
+    """Passengers on the concourse: boarders waiting to go down, and arrivals leaving."""
+
+    concourse_space: FloatArray
+    """Concourse space per passenger (sqft)."""
+
+    exit_rate: FloatArray
+    """Rate (pax/s) at which arriving passengers leave the concourse."""
+
+    def __len__(self) -> int:
+        return len(self.concourse_pax)
+
+    def platform(self, name: str) -> SimulationResult:
+        """The results of one platform."""
+        return self.platforms.scenario(self.names.index(name))
+
+    @property
+    def total_pax_on_platforms(self) -> FloatArray:
+        """Passengers on all of the platforms together."""
+        total: FloatArray = self.platforms.total_pax_on_platform.sum(axis=0)
+        return total
+
+    @property
+    def peak_time(self) -> int:
+        """The second with the most passengers on the platforms."""
+        return int(np.argmax(self.total_pax_on_platforms))
+
+
+def simulate_station(params: StationParams) -> StationResult:
+    """
+    Run the time-step loop for every platform of a station at once.
+
+    :param params: the station to simulate
+    :return: the per-second results of every platform and the concourse
+    """
+    n = params.simulation_time
+    bp = BatchParams.from_params(
+        [dataclasses.replace(p, simulation_time=n) for p in params.platforms.values()]
+    )
+    platforms = BatchResult.empty(bp)
+    concourse_pax = np.empty(n)
+    concourse_space = np.empty(n)
+    exit_rate = np.empty(n)
+
+    state = BatchState.initial(bp)
+    leaving = 0.0
+    for time_after in range(n):
+        waiting = float(
+            state.train1_boarders_upstairs.sum() + state.train2_boarders_upstairs.sum()
+        )
+        space = params.concourse_area / max(1, waiting + leaving)
+        step = advance_batch(
+            bp, state, time_after, concourse_space=np.full(len(bp), space)
+        )
+        platforms.record(time_after, state, step)
+
+        leaving += float(step.plat_egress_rate.sum())
+        exit_rate[time_after] = min(leaving, params.concourse_exit_rate)
+        leaving -= exit_rate[time_after]
+        concourse_space[time_after] = space
+        concourse_pax[time_after] = leaving + float(
+            state.train1_boarders_upstairs.sum() + state.train2_boarders_upstairs.sum()
+        )
+
+    return StationResult(
+        names=list(params.platforms),
+        platforms=platforms,
+        concourse_pax=concourse_pax,
+        concourse_space=concourse_space,
+        exit_rate=exit_rate,
+    )
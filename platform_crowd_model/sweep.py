@@ -0,0 +1,211 @@
+"""
+Parameter sweeps: expand grids of `Params` values and run the resulting
+scenarios across a pool of worker processes.
+"""
+
+import dataclasses
+import functools
+import itertools
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from .batch import batchable, simulate_batch
+from .cache import ResultCache
+from .flowcurve import FlowCurve
+from .model import Params, SimulationResult, simulate
+from .profiling import Profiler, ProfileReport
+from .tracing import Tracer
+
+DEFAULT_CHUNK_SIZE = 256
+"""Number of scenarios each worker simulates together as one batch."""
+
+SWEEPABLE_FIELDS = {
+    field.name: field.type
+    for field in dataclasses.fields(Params)
+    if field.type in (int, float)
+}
+"""The `Params` fields that can be swept, and their types."""
+
+
+def expand_grid(base: Params, grid: Mapping[str, Sequence[Any]]) -> list[Params]:
+    """
+    Expand a parameter grid into one `Params` per combination of values.
+
+    The last field in `grid` varies fastest, like nested for loops.
+
+    :param base: the scenario to take all other fields from
+    :param grid: values to sweep, keyed by `Params` field name
+    :return: the scenarios, in grid order
+    """
+    for name in grid:
+        if name not in SWEEPABLE_FIELDS:
+            raise ValueError(
+                f"cannot sweep {name!r}, expected one of {', '.join(SWEEPABLE_FIELDS)}"
+            )
+    names = list(grid)
+    return [
+        dataclasses.replace(base, **dict(zip(names, values)))
+        for values in itertools.product(*(grid[name] for name in names))
+    ]
+
+
+def chunked[T](items: Sequence[T], chunk_size: int) -> Iterator[Sequence[T]]:
+    """Split `items` into consecutive chunks of at most `chunk_size` items."""
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    for start in range(0, len(items), chunk_size):
+        yield items[start : start + chunk_size]
+
+
+def map_scenarios[T, R](
+    fn: Callable[[Sequence[T]], list[R]],
+    items: Sequence[T],
+    *,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> list[R]:
+    """
+    Apply `fn` to chunks of `items` across a process pool,
+    collecting the results in the order of `items`.
+
+    :param fn: a picklable function that maps a chunk of items to one result each
+    :param items: the items to process
+    :param workers: number of worker processes,
+    defaults to the number of CPUs; 1 runs everything in this process
+    :param chunk_size: number of items sent to a worker at once
+    :return: one result per item, in order
+    """
+    chunks = list(chunked(items, chunk_size))
+    if workers == 1 or len(chunks) <= 1:
+        return [r for chunk in chunks for r in fn(chunk)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return [r for results in executor.map(fn, chunks) for r in results]
+
+
+def _simulate_chunk(
+    params: Sequence[Params], flow_curve: FlowCurve | None = None
+) -> list[SimulationResult]:
+    batched = [i for i, p in enumerate(params) if batchable(p)]
+    batch = simulate_batch([params[i] for i in batched], flow_curve)
+    results = {i: batch.scenario(j) for j, i in enumerate(batched)}
+    return [results[i] if i in results else simulate(p) for i, p in enumerate(params)]
+
+
+def run_sweep(
+    params: Sequence[Params],
+    *,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cache: ResultCache | None = None,
+    flow_curve: FlowCurve | None = None,
+) -> list[SimulationResult]:
+    """
+    Simulate many scenarios in parallel.
+
+    Each worker runs its chunk of scenarios through `batch.simulate_batch`,
+    except for those with sub-second time steps, which run through `model.simulate`.
+
+    :param params: the scenarios to simulate
+    :param workers: number of worker processes, defaults to the number of CPUs
+    :param chunk_size: number of scenarios simulated together as one batch
+    :param cache: only simulate the scenarios that aren't already in this cache,
+    and store the new results in it
+    :param flow_curve: the stair flow curve to use instead of the model's formula
+    for the batched scenarios, see `flowcurve`; the others use the formula
+    :return: the results, in the same order as `params`
+    """
+    if cache is None:
+        return map_scenarios(
+            functools.partial(_simulate_chunk, flow_curve=flow_curve),
+            params,
+            workers=workers,
+            chunk_size=chunk_size,
+        )
+    if flow_curve is not None:
+        raise ValueError("the cache only holds results of the model's own flow curve")
+
+    cached = [cache.get(p) for p in params]
+    misses = [i for i, result in enumerate(cached) if result is None]
+    simulated = map_scenarios(
+        _simulate_chunk,
+        [params[i] for i in misses],
+        workers=workers,
+        chunk_size=chunk_size,
+    )
+    for i, result in zip(misses, simulated):
+        cache.put(params[i], result, evict=False)
+        cached[i] = result
+    cache.evict()
+
+    results = [result for result in cached if result is not None]
+    assert len(results) == len(params)
+    return results
+
+
+def _run_models_chunk(
+    params: Sequence[Params],
+    write_only: bool,
+    cache: ResultCache | None,
+    profile: bool = False,
+    memory: bool = False,
+    tracer: Tracer | None = None,
+) -> list[ProfileReport | None]:
+    # Imported here so that sweeping without workbooks doesn't need openpyxl.
+    from .workbook import output_stem, run_model
+
+    reports: list[ProfileReport | None] = []
+    for p in params:
+        if not profile:
+            run_model(p, write_only=write_only, cache=cache, tracer=tracer)
+            reports.append(None)
+            continue
+        with Profiler(output_stem(p), memory=memory) as profiler:
+            run_model(
+                p, write_only=write_only, cache=cache, profiler=profiler, tracer=tracer
+            )
+        reports.append(profiler.report())
+    return reports
+
+
+def run_models(
+    params: Sequence[Params],
+    *,
+    workers: int | None = None,
+    write_only: bool = False,
+    cache: ResultCache | None = None,
+    profile: bool = False,
+    memory: bool = False,
+    tracer: Tracer | None = None,
+) -> list[ProfileReport] | None:
+    """
+    Run `workbook.run_model` for every scenario in parallel, saving each workbook.
+
+    :param params: the scenarios to simulate
+    :param workers: number of worker processes, defaults to the number of CPUs
+    :param write_only: stream each workbook out as it is simulated,
+    see `workbook.calc_workbook`
+    :param cache: reuse stored results from this cache, see `workbook.run_model`
+    :param profile: record where each scenario's run spends its time,
+    see `profiling.Profiler`
+    :param memory: when profiling, also record the peak memory of each phase
+    :param tracer: call this with every second of each scenario's results,
+    see `tracing`; every worker process calls its own copy
+    :return: with `profile`, one report per scenario, in order
+    """
+    reports = map_scenarios(
+        functools.partial(
+            _run_models_chunk,
+            write_only=write_only,
+            cache=cache,
+            profile=profile,
+            memory=memory,
+            tracer=tracer,
+        ),
+        params,
+        workers=workers,
+        chunk_size=1,
+    )
+    if not profile:
+        return None
+    return [report for report in reports if report is not None]
@@ -0,0 +1,321 @@
+"""
+Full-day runs of one platform driven by a timetable of trains.
+
+The timetable is read one train at a time, and each train only joins the
+N-train state of `trains.advance_trains` shortly before it arrives and leaves
+it once it has departed, so the arrays stay as small as the number of trains
+at or about to be at the platform. Results come out of `iter_day` in chunks
+of a bounded number of seconds, so a whole day never has to be held in memory.
+"""
+
+import copy
+import csv
+import dataclasses
+import math
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .batch import FloatArray
+from .los import egress_codes, grade_letters, plat_crowd_codes
+from .model import Params, space_per_pax_fn
+from .trains import Train, TrainParams, TrainState, advance_trains
+
+DAY = 86_400
+"""The length of a service day (s)."""
+
+DEFAULT_CHUNK_SECONDS = 3600
+"""Number of seconds in each chunk of results by default."""
+
+TIMETABLE_COLUMNS = (
+    "track",
+    "arrival_time",
+    "dwell",
+    "doors",
+    "arriving_pax",
+    "departing_pax",
+)
+"""
+The columns a timetable file must have. An optional `boarding_pax` column gives
+the passengers already on the platform when the train's boarders show up.
+"""
+
+
+def parse_time(value: str) -> float:
+    """Parse a time of day given as seconds or as `HH:MM` or `HH:MM:SS`."""
+    if ":" not in value:
+        return float(value)
+    parts = [float(part) for part in value.split(":")]
+    if len(parts) > 3:
+        raise ValueError(f"expected HH:MM[:SS], got {value!r}")
+    return math.fsum(part * 60 ** (2 - i) for i, part in enumerate(parts))
+
+
+def read_timetable(path: str | Path) -> Iterator[tuple[str, Train]]:
+    """
+    Read the trains of a timetable CSV file one at a time.
+
+    :param path: a CSV file with the `TIMETABLE_COLUMNS`, where `dwell` is the
+    time (s) the train spends at the platform
+    :return: the track and train of every row, in file order
+    """
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        missing = set(TIMETABLE_COLUMNS) - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"{path}: missing columns {', '.join(sorted(missing))}")
+        for row in reader:
+            arrival_time = parse_time(row["arrival_time"])
+            yield (
+                row["track"],
+                Train(
+                    arriving_pax=float(row["arriving_pax"]),
+                    departing_pax=float(row["departing_pax"]),
+                    doors=float(row["doors"]),
+                    arrival_time=arrival_time,
+                    boarding_pax=float(row.get("boarding_pax") or 0),
+                    departure_time=arrival_time + float(row["dwell"]),
+                ),
+            )
+
+
+def platform_trains(
+    timetable: Iterable[tuple[str, Train]], tracks: Iterable[str]
+) -> Iterator[Train]:
+    """The trains of `timetable` calling at any of `tracks`."""
+    wanted = set(tracks)
+    return (train for track, train in timetable if track in wanted)
+
+
+@dataclass
+class DayChunk:
+    """
+    The per-second results of one chunk of a day, from `iter_day`.
+
+    Train flows are totals over every train at the platform.
+    """
+
+    time_after: NDArray[np.int64]
+    """Time after the start of the day (s)."""
+
+    trains: NDArray[np.int64]
+    """Number of trains in the model: at the platform, or with boarders on their way."""
+
+    off_rate: FloatArray
+    """Alight rate (pax/s)."""
+
+    on_rate: FloatArray
+    """Board rate (pax/s)."""
+
+    down_rate: FloatArray
+    """Downstairs rate onto the platform (pax/s)."""
+
+    up_rate: FloatArray
+    """Upstairs rate off of the platform (pax/s)."""
+
+    left_behind: FloatArray
+    """Boarders left on the platform or upstairs by trains departing in this second."""
+
+    arrived_pax_waiting_on_plat: FloatArray
+    """Arrived passengers on the platform waiting to go upstairs."""
+
+    total_pax_on_platform: FloatArray
+    """Total passengers on the platform."""
+
+    inst_crowding: FloatArray
+    """Platform space per passenger (sqft)."""
+
+    @classmethod
+    def empty(cls, start: int, n: int) -> "DayChunk":
+        """A chunk of `n` seconds from `start`, to be filled in."""
+        return cls(
+            time_after=np.arange(start, start + n, dtype=np.int64),
+            trains=np.zeros(n, dtype=np.int64),
+            off_rate=np.empty(n),
+            on_rate=np.empty(n),
+            down_rate=np.empty(n),
+            up_rate=np.empty(n),
+            left_behind=np.zeros(n),
+            arrived_pax_waiting_on_plat=np.empty(n),
+            total_pax_on_platform=np.empty(n),
+            inst_crowding=np.empty(n),
+        )
+
+    def __len__(self) -> int:
+        return len(self.time_after)
+
+    def los(self, total_vce_width: float) -> tuple[NDArray[np.str_], NDArray[np.str_]]:
+        """The platform crowding and egress LOS grades of every second."""
+        return (
+            grade_letters(plat_crowd_codes(self.inst_crowding)),
+            grade_letters(egress_codes(total_vce_width, self.up_rate)),
+        )
+
+
+class LivePlatform:
+    """
+    The trains currently in the model and their counters, which trains
+    join with `admit` and leave once they have departed.
+    """
+
+    def __init__(self, platform: Params, simulation_time: int) -> None:
+        self.platform = dataclasses.replace(platform, simulation_time=simulation_time)
+        self.trains: list[Train] = []
+        self.tp = TrainParams.from_trains(self.platform, [])
+        self.state = TrainState.initial(self.tp)
+
+    def _rebuild(self, trains: list[Train], state: TrainState) -> None:
+        self.trains = trains
+        self.tp = TrainParams.from_trains(self.platform, trains)
+        self.state = state
+
+    def admit(self, train: Train) -> None:
+        """Add a train whose boarders have just shown up."""
+        s = self.state
+        self._rebuild(
+            [*self.trains, train],
+            TrainState(
+                remaining_arrivals=np.append(s.remaining_arrivals, train.arriving_pax),
+                new_pax=np.append(s.new_pax, 0.0),
+                boarders_upstairs=np.append(
+                    s.boarders_upstairs, train.departing_pax - train.boarding_pax
+                ),
+                boarders_on_plat=np.append(s.boarders_on_plat, train.boarding_pax),
+                arrived_pax_waiting_on_plat=s.arrived_pax_waiting_on_plat,
+                total_pax_on_platform=s.total_pax_on_platform + train.boarding_pax,
+            ),
+        )
+
+    def retire(self, time_after: int) -> float:
+        """
+        Remove the trains that have left and have no one left to get off.
+
+        :return: the boarders they left behind, who leave the model
+        """
+        s = self.state
+        gone = (self.tp.departure_time <= time_after) & (s.remaining_arrivals <= 0)
+        if not gone.any():
+            return 0.0
+        keep = ~gone
+        left_on_plat = float(s.boarders_on_plat[gone].sum())
+        self._rebuild(
+            [train for train, k in zip(self.trains, keep) if k],
+            TrainState(
+                remaining_arrivals=s.remaining_arrivals[keep],
+                new_pax=s.new_pax[keep],
+                boarders_upstairs=s.boarders_upstairs[keep],
+                boarders_on_plat=s.boarders_on_plat[keep],
+                arrived_pax_waiting_on_plat=s.arrived_pax_waiting_on_plat,
+                total_pax_on_platform=max(0.0, s.total_pax_on_platform - left_on_plat),
+            ),
+        )
+        return left_on_plat + float(s.boarders_upstairs[gone].sum())
+
+    def idle(self) -> bool:
+        """Whether nothing will happen until the next train's boarders show up."""
+        return not self.trains and self.state.arrived_pax_waiting_on_plat <= 0
+
+    def copy(self) -> "LivePlatform":
+        """A copy that can be run on without changing this one."""
+        other = copy.copy(self)
+        other.trains = list(self.trains)
+        other.state = copy.deepcopy(self.state)
+        return other
+
+    def run(self, chunk: DayChunk, start: int, stop: int) -> None:
+        """
+        Simulate the seconds `start` to `stop` of `chunk`, without admitting
+        any trains, and fill in their results.
+
+        :param chunk: the chunk to fill in, which sets the time of each second
+        :param start: index of the first second in `chunk`
+        :param stop: index after the last second in `chunk`
+        """
+        i = start
+        while i < stop:
+            if self.idle():
+                # Nothing moves until the next train, so fill the quiet stretch at once.
+                total = self.state.total_pax_on_platform
+                for values in (
+                    chunk.off_rate,
+                    chunk.on_rate,
+                    chunk.down_rate,
+                    chunk.up_rate,
+                    chunk.arrived_pax_waiting_on_plat,
+                ):
+                    values[i:stop] = 0
+                chunk.total_pax_on_platform[i:stop] = total
+                chunk.inst_crowding[i:stop] = space_per_pax_fn(
+                    total, self.platform.eff_area
+                )
+                return
+
+            time_after = int(chunk.time_after[i])
+            step = advance_trains(self.tp, self.state, time_after)
+            s = self.state
+            chunk.trains[i] = len(self.tp)
+            chunk.off_rate[i] = step.off_rate.sum()
+            chunk.on_rate[i] = step.on_rate.sum()
+            chunk.down_rate[i] = step.ingress_rate.sum()
+            chunk.up_rate[i] = step.plat_egress_rate
+            chunk.inst_crowding[i] = step.inst_crowding
+            chunk.left_behind[i] = self.retire(time_after + 1)
+            chunk.arrived_pax_waiting_on_plat[i] = s.arrived_pax_waiting_on_plat
+            chunk.total_pax_on_platform[i] = self.state.total_pax_on_platform
+            i += 1
+
+
+def iter_day(
+    platform: Params,
+    trains: Iterable[Train],
+    simulation_time: int = DAY,
+    chunk_seconds: int = DEFAULT_CHUNK_SECONDS,
+    lead_time: float = 0,
+) -> Iterator[DayChunk]:
+    """
+    Simulate one platform through a timetable, chunk by chunk.
+
+    :param platform: the platform, whose `train1_*` and `train2_*` fields are ignored
+    :param trains: the trains calling at the platform, in order of arrival;
+    only read as far as the simulation has got
+    :param simulation_time: time (in seconds) to simulate
+    :param chunk_seconds: number of seconds in each chunk (the last may be shorter)
+    :param lead_time: time (s) before its arrival that a train's boarders show up,
+    upstairs or (`Train.boarding_pax`) on the platform
+    :return: the results, one chunk at a time
+    """
+    if chunk_seconds < 1:
+        raise ValueError(f"chunk_seconds must be positive, got {chunk_seconds}")
+    model = LivePlatform(platform, simulation_time)
+    pending = iter(trains)
+    upcoming = next(pending, None)
+    shows_up = -math.inf
+
+    for start in range(0, simulation_time, chunk_seconds):
+        chunk = DayChunk.empty(start, min(chunk_seconds, simulation_time - start))
+        i = 0
+        while i < len(chunk):
+            time_after = start + i
+            while (
+                upcoming is not None and upcoming.arrival_time - lead_time <= time_after
+            ):
+                if upcoming.arrival_time - lead_time < shows_up:
+                    raise ValueError(
+                        f"trains must be in order of arrival, got {upcoming.arrival_time} "
+                        f"after {shows_up + lead_time}"
+                    )
+                shows_up = upcoming.arrival_time - lead_time
+                model.admit(upcoming)
+                upcoming = next(pending, None)
+
+            # Run up to when the next train's boarders show up.
+            until = len(chunk)
+            if upcoming is not None:
+                until = min(until, math.ceil(upcoming.arrival_time - lead_time) - start)
+            until = max(until, i + 1)
+            model.run(chunk, i, until)
+            i = until
+        yield chunk
@@ -0,0 +1,143 @@
+"""
+Observers of the time-step loop, in place of printing every second.
+
+A `Tracer` is called with each `model.SimulationStep` of a run; pass one as
+`tracer` to `model.simulate`, `workbook.calc_workbook`, `workbook.run_model` or
+`sweep.run_models`. Without one, the loop does no tracing work at all.
+
+`Every` and `OnLosChange` sample the steps passed on to another tracer, and
+`LoggingTracer` and `RingBuffer` are ready-made sinks. They are all picklable,
+so they can be sent to the worker processes of `sweep.run_models`, where each
+worker gets its own copy.
+"""
+
+import logging
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+
+from .model import SimulationResult, SimulationStep
+
+type Tracer = Callable[[SimulationStep], None]
+"""Called with every second of a run, in order."""
+
+DEFAULT_LOGGER = "platform_crowd_model.trace"
+"""Name of the logger `LoggingTracer` writes to by default."""
+
+DEFAULT_CAPACITY = 3600
+"""Number of steps a `RingBuffer` keeps by default."""
+
+
+@dataclass
+class Every:
+    """Pass every `n`th second of a run, starting at 0 s, on to `tracer`."""
+
+    n: int
+    """Seconds between the steps passed on."""
+
+    tracer: Tracer
+    """The tracer to pass the steps on to."""
+
+    def __post_init__(self) -> None:
+        if self.n < 1:
+            raise ValueError(f"expected a positive step interval, got {self.n}")
+
+    def __call__(self, step: SimulationStep) -> None:
+        if step.time_after % self.n == 0:
+            self.tracer(step)
+
+
+@dataclass
+class OnLosChange:
+    """
+    Pass the first second of a run, and every second whose platform crowding
+    or egress LOS grade differs from the second before, on to `tracer`.
+    """
+
+    tracer: Tracer
+    """The tracer to pass the steps on to."""
+
+    _grades: tuple[str, str] | None = field(default=None, init=False, repr=False)
+
+    def __call__(self, step: SimulationStep) -> None:
+        grades = (step.plat_crowd_los, step.egress_los)
+        # A run starting over at 0 s is a new scenario.
+        if step.time_after == 0 or grades != self._grades:
+            self.tracer(step)
+        self._grades = grades
+
+
+@dataclass
+class LoggingTracer:
+    """Log a line for each step, with its train loads, platform load and rates."""
+
+    logger: str = DEFAULT_LOGGER
+    """Name of the logger to write to."""
+
+    level: int = logging.INFO
+    """Level to log at."""
+
+    def __call__(self, step: SimulationStep) -> None:
+        logger = logging.getLogger(self.logger)
+        if not logger.isEnabledFor(self.level):
+            return
+        logger.log(
+            self.level,
+            "%d s: %.1f and %.1f pax on trains 1 and 2, %.1f arrived pax waiting "
+            "on the platform, %.1f in total, %.2f pax/s up, %.2f pax/s down, "
+            "LOS %s/%s",
+            step.time_after,
+            step.train1_pax,
+            step.train2_pax,
+            step.arrived_pax_waiting_on_plat,
+            step.total_pax_on_platform,
+            step.up_rate,
+            step.down_rate,
+            step.plat_crowd_los,
+            step.egress_los,
+        )
+
+
+class RingBuffer:
+    """Keep the latest `capacity` steps in memory."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        """
+        :param capacity: number of steps to keep, dropping the oldest first
+        """
+        if capacity < 1:
+            raise ValueError(f"expected a positive capacity, got {capacity}")
+        self.buffer: deque[SimulationStep] = deque(maxlen=capacity)
+
+    def __call__(self, step: SimulationStep) -> None:
+        self.buffer.append(step)
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    @property
+    def capacity(self) -> int:
+        """Number of steps kept."""
+        assert self.buffer.maxlen is not None
+        return self.buffer.maxlen
+
+    def steps(self) -> list[SimulationStep]:
+        """The steps kept, oldest first."""
+        return list(self.buffer)
+
+    def clear(self) -> None:
+        """Drop every step kept."""
+        self.buffer.clear()
+
+
+def trace_result(result: SimulationResult, tracer: Tracer) -> None:
+    """Call `tracer` with every second of an already simulated `result`."""
+    for step in result.steps():
+        tracer(step)
+
+
+def traced(steps: Iterable[SimulationStep], tracer: Tracer) -> Iterator[SimulationStep]:
+    """`steps`, calling `tracer` with each one as it is reached."""
+    for step in steps:
+        tracer(step)
+        yield step
@@ -0,0 +1,404 @@
+"""
+A version of the model with any number of trains per platform,
+holding the state of every train in arrays.
+
+`Params` describes exactly two trains through its `train1_*` and `train2_*`
+fields. `TrainParams` instead has one array entry per train, so a whole peak
+hour of trains can be simulated without looping over trains in Python.
+`TrainParams.from_params` wraps a two-train `Params`, and `simulate_trains`
+then gives the same results as `model.simulate` up to floating-point rounding.
+
+As in the two-train model, every train's departing passengers are upstairs
+(or already on the platform) from time 0, and the downstairs width is split
+between the trains by `model.boarder_shares`.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .batch import FloatArray, alight_rate_arr, board_rate_arr, plat_ingress_arr
+from .los import egress_codes, grade_letters, plat_crowd_codes
+from .model import (
+    Params,
+    SimulationResult,
+    boarder_shares,
+    plat_clearance_fn,
+    space_per_pax_fn,
+)
+
+
+@dataclass
+class Train:
+    """One train calling at the platform."""
+
+    arriving_pax: float
+    """Number of passengers arriving on the train."""
+
+    departing_pax: float
+    """Number of passengers departing on the train."""
+
+    doors: float
+    """Number of doors (single-door equivalents) on the train."""
+
+    arrival_time: float
+    """Time (in seconds) when the train arrives."""
+
+    boarding_pax: float = 0
+    """Number of passengers already on the platform at time 0 wanting to board the train."""
+
+    departure_time: float | None = None
+    """Time (in seconds) when the train leaves, or `None` to stay until the end."""
+
+
+@dataclass
+class TrainParams:
+    """A platform and the trains calling at it, with one array entry per train."""
+
+    filename_prefix: str
+    """Prefix of filenames to save results in."""
+
+    simulation_time: int
+    """Time (in seconds) to simulate."""
+
+    eff_area: float
+    """Usable platform area (in square feet)."""
+
+    queue_length: float
+    """Length (in feet) of the queue in front of each stair that pushes max flow."""
+
+    total_vce_width: float
+    """Total width (in feet) of all of the VCEs going upstairs."""
+
+    arriving_pax: FloatArray
+    """Number of passengers arriving on each train."""
+
+    departing_pax: FloatArray
+    """Number of passengers departing on each train."""
+
+    boarding_pax: FloatArray
+    """Number of passengers already on the platform at time 0 wanting to board each train."""
+
+    doors: FloatArray
+    """Number of doors (single-door equivalents) on each train."""
+
+    arrival_time: FloatArray
+    """Time (in seconds) when each train arrives."""
+
+    departure_time: FloatArray
+    """Time (in seconds) when each train leaves."""
+
+    @classmethod
+    def from_trains(cls, platform: Params, trains: Sequence[Train]) -> "TrainParams":
+        """
+        Put `trains` on the platform of `platform`,
+        ignoring its own `train1_*` and `train2_*` fields.
+        """
+        if platform.dt != 1:
+            raise ValueError(
+                f"the N-train model only supports 1 s time steps, got dt={platform.dt}"
+            )
+
+        def column(values: Sequence[float]) -> FloatArray:
+            return np.array(values, dtype=np.float64)
+
+        return cls(
+            filename_prefix=platform.filename_prefix,
+            simulation_time=platform.simulation_time,
+            eff_area=platform.eff_area,
+            queue_length=platform.queue_length,
+            total_vce_width=platform.total_vce_width,
+            arriving_pax=column([t.arriving_pax for t in trains]),
+            departing_pax=column([t.departing_pax for t in trains]),
+            boarding_pax=column([t.boarding_pax for t in trains]),
+            doors=column([t.doors for t in trains]),
+            arrival_time=column([t.arrival_time for t in trains]),
+            departure_time=column(
+                [
+                    platform.simulation_time
+                    if t.departure_time is None
+                    else t.departure_time
+                    for t in trains
+                ]
+            ),
+        )
+
+    @classmethod
+    def from_params(cls, params: Params) -> "TrainParams":
+        """The two trains of `params`."""
+        return cls.from_trains(
+            params,
+            [
+                Train(
+                    arriving_pax=params.train1_arriving_pax,
+                    departing_pax=params.train1_departing_pax,
+                    doors=params.train1_doors,
+                    arrival_time=params.train1_arrival_time,
+                    boarding_pax=params.train1_boarding_pax,
+                ),
+                Train(
+                    arriving_pax=params.train2_arriving_pax,
+                    departing_pax=params.train2_departing_pax,
+                    doors=params.train2_doors,
+                    arrival_time=params.train2_arrival_time,
+                    boarding_pax=params.train2_boarding_pax,
+                ),
+            ],
+        )
+
+    def __len__(self) -> int:
+        """The number of trains."""
+        return len(self.arriving_pax)
+
+
+@dataclass
+class TrainState:
+    """The counters of the time-step loop, with one entry per train."""
+
+    remaining_arrivals: FloatArray
+    """Passengers still waiting to get off each train."""
+
+    new_pax: FloatArray
+    """Passengers that have boarded each train."""
+
+    boarders_upstairs: FloatArray
+    """Passengers for each train that are still upstairs."""
+
+    boarders_on_plat: FloatArray
+    """Passengers for each train waiting on the platform."""
+
+    arrived_pax_waiting_on_plat: float
+    """Arrived passengers on the platform waiting to go upstairs."""
+
+    total_pax_on_platform: float
+    """Total passengers on the platform."""
+
+    @classmethod
+    def initial(cls, tp: TrainParams) -> "TrainState":
+        """The state at time 0."""
+        return cls(
+            remaining_arrivals=tp.arriving_pax.copy(),
+            new_pax=np.zeros(len(tp)),
+            boarders_upstairs=tp.departing_pax - tp.boarding_pax,
+            boarders_on_plat=tp.boarding_pax.copy(),
+            arrived_pax_waiting_on_plat=0,
+            total_pax_on_platform=float(tp.boarding_pax.sum()),
+        )
+
+
+@dataclass
+class TrainResult:
+    """
+    The per-second output of `simulate_trains`.
+
+    Per-train arrays have shape (seconds, trains), the others (seconds,).
+    """
+
+    time_after: NDArray[np.int64]
+    """Time after the start of the simulation (s)."""
+
+    train_pax: FloatArray
+    """Passengers on each train."""
+
+    off_rate: FloatArray
+    """Alight rate (pax/s) of each train."""
+
+    on_rate: FloatArray
+    """Board rate (pax/s) of each train."""
+
+    departing_pax_on_plat: FloatArray
+    """Departing passengers on the platform for each train."""
+
+    down_rate: FloatArray
+    """Downstairs rate onto the platform (pax/s)."""
+
+    up_rate: FloatArray
+    """Upstairs rate off of the platform (pax/s)."""
+
+    arrived_pax_waiting_on_plat: FloatArray
+    """Arrived passengers on the platform waiting to go upstairs."""
+
+    total_pax_on_platform: FloatArray
+    """Total passengers on the platform."""
+
+    inst_crowding: FloatArray
+    """Platform space per passenger (sqft)."""
+
+    net_pax_flow_rate: FloatArray
+    """Net platform flow rate (pax/s)."""
+
+    plat_crowd_los: NDArray[np.str_]
+    """Platform crowding LOS grade."""
+
+    egress_los: NDArray[np.str_]
+    """Egress LOS grade."""
+
+    def __len__(self) -> int:
+        return len(self.time_after)
+
+    def two_train_result(self) -> SimulationResult:
+        """The results of a two-train simulation in the form of `model.simulate`."""
+        if self.train_pax.shape[1] != 2:
+            raise ValueError(f"expected 2 trains, got {self.train_pax.shape[1]}")
+        return SimulationResult(
+            time_after=self.time_after,
+            train1_pax=self.train_pax[:, 0].copy(),
+            train2_pax=self.train_pax[:, 1].copy(),
+            train1_off_rate=self.off_rate[:, 0].copy(),
+            train2_off_rate=self.off_rate[:, 1].copy(),
+            train1_on_rate=self.on_rate[:, 0].copy(),
+            train2_on_rate=self.on_rate[:, 1].copy(),
+            down_rate=self.down_rate,
+            up_rate=self.up_rate,
+            departing_pax_on_plat_1=self.departing_pax_on_plat[:, 0].copy(),
+            departing_pax_on_plat_2=self.departing_pax_on_plat[:, 1].copy(),
+            arrived_pax_waiting_on_plat=self.arrived_pax_waiting_on_plat,
+            total_pax_on_platform=self.total_pax_on_platform,
+            inst_crowding=self.inst_crowding,
+            net_pax_flow_rate=self.net_pax_flow_rate,
+            plat_crowd_los=self.plat_crowd_los,
+            egress_los=self.egress_los,
+        )
+
+
+@dataclass
+class TrainStep:
+    """The flow rates (pax/s) and crowding of one time step."""
+
+    off_rate: FloatArray
+    """Alight rate of each train."""
+
+    on_rate: FloatArray
+    """Board rate of each train."""
+
+    ingress_rate: FloatArray
+    """Downstairs rate onto the platform of each train's boarders."""
+
+    plat_egress_rate: float
+    """Upstairs rate off of the platform."""
+
+    inst_crowding: float
+    """Platform space per passenger (sqft)."""
+
+
+def advance_trains(tp: TrainParams, state: TrainState, time_after: int) -> TrainStep:
+    """
+    Advance every train in `state` by one second, in place.
+
+    :param tp: the platform and its trains
+    :param state: the counters at `time_after`, updated in place
+    :param time_after: the current time (s)
+    :return: the flow rates and crowding during this time step
+    """
+    s = state
+    eff_area = tp.eff_area
+    w = tp.total_vce_width
+    off_rate = alight_rate_arr(
+        s.remaining_arrivals, time_after, tp.arrival_time, tp.doors
+    )
+    s.remaining_arrivals = np.maximum(s.remaining_arrivals - off_rate, 0)
+    alighting = float(off_rate.sum())
+    s.total_pax_on_platform += alighting
+    s.arrived_pax_waiting_on_plat += alighting
+    plat_egress_rate = min(
+        plat_clearance_fn(
+            s.arrived_pax_waiting_on_plat, eff_area, w, w * tp.queue_length / 5
+        ),
+        s.arrived_pax_waiting_on_plat,
+    )
+    s.arrived_pax_waiting_on_plat -= plat_egress_rate
+    if s.arrived_pax_waiting_on_plat < 0:
+        s.arrived_pax_waiting_on_plat = 0
+    s.total_pax_on_platform -= plat_egress_rate
+    ingress_rate = plat_ingress_arr(
+        s.boarders_upstairs,
+        5000,
+        w * boarder_shares(s.boarders_upstairs),
+        np.full(len(tp), plat_egress_rate),
+    )
+    s.boarders_on_plat = s.boarders_on_plat + ingress_rate
+    s.total_pax_on_platform += float(ingress_rate.sum())
+    on_rate = board_rate_arr(
+        tp.doors,
+        off_rate,
+        time_after,
+        tp.arrival_time,
+        tp.departure_time,
+        s.boarders_on_plat,
+    )
+    s.boarders_on_plat = np.maximum(s.boarders_on_plat - on_rate, 0)
+    s.total_pax_on_platform -= float(on_rate.sum())
+    s.boarders_upstairs = s.boarders_upstairs - ingress_rate
+    s.new_pax = s.new_pax + on_rate
+
+    inst_crowding = space_per_pax_fn(s.total_pax_on_platform, eff_area)
+    if s.total_pax_on_platform < 0:
+        s.total_pax_on_platform = 0
+    return TrainStep(
+        off_rate=off_rate,
+        on_rate=on_rate,
+        ingress_rate=ingress_rate,
+        plat_egress_rate=plat_egress_rate,
+        inst_crowding=inst_crowding,
+    )
+
+
+def simulate_trains(params: Params | TrainParams) -> TrainResult:
+    """
+    Run the time-step loop for one platform with any number of trains.
+
+    :param params: the platform and its trains; a two-train `Params` is
+    converted with `TrainParams.from_params`
+    :return: the per-second results
+    """
+    tp = params if isinstance(params, TrainParams) else TrainParams.from_params(params)
+    n = tp.simulation_time
+    n_trains = len(tp)
+    w = tp.total_vce_width
+
+    def empty(*shape: int) -> FloatArray:
+        return np.empty((n, *shape))
+
+    train_pax = empty(n_trains)
+    off_rates = empty(n_trains)
+    on_rates = empty(n_trains)
+    departing_pax_on_plat = empty(n_trains)
+    down_rate = empty()
+    up_rate = empty()
+    arrived_pax_waiting_on_plat = empty()
+    total_pax_on_platform = empty()
+    inst_crowding = empty()
+
+    s = TrainState.initial(tp)
+    for time_after in range(n):
+        step = advance_trains(tp, s, time_after)
+        inst_crowding[time_after] = step.inst_crowding
+        train_pax[time_after] = s.remaining_arrivals + s.new_pax
+        off_rates[time_after] = step.off_rate
+        on_rates[time_after] = step.on_rate
+        departing_pax_on_plat[time_after] = s.boarders_on_plat
+        down_rate[time_after] = step.ingress_rate.sum()
+        up_rate[time_after] = step.plat_egress_rate
+        arrived_pax_waiting_on_plat[time_after] = s.arrived_pax_waiting_on_plat
+        total_pax_on_platform[time_after] = s.total_pax_on_platform
+
+    net_pax_flow_rate = (
+        down_rate + off_rates.sum(axis=1) - up_rate - on_rates.sum(axis=1)
+    )
+    return TrainResult(
+        time_after=np.arange(n, dtype=np.int64),
+        train_pax=train_pax,
+        off_rate=off_rates,
+        on_rate=on_rates,
+        departing_pax_on_plat=departing_pax_on_plat,
+        down_rate=down_rate,
+        up_rate=up_rate,
+        arrived_pax_waiting_on_plat=arrived_pax_waiting_on_plat,
+        total_pax_on_platform=total_pax_on_platform,
+        inst_crowding=inst_crowding,
+        net_pax_flow_rate=net_pax_flow_rate,
+        plat_crowd_los=grade_letters(plat_crowd_codes(inst_crowding)),
+        egress_los=grade_letters(egress_codes(w, up_rate)),
+    )
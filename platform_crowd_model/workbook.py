@@ -0,0 +1,416 @@
+"""
+Spreadsheet output for the platform clearance model.
+"""
+
+import logging
+from collections.abc import Sequence
+from dataclasses import dataclass, fields
+from typing import Any, Literal
+
+import numpy as np
+import openpyxl
+from openpyxl.chart import Reference, ScatterChart
+from openpyxl.chart.series_factory import SeriesFactory
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
+from openpyxl.worksheet.worksheet import Worksheet
+
+from .cache import ResultCache
+from .export import ExportFormat, export_result
+from .model import Params, SimulationResult, iter_simulation, simulate
+from .profiling import Profiler, phase
+from .stairs import StairAssignment, StairSeries, simulate_stairs
+from .tracing import Tracer, trace_result, traced
+
+logger = logging.getLogger(__name__)
+
+
+def calc_workbook(
+    params: Params,
+    write_only: bool = False,
+    result: SimulationResult | None = None,
+    stairs: StairSeries | None = None,
+    charts: bool = True,
+    profiler: Profiler | None = None,
+    tracer: Tracer | None = None,
+) -> openpyxl.Workbook:
+    """
+    Simulate a scenario and build a workbook with its parameters,
+    per-second results and charts.
+
+    :param params: the scenario to simulate
+    :param write_only: use a write-only workbook that streams each row out
+    as the simulation produces it, so memory use doesn't grow with
+    `params.simulation_time`; such a workbook can only be saved once
+    :param result: the already simulated results of `params`, if available
+    :param stairs: per-stair results from `stairs.simulate_stairs`
+    to add on a second "Stairs" sheet, along with their lumped `result`
+    :param charts: add the charts of the results
+    :param profiler: record the time spent simulating (`rows` for a write-only
+    workbook, which simulates as it writes), writing `cells`, tracing (`trace`)
+    and building `charts`
+    :param tracer: call this with every second of the results, see `tracing`
+    :return: the workbook
+    """
+    eff_area = params.eff_area
+
+    logger.debug("VCE widths: %s", params.vce_widths[0, :])
+
+    wb = openpyxl.Workbook(write_only=write_only)
+
+    sheet: Worksheet | WriteOnlyWorksheet
+    if write_only:
+        sheet = wb.create_sheet()
+    else:
+        assert type(wb.active) is Worksheet
+        sheet = wb.active
+
+    param_rows: list[list[Any]] = []
+
+    def make_row(value: Any, description: str) -> None:
+        param_rows.append([description, value])
+
+    make_row("Value", "Parameter")
+    make_row(params.platform_width, "Platform width (ft)")
+    make_row(params.platform_length, "Platform length (ft)")
+    make_row(params.total_vce_width, "Total VCE width (ft)")
+    make_row(params.usable_platform_area_multiplier, "Effective Area Multiplier")
+    make_row(eff_area, "Usable Platform Area (sqft)")
+    make_row(params.train1_arriving_pax, "Train 1 Arriving Passengers")
+    make_row(params.train1_departing_pax, "Train 1 Departing Passengers")
+    make_row(params.train1_arrival_time, "Train 1 Arrival Time")
+    make_row(params.train2_arriving_pax, "Train 2 Arriving Passengers")
+    make_row(params.train2_departing_pax, "Train 2 Departing Passengers")
+    make_row(params.train2_arrival_time, "Train 2 Arrival Time")
+    make_row(params.simulation_time, "Simulation Length (s)")
+    if params.dt != 1:
+        make_row(params.dt, "Time Step (s)")
+        make_row(params.adaptive_dt, "Adaptive Time Step")
+    make_row(params.total_vce_width * 19 / 60, "LOS F Egress Rate (pax/s)")
+    make_row(
+        (params.train1_arriving_pax + params.train2_arriving_pax)
+        / (params.total_vce_width * 19 / 60),
+        "Emergency Egress Time (s)",
+    )
+
+    @dataclass
+    class Columns:
+        time_after: int
+        train1_pax: int
+        train2_pax: int
+        train1_off_rate: int
+        train2_off_rate: int
+        train1_on_rate: int
+        train2_on_rate: int
+        down_rate: int
+        up_rate: int
+        departing_pax_on_plat_1: int
+        departing_pax_on_plat_2: int
+        arrived_pax_waiting_on_plat: int
+        total_pax_on_platform: int
+        inst_crowding: int
+        net_pax_flow_rate: int
+        plat_crowd_los: int
+        egress_los: int
+
+    # The input parameters go in a table taking up columns 0 (A) and 1 (B).
+    headers: list[str] = []
+
+    def make_column_num(description: str) -> int:
+        headers.append(description)
+        return len(headers) + 2
+
+    columns = Columns(
+        time_after=make_column_num("Time after arrival (s),"),
+        train1_pax=make_column_num("Passengers on Train 1"),
+        train2_pax=make_column_num("Passengers on Train 2"),
+        train1_off_rate=make_column_num("Train 1 Alight Rate (pax/s),"),
+        train2_off_rate=make_column_num("Train 2 Alight Rate (pax/s),"),
+        train1_on_rate=make_column_num("Train 1 Board Rate (pax/s),"),
+        train2_on_rate=make_column_num("Train 2 Board Rate (pax/s),"),
+        down_rate=make_column_num("Downstairs Rate (pax/s),"),
+        up_rate=make_column_num("Upstairs Rate (pax/s),"),
+        departing_pax_on_plat_1=make_column_num(
+            "Train 1 Departing Passengers on Platform"
+        ),
+        departing_pax_on_plat_2=make_column_num(
+            "Train 2 Departing Passengers on Platform"
+        ),
+        arrived_pax_waiting_on_plat=make_column_num("Arrived Passengers on Platform"),
+        total_pax_on_platform=make_column_num("Total Passengers on Platform"),
+        inst_crowding=make_column_num("Platform Space per Passanger (sqft),"),
+        net_pax_flow_rate=make_column_num("Net Platform Flow Rate"),
+        plat_crowd_los=make_column_num("Platform Crowding LOS"),
+        egress_los=make_column_num("Egress LOS"),
+    )
+    column_names = [field.name for field in fields(columns)]
+
+    FIRST_DATA_ROW = 2
+
+    if isinstance(sheet, WriteOnlyWorksheet):
+        # Rows have to be written in order, so each row holds both
+        # a row of the parameter table (if any are left) and a time step.
+        table = iter(param_rows)
+        sheet.append([*next(table), *headers])
+        steps = iter_simulation(params) if result is None else result.steps()
+        if tracer is not None:
+            steps = traced(steps, tracer)
+        with phase(profiler, "rows"):
+            for step in steps:
+                sheet.append(
+                    [
+                        *next(table, [None, None]),
+                        *(getattr(step, n) for n in column_names),
+                    ]
+                )
+            # Finish the parameter table if there were fewer steps than rows.
+            for param_row in table:
+                sheet.append(param_row)
+    else:
+        if result is None:
+            with phase(profiler, "simulate"):
+                result = simulate(params)
+
+        with phase(profiler, "cells"):
+            for row, (description, value) in enumerate(param_rows, start=1):
+                sheet.cell(column=1, row=row).value = description
+                sheet.cell(column=2, row=row).value = value
+            for colnum, description in enumerate(headers, start=3):
+                sheet.cell(row=1, column=colnum).value = description
+
+            for name in column_names:
+                column: int = getattr(columns, name)
+                for row, value in enumerate(
+                    getattr(result, name).tolist(), start=FIRST_DATA_ROW
+                ):
+                    sheet.cell(row=row, column=column).value = value
+
+        if tracer is not None:
+            with phase(profiler, "trace"):
+                trace_result(result, tracer)
+
+    # Time gets exported to column 3, see `columns.time_after` above.
+    def make_chart(
+        title: str, min_col: int, x_title: str, y_title: str
+    ) -> ScatterChart:
+        chart = ScatterChart()
+        chart.title = title
+        chart.style = 13
+        chart.x_axis.title = x_title
+        chart.y_axis.title = y_title
+        chart.x_axis.scaling.min = 0
+        chart.x_axis.scaling.max = params.simulation_time
+        chart.legend = None
+
+        max_row = params.simulation_time + FIRST_DATA_ROW - 1
+        xvalues = Reference(sheet, min_col=3, min_row=FIRST_DATA_ROW, max_row=max_row)
+        values = Reference(
+            sheet, min_col=min_col, min_row=FIRST_DATA_ROW - 1, max_row=max_row
+        )
+        # Y values start one row above X values so that first cell is series name.
+        series = SeriesFactory(values, xvalues, title_from_data=True)
+        chart.series.append(series)
+        return chart
+
+    def make_chart_with_chopped_y(
+        title: str, min_col: int, x_title: str, y_title: str
+    ) -> ScatterChart:
+        chart = ScatterChart()
+        chart.title = title
+        chart.style = 13
+        chart.x_axis.title = x_title
+        chart.y_axis.title = y_title
+        chart.x_axis.scaling.min = 0
+        chart.x_axis.scaling.max = params.simulation_time
+        chart.y_axis.scaling.min = 0
+        chart.y_axis.scaling.max = 50
+        chart.legend = None
+
+        max_row = params.simulation_time + FIRST_DATA_ROW - 1
+        xvalues = Reference(sheet, min_col=3, min_row=FIRST_DATA_ROW, max_row=max_row)
+        values = Reference(
+            sheet, min_col=min_col, min_row=FIRST_DATA_ROW - 1, max_row=max_row
+        )
+        # Y values start one row above X values so that first cell is series name.
+        series = SeriesFactory(values, xvalues, title_from_data=True)
+        chart.series.append(series)
+        return chart
+
+    def make_chart_2(
+        title: str, col1: int, col2: int, x_title: str, y_title: str
+    ) -> ScatterChart:
+        chart = ScatterChart()
+        chart.title = title
+        chart.style = 13
+        chart.x_axis.title = x_title
+        chart.y_axis.title = y_title
+        chart.x_axis.scaling.min = 0
+        chart.x_axis.scaling.max = params.simulation_time
+        assert chart.legend is not None
+        chart.legend.position = "b"
+
+        max_row = params.simulation_time + FIRST_DATA_ROW - 1
+        xvalues = Reference(sheet, min_col=3, min_row=FIRST_DATA_ROW, max_row=max_row)
+        values1 = Reference(
+            sheet, min_col=col1, min_row=FIRST_DATA_ROW - 1, max_row=max_row
+        )
+        values2 = Reference(
+            sheet, min_col=col2, min_row=FIRST_DATA_ROW - 1, max_row=max_row
+        )
+        # Y values start one row above X values so that first cell is series name.
+        series1 = SeriesFactory(values1, xvalues, title_from_data=True)
+        chart.series.append(series1)
+        series2 = SeriesFactory(values2, xvalues, title_from_data=True)
+        chart.series.append(series2)
+        return chart
+
+    def add_chart(chart: ScatterChart, anchor: str) -> None:
+        # The openpyxl stubs only allow Worksheet.add_chart on a Worksheet,
+        # but WriteOnlyWorksheet shares the same implementation.
+        sheet.add_chart(chart, anchor)  # type: ignore[misc]
+
+    if charts:
+        with phase(profiler, "charts"):
+            add_chart(
+                make_chart_2(
+                    "Up and Down Rates",
+                    columns.up_rate,
+                    columns.down_rate,
+                    "Time (s)",
+                    "Rate (pax/s)",
+                ),
+                "V4",
+            )
+            add_chart(
+                make_chart_2(
+                    "Passengers Aboard Trains",
+                    columns.train1_pax,
+                    columns.train2_pax,
+                    "Time (s)",
+                    "Passengers",
+                ),
+                "V19",
+            )
+            add_chart(
+                make_chart_2(
+                    "Passengers on Platform",
+                    columns.arrived_pax_waiting_on_plat,
+                    columns.total_pax_on_platform,
+                    "Time (s)",
+                    "Passengers",
+                ),
+                "V34",
+            )
+            add_chart(
+                make_chart_with_chopped_y(
+                    "Space per Passenger",
+                    columns.inst_crowding,
+                    "Time (s)",
+                    "Space per passenger (sqft)",
+                ),
+                "V49",
+            )
+            add_chart(
+                make_chart(
+                    "Net Platform Flow Rate",
+                    columns.net_pax_flow_rate,
+                    "Time (s)",
+                    "Net Flow Rate (pax/s)",
+                ),
+                "V64",
+            )
+    if stairs is not None:
+        stair_sheet = wb.create_sheet("Stairs")
+        stair_headers = ["Time after arrival (s),"]
+        for i, width in enumerate(stairs.widths, start=1):
+            stair_headers += [
+                f"Stair {i} ({width:.2f} ft) Queue",
+                f"Stair {i} Up Rate (pax/s),",
+                f"Stair {i} Down Rate (pax/s),",
+            ]
+        stair_sheet.append(stair_headers)
+        # Interleave the queue and rates of each stair, one row per second.
+        stair_rows: list[list[float]] = (
+            np.stack([stairs.queue, stairs.up_rate, stairs.down_rate], axis=-1)
+            .reshape(len(stairs.queue), -1)
+            .tolist()
+        )
+        with phase(profiler, "cells"):
+            for time_after, stair_row in enumerate(stair_rows):
+                stair_sheet.append([time_after, *stair_row])
+
+    los_f_egress_rate = params.total_vce_width * 19 / 60
+    logger.info(
+        "LOS F egress rate is %s pax/second. Emergency egress time is roughly "
+        "%s seconds.",
+        los_f_egress_rate,
+        (params.train1_arriving_pax + params.train2_arriving_pax) / los_f_egress_rate,
+    )
+    return wb
+
+
+def output_stem(params: Params) -> str:
+    """The filename, without an extension, that `run_model` saves `params` under."""
+    return f"{params.filename_prefix}_{params.train1_arriving_pax:g}_{params.train2_arriving_pax:g}_{params.train2_arrival_time - params.train1_arrival_time}s"
+
+
+def run_model(
+    params: Params,
+    write_only: bool = False,
+    formats: Sequence[Literal["xlsx"] | ExportFormat] = ("xlsx",),
+    cache: ResultCache | None = None,
+    stairs: StairAssignment | None = None,
+    profiler: Profiler | None = None,
+    tracer: Tracer | None = None,
+) -> None:
+    """
+    Simulate a scenario and save its results under `output_stem(params)`.
+
+    :param params: the scenario to simulate
+    :param write_only: stream the workbook out as it is simulated,
+    see `calc_workbook`; with a cache or other formats, the scenario is
+    simulated once up front and the workbook streamed from its result
+    :param formats: the formats to save, `xlsx` and/or any of `export.EXPORT_FORMATS`
+    :param cache: reuse the stored result of `params` from this cache, if there is one
+    :param stairs: simulate a queue at every stair with this assignment rule
+    (see `stairs.simulate_stairs`) and add the per-stair results to the workbook;
+    the cache isn't used for these
+    :param profiler: record the time spent simulating, building, saving
+    and exporting the results, see `profiling`
+    :param tracer: call this with every second of the results, see `tracing`
+    """
+    stem = output_stem(params)
+    exports = [format for format in formats if format != "xlsx"]
+    result = None
+    stair_series = None
+    if stairs is not None:
+        with phase(profiler, "simulate"):
+            result, stair_series = simulate_stairs([params], stairs).scenario(0)
+    elif cache is not None or exports:
+        # The exports need the whole result, so simulate it once up front
+        # and let the workbook be written from it.
+        with phase(profiler, "simulate"):
+            result = simulate(params, cache=cache)
+
+    if "xlsx" in formats:
+        wb = calc_workbook(
+            params=params,
+            write_only=write_only,
+            result=result,
+            stairs=stair_series,
+            profiler=profiler,
+            tracer=tracer,
+        )
+
+        with phase(profiler, "save"):
+            wb.save(f"{stem}.xlsx")
+            wb.close()
+
+    if exports:
+        assert result is not None
+        # Otherwise calc_workbook has traced the results.
+        if tracer is not None and "xlsx" not in formats:
+            with phase(profiler, "trace"):
+                trace_result(result, tracer)
+        with phase(profiler, "export"):
+            for format in exports:
+                export_result(result, stem, format)
@@ -0,0 +1,26 @@
+"""Assertions that two runs of a scenario give the same results."""
+
+import numpy as np
+
+from platform_crowd_model.model import SimulationResult, SimulationStep
+
+
+def assert_same_results(actual: SimulationResult, expected: SimulationResult) -> None:
+    """Check that every column is identical."""
+    for name in SimulationStep._fields:
+        np.testing.assert_array_equal(
+            getattr(actual, name), getattr(expected, name), err_msg=name
+        )
+
+
+def assert_close_results(actual: SimulationResult, expected: SimulationResult) -> None:
+    """
+    Check that every column is the same up to floating-point rounding,
+    and the LOS grades are identical.
+    """
+    for name in SimulationStep._fields:
+        a, e = getattr(actual, name), getattr(expected, name)
+        if e.dtype.kind == "U":
+            np.testing.assert_array_equal(a, e, err_msg=name)
+        else:
+            np.testing.assert_allclose(a, e, rtol=1e-9, atol=1e-9, err_msg=name)
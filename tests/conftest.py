@@ -0,0 +1,11 @@
+import pytest
+
+from platform_crowd_model.model import Params
+from platform_crowd_model.scenarios import penn_scenarios
+
+
+@pytest.fixture(params=list(penn_scenarios()))
+def scenario(request: pytest.FixtureRequest) -> Params:
+    """Each of the studied scenarios in turn."""
+    params: Params = penn_scenarios()[request.param]
+    return params
@@ -0,0 +1,13 @@
+from platform_crowd_model.batch import simulate_batch
+from platform_crowd_model.model import simulate
+from platform_crowd_model.scenarios import penn_scenarios
+
+from .compare import assert_close_results
+
+
+def test_batch_matches_scalar() -> None:
+    scenarios = list(penn_scenarios().values())
+    result = simulate_batch(scenarios)
+    assert len(result) == len(scenarios)
+    for i, params in enumerate(scenarios):
+        assert_close_results(result.scenario(i), simulate(params))
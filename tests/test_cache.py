@@ -0,0 +1,93 @@
+import dataclasses
+import os
+from pathlib import Path
+
+import numpy as np
+
+from platform_crowd_model.cache import ResultCache, params_key
+from platform_crowd_model.model import simulate
+from platform_crowd_model.scenarios import penn_scenarios
+
+from .compare import assert_same_results
+
+
+def test_hit(tmp_path: Path) -> None:
+    params = dataclasses.replace(penn_scenarios()["p3120"], simulation_time=300)
+    cache = ResultCache(tmp_path)
+    assert cache.get(params) is None
+
+    result = simulate(params, cache=cache)
+    cached = cache.get(params)
+    assert cached is not None
+    assert_same_results(cached, result)
+    assert_same_results(simulate(params, cache=cache), result)
+
+    # Only the results matter, not where the workbook is saved.
+    renamed = dataclasses.replace(params, filename_prefix="renamed")
+    assert cache.get(renamed) is not None
+
+
+def test_key_stability() -> None:
+    params = penn_scenarios()["p3120"]
+    key = params_key(params)
+    assert key == params_key(params)
+    assert key == params_key(dataclasses.replace(params))
+
+    # Numbers are keyed by value, whatever their type.
+    assert params_key(dataclasses.replace(params, queue_length=42)) == params_key(
+        dataclasses.replace(params, queue_length=42.0)
+    )
+
+    # `vce_widths` is keyed by its contents, not its identity or memory layout.
+    widths = params.vce_widths
+    assert key == params_key(dataclasses.replace(params, vce_widths=widths.copy()))
+    assert key == params_key(
+        dataclasses.replace(params, vce_widths=np.asfortranarray(widths))
+    )
+    changed = widths.copy()
+    changed[0, 0] += 1
+    assert key != params_key(dataclasses.replace(params, vce_widths=changed))
+    flat = widths.reshape(1, -1)
+    assert key != params_key(dataclasses.replace(params, vce_widths=flat))
+
+    assert key != params_key(params, version="other")
+    assert key != params_key(dataclasses.replace(params, simulation_time=601))
+
+
+def test_lru_eviction(tmp_path: Path) -> None:
+    base = dataclasses.replace(penn_scenarios()["p3120"], simulation_time=60)
+    scenarios = [
+        dataclasses.replace(base, train1_arriving_pax=pax) for pax in (800, 900, 1000)
+    ]
+    cache = ResultCache(tmp_path)
+    for i, params in enumerate(scenarios):
+        cache.put(params, simulate(params), evict=False)
+        os.utime(cache.path(params), (i, i))
+    assert cache.entries() == [cache.path(p) for p in scenarios]
+
+    # Using the oldest entry makes the second the least recently used.
+    assert cache.get(scenarios[0]) is not None
+    assert cache.entries()[0] == cache.path(scenarios[1])
+
+    assert cache.evict(cache.size_bytes() - 1) == 1
+    assert cache.get(scenarios[1]) is None
+    assert cache.get(scenarios[0]) is not None
+    assert cache.get(scenarios[2]) is not None
+
+    # Storing evicts once the cache outgrows `max_bytes`.
+    cache.max_bytes = cache.size_bytes()
+    cache.put(scenarios[1], simulate(scenarios[1]))
+    assert len(cache.entries()) == 2
+    assert cache.get(scenarios[1]) is not None
+
+
+def test_clear(tmp_path: Path) -> None:
+    params = dataclasses.replace(penn_scenarios()["p3120"], simulation_time=60)
+    cache = ResultCache(tmp_path)
+    assert cache.clear() == 0
+    simulate(params, cache=cache)
+    simulate(dataclasses.replace(params, simulation_time=30), cache=cache)
+    assert cache.clear() == 2
+    assert cache.entries() == []
+    assert cache.size_bytes() == 0
+    assert cache.get(params) is None
@@ -0,0 +1,37 @@
+import dataclasses
+import io
+
+from platform_crowd_model.checkpoint import Checkpoint, branch, resume, take_checkpoint
+from platform_crowd_model.model import Params, simulate
+
+from .compare import assert_same_results
+
+
+def test_resume_matches_simulate(scenario: Params) -> None:
+    checkpoint = take_checkpoint(scenario, scenario.train2_arrival_time)
+    assert_same_results(resume(checkpoint), simulate(scenario))
+
+
+def test_branch_matches_simulate(scenario: Params) -> None:
+    t = scenario.train2_arrival_time
+    variants = [
+        dataclasses.replace(
+            scenario,
+            train2_arriving_pax=pax,
+            train2_arrival_time=t + delay,
+            simulation_time=scenario.simulation_time + 300,
+        )
+        for pax in (0, 2400)
+        for delay in (0, 45)
+    ]
+    for variant, result in zip(
+        variants, branch(take_checkpoint(scenario, t), variants)
+    ):
+        assert_same_results(result, simulate(variant))
+
+
+def test_resume_after_load(scenario: Params) -> None:
+    buffer = io.BytesIO()
+    take_checkpoint(scenario, scenario.simulation_time // 2).save(buffer)
+    buffer.seek(0)
+    assert_same_results(resume(Checkpoint.load(buffer)), simulate(scenario))
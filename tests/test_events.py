@@ -0,0 +1,29 @@
+import dataclasses
+from pathlib import Path
+
+from platform_crowd_model.cache import ResultCache
+from platform_crowd_model.events import integrate_events
+from platform_crowd_model.model import Params, simulate
+
+from .compare import assert_close_results
+
+
+def test_event_matches_fixed_step(scenario: Params) -> None:
+    assert_close_results(simulate(scenario, integrator="event"), simulate(scenario))
+
+
+def test_event_skips_constant_stretches(scenario: Params) -> None:
+    assert len(integrate_events(scenario).segments) < scenario.simulation_time
+
+
+def test_event_bypasses_cache(scenario: Params, tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path)
+    simulate(scenario, cache=cache, integrator="event")
+    assert cache.get(scenario) is None
+
+    # A stored fixed-step result isn't returned in place of an event-driven one.
+    short = simulate(dataclasses.replace(scenario, simulation_time=10))
+    cache.put(scenario, short)
+    assert_close_results(
+        simulate(scenario, cache=cache, integrator="event"), simulate(scenario)
+    )
@@ -0,0 +1,80 @@
+import dataclasses
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from platform_crowd_model.export import (
+    COLUMN_NAMES,
+    EXPORT_FORMATS,
+    ExportFormat,
+    export_path,
+    export_result,
+    load_npy_dir,
+    load_result,
+    scan_results,
+)
+from platform_crowd_model.model import Params, simulate
+from platform_crowd_model.scenarios import penn_scenarios
+
+from .compare import assert_same_results
+
+
+@pytest.mark.parametrize("format", EXPORT_FORMATS)
+def test_round_trip(scenario: Params, format: ExportFormat, tmp_path: Path) -> None:
+    result = simulate(scenario)
+    path = export_result(result, tmp_path / "result", format)
+    assert path == export_path(tmp_path / "result", format)
+    loaded = load_result(path)
+    assert_same_results(loaded, result)
+    for name in COLUMN_NAMES:
+        assert getattr(loaded, name).dtype == getattr(result, name).dtype, name
+
+
+@pytest.mark.parametrize("format", EXPORT_FORMATS)
+def test_round_trip_empty(format: ExportFormat, tmp_path: Path) -> None:
+    result = simulate(dataclasses.replace(penn_scenarios()["p3120"], simulation_time=0))
+    assert_same_results(
+        load_result(export_result(result, tmp_path / "result", format)), result
+    )
+
+
+def test_memory_mapped(tmp_path: Path) -> None:
+    result = simulate(penn_scenarios()["p3120"])
+    path = export_result(result, tmp_path / "result", "npy")
+
+    mapped = load_npy_dir(path)
+    for name in COLUMN_NAMES:
+        column = getattr(mapped, name)
+        assert isinstance(column, np.memmap), name
+        assert not column.flags.writeable, name
+    assert_same_results(mapped, result)
+
+    read = load_npy_dir(path, mmap=False)
+    assert not isinstance(read.total_pax_on_platform, np.memmap)
+    assert_same_results(read, result)
+
+
+def test_scan_results(tmp_path: Path) -> None:
+    results = [
+        simulate(
+            dataclasses.replace(penn_scenarios()["p3120"], train1_arriving_pax=pax)
+        )
+        for pax in (800, 1200)
+    ]
+    formats: tuple[ExportFormat, ...] = ("npy", "npz")
+    paths = [
+        export_result(result, tmp_path / f"{i}", format)
+        for i, (result, format) in enumerate(zip(results, formats))
+    ]
+    scanned = list(scan_results(paths))
+    assert [path for path, _ in scanned] == paths
+    for (_, loaded), result in zip(scanned, results):
+        assert_same_results(loaded, result)
+
+
+def test_unknown_format(tmp_path: Path) -> None:
+    path = tmp_path / "result.txt"
+    path.write_text("")
+    with pytest.raises(ValueError):
+        load_result(path)
@@ -0,0 +1,23 @@
+import numpy as np
+
+from platform_crowd_model.batch import simulate_batch
+from platform_crowd_model.flowcurve import polynomial_flow
+from platform_crowd_model.scenarios import penn_scenarios
+
+from .compare import assert_close_results
+
+
+def test_polynomial_matches_formula() -> None:
+    density = np.linspace(0.001, 1, 100_001)
+    space = 1 / density
+    np.testing.assert_allclose(
+        polynomial_flow(density), (111 * space - 162) / space**2, rtol=0, atol=1e-9
+    )
+
+
+def test_polynomial_run_matches_exact() -> None:
+    scenarios = list(penn_scenarios().values())
+    exact = simulate_batch(scenarios)
+    polynomial = simulate_batch(scenarios, polynomial_flow)
+    for i in range(len(scenarios)):
+        assert_close_results(polynomial.scenario(i), exact.scenario(i))
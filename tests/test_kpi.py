@@ -0,0 +1,75 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+from platform_crowd_model.kpi import ScenarioKPIs, simulate_batch_kpis, simulate_kpis
+from platform_crowd_model.los import GRADES
+from platform_crowd_model.model import Params, clear_time, simulate
+from platform_crowd_model.scenarios import penn_scenarios
+
+
+def expected_kpis(params: Params) -> ScenarioKPIs:
+    """The KPIs of `params`, computed from its full per-second results."""
+    result = simulate(params)
+    total = result.total_pax_on_platform
+    peak = float(total.max(initial=0))
+    cleared_at = float(clear_time(result.arrived_pax_waiting_on_plat))
+    cleared = not np.isnan(cleared_at)
+    return ScenarioKPIs(
+        peak_total_pax_on_platform=peak,
+        peak_time=int(np.argmax(total)) if peak > 0 else 0,
+        min_inst_crowding=float(
+            np.minimum(result.inst_crowding.min(initial=np.inf), params.eff_area)
+        ),
+        clear_time=int(cleared_at) if cleared else params.simulation_time,
+        cleared=cleared,
+        plat_crowd_seconds=tuple(
+            int(np.count_nonzero(result.plat_crowd_los == g)) for g in GRADES
+        ),
+        egress_seconds=tuple(
+            int(np.count_nonzero(result.egress_los == g)) for g in GRADES
+        ),
+    )
+
+
+def assert_same_kpis(actual: ScenarioKPIs, expected: ScenarioKPIs) -> None:
+    """Check the KPIs match, the floating-point ones up to rounding."""
+    assert actual.peak_total_pax_on_platform == pytest.approx(
+        expected.peak_total_pax_on_platform, rel=1e-9
+    )
+    assert actual.min_inst_crowding == pytest.approx(
+        expected.min_inst_crowding, rel=1e-9
+    )
+    assert (
+        dataclasses.replace(
+            actual,
+            peak_total_pax_on_platform=expected.peak_total_pax_on_platform,
+            min_inst_crowding=expected.min_inst_crowding,
+        )
+        == expected
+    )
+
+
+def test_simulate_kpis(scenario: Params) -> None:
+    assert_same_kpis(simulate_kpis(scenario), expected_kpis(scenario))
+
+
+def test_simulate_batch_kpis(scenario: Params) -> None:
+    (kpis,) = simulate_batch_kpis([scenario])
+    assert_same_kpis(kpis, expected_kpis(scenario))
+
+
+def test_mixed_simulation_times() -> None:
+    base = penn_scenarios()["p3120"]
+    scenarios = [
+        dataclasses.replace(base, simulation_time=t) for t in (1800, 0, 60, 600, 1200)
+    ]
+    expected = [expected_kpis(p) for p in scenarios]
+    # Both clearing and uncleared runs are covered.
+    assert {kpis.cleared for kpis in expected} == {True, False}
+
+    for actual, e in zip(simulate_batch_kpis(scenarios), expected):
+        assert_same_kpis(actual, e)
+    for p, e in zip(scenarios, expected):
+        assert_same_kpis(simulate_kpis(p), e)
@@ -0,0 +1,16 @@
+import numpy as np
+
+from platform_crowd_model.model import clear_time
+
+
+def test_clear_time() -> None:
+    waiting = np.array(
+        [
+            [0.0, 0.5, 0.9, 0.0],
+            [0.0, 5.0, 1.0, 0.2],
+            [3.0, 0.0, 2.0, 1.5],
+        ]
+    )
+    np.testing.assert_array_equal(clear_time(waiting), [0, 3, np.nan])
+    assert clear_time(waiting[1]) == 3
+    assert clear_time(np.empty((2, 0))).tolist() == [0, 0]
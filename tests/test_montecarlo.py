@@ -0,0 +1,30 @@
+import dataclasses
+
+import numpy as np
+
+from platform_crowd_model.montecarlo import (
+    MonteCarloParams,
+    Normal,
+    Uniform,
+    simulate_monte_carlo,
+)
+from platform_crowd_model.scenarios import penn_scenarios
+
+
+def test_batches_and_windows_leave_results_unchanged() -> None:
+    params = MonteCarloParams(
+        dataclasses.replace(penn_scenarios()["p3120"], simulation_time=300),
+        replications=150,
+        seed=1,
+        train_delay=Normal(0, 60),
+        load_factor=Uniform(0.8, 1.2),
+    )
+    expected = simulate_monte_carlo(params, batch_size=150, window=300)
+    for batch_size, window in ((40, 300), (150, 7), (64, 1)):
+        result = simulate_monte_carlo(params, batch_size=batch_size, window=window)
+        for field in dataclasses.fields(result):
+            np.testing.assert_array_equal(
+                getattr(result, field.name),
+                getattr(expected, field.name),
+                err_msg=field.name,
+            )
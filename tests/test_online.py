@@ -0,0 +1,71 @@
+import math
+from typing import Any
+
+import numpy as np
+import pytest
+from numpy.typing import NDArray
+
+from platform_crowd_model.model import Params
+from platform_crowd_model.online import OnlineModel
+from platform_crowd_model.timetable import DayChunk, iter_day
+from platform_crowd_model.trains import Train
+
+SIMULATION_TIME = 4 * 3600
+
+
+def trains() -> list[Train]:
+    rng = np.random.default_rng(0)
+    arrivals = np.cumsum(rng.integers(240, 900, size=20))
+    return [
+        Train(
+            arriving_pax=float(rng.integers(200, 1600)),
+            departing_pax=float(rng.integers(100, 600)),
+            doors=40,
+            arrival_time=float(t),
+            departure_time=float(t + 300),
+        )
+        for t in arrivals
+        if t < SIMULATION_TIME
+    ]
+
+
+def concatenate(chunks: list[DayChunk], name: str) -> NDArray[Any]:
+    return np.concatenate([getattr(chunk, name) for chunk in chunks])
+
+
+@pytest.mark.parametrize("lead_time", [0, 90])
+def test_online_matches_iter_day(scenario: Params, lead_time: int) -> None:
+    expected = list(iter_day(scenario, trains(), SIMULATION_TIME, lead_time=lead_time))
+
+    rng = np.random.default_rng(1)
+    model = OnlineModel(scenario)
+    chunks = []
+    pending = iter(trains())
+    upcoming = next(pending, None)
+    while model.time_after < SIMULATION_TIME:
+        while (
+            upcoming is not None
+            and math.ceil(upcoming.arrival_time - lead_time) <= model.time_after
+        ):
+            model.push_arrival(upcoming)
+            upcoming = next(pending, None)
+        until = SIMULATION_TIME
+        if upcoming is not None:
+            until = math.ceil(upcoming.arrival_time - lead_time)
+        # Forecasts must leave the model as it was.
+        model.forecast()
+        chunks.append(
+            model.advance(min(int(rng.integers(1, 500)), until - model.time_after))
+        )
+
+    for name in (
+        "time_after",
+        "trains",
+        "total_pax_on_platform",
+        "inst_crowding",
+        "up_rate",
+        "left_behind",
+    ):
+        np.testing.assert_array_equal(
+            concatenate(chunks, name), concatenate(expected, name), err_msg=name
+        )
@@ -0,0 +1,29 @@
+import dataclasses
+
+import numpy as np
+
+from platform_crowd_model.model import simulate
+from platform_crowd_model.scenarios import penn_scenarios
+from platform_crowd_model.sensitivity import sensitivity_report
+
+
+def test_sensitivity() -> None:
+    params = dataclasses.replace(penn_scenarios()["p3120"], simulation_time=1200)
+    rows = {row.input: row for row in sensitivity_report(params).rows}
+
+    for i in range(params.vce_widths.shape[1]):
+        # Each stair is widened alone, so it matters even when assigning by width.
+        gradient = rows[f"vce_widths[{i}]"].gradient
+        assert gradient["peak_total_pax_on_platform"] < 0
+        assert gradient["clear_time"] < 0
+
+    # An arrival time of 0 s is only nudged up.
+    assert params.train1_arrival_time == 0
+    row = rows["train1_arrival_time"]
+    assert row.step.is_integer()
+    later = simulate(dataclasses.replace(params, train1_arrival_time=int(row.step)))
+    peak = simulate(params).total_pax_on_platform.max()
+    np.testing.assert_allclose(
+        row.gradient["peak_total_pax_on_platform"],
+        (later.total_pax_on_platform.max() - peak) / row.step,
+    )
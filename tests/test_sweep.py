@@ -0,0 +1,11 @@
+import subprocess
+import sys
+
+
+def test_import_without_openpyxl() -> None:
+    # Sweeps that only need KPIs shouldn't load the workbook dependencies.
+    code = (
+        "import sys, platform_crowd_model.kpi, platform_crowd_model.sweep; "
+        "assert 'openpyxl' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,24 @@
+import dataclasses
+from pathlib import Path
+
+import openpyxl
+import pytest
+
+from platform_crowd_model.model import Params
+from platform_crowd_model.workbook import calc_workbook
+
+
+def saved_rows(params: Params, write_only: bool, path: Path) -> int:
+    calc_workbook(params, write_only=write_only).save(path)
+    rows: int = openpyxl.load_workbook(path).worksheets[0].max_row
+    return rows
+
+
+@pytest.mark.parametrize("simulation_time", [5, 120])
+def test_write_only_keeps_every_row(
+    scenario: Params, simulation_time: int, tmp_path: Path
+) -> None:
+    params = dataclasses.replace(scenario, simulation_time=simulation_time)
+    rows = saved_rows(params, False, tmp_path / "full.xlsx")
+    assert rows > simulation_time
+    assert saved_rows(params, True, tmp_path / "write_only.xlsx") == rows